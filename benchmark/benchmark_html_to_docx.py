@@ -0,0 +1,92 @@
+# copyright (c) 2022 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the html to docx table conversion of the layout recovery."""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from docx import Document
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(__dir__, "..")))
+
+from ppstructure.recovery.table_process import HtmlToDocx, get_table_xml
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num_tables", type=int, default=20)
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default="5x4,20x6,40x8",
+        help="Comma separated rowsxcols table sizes.",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    return parser.parse_args()
+
+
+def synthetic_table_html(rows, cols, seed=0):
+    """A table recognition like html table with a spanning header."""
+    rng = np.random.default_rng(seed)
+    html = ["<html><body><table><thead><tr>"]
+    html.append('<td rowspan="2"><b>Item</b></td>')
+    html.append('<td colspan="{}"><b>Values</b></td></tr><tr>'.format(cols - 1))
+    html.extend("<td>col {}</td>".format(c) for c in range(cols - 1))
+    html.append("</tr></thead><tbody>")
+    for r in range(rows):
+        html.append("<tr><td>row {}</td>".format(r))
+        html.extend("<td>{:.2f}</td>".format(v) for v in rng.uniform(0, 1000, cols - 1))
+        html.append("</tr>")
+    html.append("</tbody></table></body></html>")
+    return "".join(html)
+
+
+def run(handle_table, tables):
+    doc = Document()
+    parser = HtmlToDocx()
+    start = time.perf_counter()
+    for html in tables:
+        handle_table(parser, html, doc)
+    return time.perf_counter() - start
+
+
+def main(args):
+    for size in args.sizes.split(","):
+        rows, cols = [int(v) for v in size.split("x")]
+        # distinct tables, so that the cache of the fast path does not hit
+        tables = [
+            synthetic_table_html(rows, cols, seed=i) for i in range(args.num_tables)
+        ]
+        costs = {"by_cells": [], "bulk": []}
+        for _ in range(args.repeat):
+            get_table_xml.cache_clear()
+            costs["by_cells"].append(run(HtmlToDocx.handle_table_by_cells, tables))
+            costs["bulk"].append(run(HtmlToDocx.handle_table, tables))
+        by_cells, bulk = np.median(costs["by_cells"]), np.median(costs["bulk"])
+        print(
+            "{:>6s} x {} tables: by cells {:8.2f} ms bulk {:8.2f} ms "
+            "speedup {:6.1f}x".format(
+                size, args.num_tables, by_cells * 1000, bulk * 1000, by_cells / bulk
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,86 @@
+# copyright (c) 2020 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Microbenchmark of the PSE kernel expansion implementations."""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(__dir__, "..")))
+
+from ppocr.postprocess.pse_postprocess.pse import pse_cython, pse_numpy
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default="640x640,736x1280,1024x1024",
+        help="Comma separated HxW map sizes.",
+    )
+    parser.add_argument("--kernel_num", type=int, default=7)
+    parser.add_argument("--min_area", type=float, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def synthetic_kernels(height, width, kernel_num, seed=0):
+    """Nested kernels thresholded from a smooth random field."""
+    rng = np.random.default_rng(seed)
+    field = cv2.GaussianBlur(
+        rng.uniform(0, 1, (height, width)).astype(np.float32), (0, 0), 6
+    )
+    field = (field - field.min()) / max(float(np.ptp(field)), 1e-6)
+    thresholds = np.linspace(0.45, 0.7, kernel_num)
+    return np.stack([(field > t).astype(np.uint8) for t in thresholds])
+
+
+def timeit(func, kernels, min_area, repeat):
+    costs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        label = func(kernels.copy(), min_area)
+        costs.append(time.perf_counter() - start)
+    return np.median(costs) * 1000, label
+
+
+def main(args):
+    impls = [("numpy", pse_numpy)]
+    if pse_cython is not None:
+        impls.append(("cython", pse_cython))
+    else:
+        print("Cython kernel is not built, only the numpy kernel is measured.")
+
+    for size in args.sizes.split(","):
+        height, width = [int(v) for v in size.split("x")]
+        kernels = synthetic_kernels(height, width, args.kernel_num)
+        labels = []
+        for name, func in impls:
+            cost, label = timeit(func, kernels, args.min_area, args.repeat)
+            labels.append(label)
+            print("{:>10s} {:>8s}: {:8.2f} ms".format(size, name, cost))
+        if len(labels) > 1:
+            print("{:>10s} identical: {}".format(size, np.array_equal(*labels)))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,108 @@
+# copyright (c) 2022 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Microbenchmark of the TableMaster matching rules on large tables."""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(__dir__, "..")))
+
+from ppstructure.table.table_master_match import (
+    center_rule_match,
+    distance_rule_match,
+    find_no_match,
+    get_bboxes_list,
+    iou_rule_match,
+    sort_bbox,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default="20x6,60x10,120x12",
+        help="Comma separated rowsxcols table sizes.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def synthetic_table(rows, cols, seed=0):
+    """Grid cells and text boxes jittered around them, PubTabNet-like."""
+    rng = np.random.default_rng(seed)
+    xs = np.cumsum(rng.integers(30, 120, cols + 1))
+    ys = np.cumsum(rng.integers(15, 40, rows + 1))
+    cells = np.array(
+        [
+            [xs[c], ys[r], xs[c + 1], ys[r + 1]]
+            for r in range(rows)
+            for c in range(cols)
+        ],
+        dtype=np.float32,
+    )
+    wh = cells[:, 2:] - cells[:, :2]
+    xy = cells[:, :2] + rng.uniform(-0.4, 0.4, (len(cells), 2)) * wh
+    boxes = np.hstack([xy, xy + rng.uniform(0.2, 1.0, (len(cells), 2)) * wh])
+    end2end_result = [dict(bbox=box) for box in boxes.astype(np.float32)]
+    return get_bboxes_list(end2end_result, dict(bbox=cells))
+
+
+def match_rules(end2end_xyxy, end2end_xywh, master_xywh, master_xyxy):
+    """The matching steps of Matcher.match, without the token formatting."""
+    match_list = center_rule_match(end2end_xywh, master_xyxy)
+    no_match = find_no_match(match_list, len(end2end_xywh))
+    if no_match:
+        match_list += iou_rule_match(end2end_xyxy[no_match], no_match, master_xyxy)
+    no_match = find_no_match(match_list, len(end2end_xywh))
+    no_match_master = find_no_match(match_list, len(master_xywh), type="master")
+    if no_match and no_match_master:
+        match_list += distance_rule_match(
+            no_match,
+            end2end_xywh[no_match],
+            no_match_master,
+            master_xywh[no_match_master],
+        )
+    no_match = find_no_match(match_list, len(end2end_xywh))
+    if no_match:
+        sort_bbox(end2end_xywh[no_match], no_match)
+    return match_list
+
+
+def main(args):
+    for size in args.sizes.split(","):
+        rows, cols = [int(v) for v in size.split("x")]
+        bboxes = synthetic_table(rows, cols)
+        costs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            match_rules(*bboxes)
+            costs.append(time.perf_counter() - start)
+        print(
+            "{:>8s} cells: {:5d} boxes: {:5d} match: {:8.2f} ms".format(
+                size, len(bboxes[3]), len(bboxes[0]), np.median(costs) * 1000
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -18,6 +18,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import os
+import re
+import bisect
 from enum import Enum
 import copy
 import numpy as np
@@ -1059,18 +1061,45 @@ class VQATokenLabelEncode(object):
         self.order_method = order_method
         assert self.order_method in [None, "tb-yx"]
 
-    def split_bbox(self, bbox, text, tokenizer):
-        words = text.split()
-        token_bboxes = []
-        curr_word_idx = 0
+    def split_bbox(self, bbox, text, offset_mapping):
+        """Split the box of a line into the boxes of its words, by the number
+        of characters, and give every token the box of its word.
+
+        The word of a token is found from the character offsets of the token,
+        a token without characters goes with the next token.
+        """
+        words = [(m.start(), m.end()) for m in re.finditer(r"\S+", text)]
+        if len(words) == 0:
+            return []
         x1, y1, x2, y2 = bbox
         unit_w = (x2 - x1) / len(text)
-        for idx, word in enumerate(words):
-            curr_w = len(word) * unit_w
-            word_bbox = [x1, y1, x1 + curr_w, y2]
-            token_bboxes.extend([word_bbox] * len(tokenizer.tokenize(word)))
-            x1 += (len(word) + 1) * unit_w
-        return token_bboxes
+        word_bboxes = []
+        for start, end in words:
+            curr_w = (end - start) * unit_w
+            word_bboxes.append([x1, y1, x1 + curr_w, y2])
+            x1 += (end - start + 1) * unit_w
+
+        word_starts = [start for start, _ in words]
+        token_words = []
+        next_word = len(words) - 1
+        for start, end in reversed(offset_mapping):
+            if end > start:
+                next_word = max(bisect.bisect_right(word_starts, start) - 1, 0)
+            token_words.append(next_word)
+        return [word_bboxes[idx] for idx in reversed(token_words)]
+
+    def batch_encode(self, texts):
+        """Tokenize the texts of a page in one call."""
+        if len(texts) == 0:
+            return []
+        return self.tokenizer.batch_encode(
+            texts,
+            pad_to_max_seq_len=False,
+            return_attention_mask=True,
+            return_token_type_ids=True,
+            return_offsets_mapping=not self.use_textline_bbox_info,
+            return_dict=False,
+        )
 
     def filter_empty_contents(self, ocr_info):
         """
@@ -1126,12 +1155,23 @@ class VQATokenLabelEncode(object):
             entity_id_to_index_map = {}
             empty_entity = set()
 
-        data["ocr_info"] = copy.deepcopy(ocr_info)
+        # the infos loaded for inference are not used by anything else
+        data["ocr_info"] = ocr_info if self.infer_mode else copy.deepcopy(ocr_info)
 
+        encode_res_list = self.batch_encode(
+            [
+                info["transcription"]
+                for info in ocr_info
+                if len(info["transcription"]) > 0
+            ]
+        )
+        encode_res_idx = 0
         for info in ocr_info:
             text = info["transcription"]
             if len(text) <= 0:
                 continue
+            encode_res = encode_res_list[encode_res_idx]
+            encode_res_idx += 1
             if train_re:
                 # for re
                 if len(text) == 0:
@@ -1142,25 +1182,21 @@ class VQATokenLabelEncode(object):
             # smooth_box
             info["bbox"] = self.trans_poly_to_bbox(info["points"])
 
-            encode_res = self.tokenizer.encode(
-                text,
-                pad_to_max_seq_len=False,
-                return_attention_mask=True,
-                return_token_type_ids=True,
-            )
-
             if not self.add_special_ids:
                 # TODO: use tok.all_special_ids to remove
                 encode_res["input_ids"] = encode_res["input_ids"][1:-1]
                 encode_res["token_type_ids"] = encode_res["token_type_ids"][1:-1]
                 encode_res["attention_mask"] = encode_res["attention_mask"][1:-1]
+                if "offset_mapping" in encode_res:
+                    encode_res["offset_mapping"] = encode_res["offset_mapping"][1:-1]
 
             if self.use_textline_bbox_info:
                 bbox = [info["bbox"]] * len(encode_res["input_ids"])
             else:
-                bbox = self.split_bbox(
-                    info["bbox"], info["transcription"], self.tokenizer
-                )
+                offset_mapping = encode_res["offset_mapping"]
+                if self.add_special_ids:
+                    offset_mapping = offset_mapping[1:-1]
+                bbox = self.split_bbox(info["bbox"], text, offset_mapping)
             if len(bbox) <= 0:
                 continue
             bbox = self._smooth_box(bbox, height, width)
@@ -1230,14 +1266,23 @@ class VQATokenLabelEncode(object):
 
     def _load_ocr_info(self, data):
         if self.infer_mode:
-            ocr_result = self.ocr_engine.ocr(data["image"], cls=False)[0]
+            # the ocr result of the page may be given, e.g. from a text system
+            # run upstream or saved by a previous run, in the format of
+            # tools/infer/predict_system.py: [{"transcription", "points"}]
+            if data.get("ocr_result") is not None:
+                ocr_result = data["ocr_result"]
+            else:
+                ocr_result = [
+                    {"transcription": res[1][0], "points": res[0]}
+                    for res in self.ocr_engine.ocr(data["image"], cls=False)[0]
+                ]
             ocr_info = []
             for res in ocr_result:
                 ocr_info.append(
                     {
-                        "transcription": res[1][0],
-                        "bbox": self.trans_poly_to_bbox(res[0]),
-                        "points": res[0],
+                        "transcription": res["transcription"],
+                        "bbox": self.trans_poly_to_bbox(res["points"]),
+                        "points": res["points"],
                     }
                 )
             return ocr_info
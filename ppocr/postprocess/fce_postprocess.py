@@ -16,11 +16,12 @@ This code is refer from:
 https://github.com/open-mmlab/mmocr/blob/v0.3.0/mmocr/models/textdet/postprocess/wrapper.py
 """
 
+import functools
+
 import cv2
 import paddle
 import numpy as np
-from numpy.fft import ifft
-from ppocr.utils.poly_nms import poly_nms, valid_boundary
+from ppocr.utils.poly_nms import PolygonSet, boundary_iou, poly_nms, valid_boundary
 
 
 def fill_hole(input_mask):
@@ -36,6 +37,18 @@ def fill_hole(input_mask):
     return ~canvas | input_mask
 
 
+@functools.lru_cache(maxsize=16)
+def fourier_basis(fourier_degree, num_reconstr_points):
+    """Inverse DFT basis mapping coefficients of frequencies -k..k to
+    num_reconstr_points contour points, shaped (2k+1, num_reconstr_points).
+    """
+    freqs = np.arange(-fourier_degree, fourier_degree + 1).reshape(-1, 1)
+    points = np.arange(num_reconstr_points).reshape(1, -1)
+    basis = np.exp(2j * np.pi * freqs * points / num_reconstr_points)
+    basis.setflags(write=False)
+    return basis
+
+
 def fourier2poly(fourier_coeff, num_reconstr_points=50):
     """Inverse Fourier transform
     Args:
@@ -47,13 +60,10 @@ def fourier2poly(fourier_coeff, num_reconstr_points=50):
         Polygons (ndarray): The reconstructed polygons shaped (n, n')
     """
 
-    a = np.zeros((len(fourier_coeff), num_reconstr_points), dtype="complex")
     k = (len(fourier_coeff[0]) - 1) // 2
-
-    a[:, 0 : k + 1] = fourier_coeff[:, k:]
-    a[:, -k:] = fourier_coeff[:, :k]
-
-    poly_complex = ifft(a) * num_reconstr_points
+    poly_complex = np.asarray(fourier_coeff, dtype="complex") @ fourier_basis(
+        k, num_reconstr_points
+    )
     polygon = np.zeros((len(fourier_coeff), num_reconstr_points, 2))
     polygon[:, :, 0] = poly_complex.real
     polygon[:, :, 1] = poly_complex.imag
@@ -213,27 +223,40 @@ class FCEPostProcess(object):
             tr_mask.astype(np.uint8), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
         )  # opencv4
 
-        mask = np.zeros_like(tr_mask)
+        # contours of a hole-filled mask are disjoint, so one label map
+        # rasterizes the region of every contour
+        label_map = np.zeros(tr_mask.shape, dtype=np.int32)
+        for idx, cont in enumerate(tr_contours):
+            cv2.drawContours(label_map, [cont], -1, idx + 1, -1)
+
+        score_mask = (label_map > 0) & (score_pred > 0)
+        if not score_mask.any():
+            return []
+        labels = label_map[score_mask]
+        xy_text = np.argwhere(score_mask)
+        dxy = xy_text[:, 1] + xy_text[:, 0] * 1j
+
+        x, y = x_pred[score_mask], y_pred[score_mask]
+        c = x + y * 1j
+        c[:, fourier_degree] = c[:, fourier_degree] + dxy
+        c *= scale
+
+        polygons = fourier2poly(c, num_reconstr_points)
+        score = score_pred[score_mask].reshape(-1, 1)
+        candidates = np.hstack((polygons, score))
+
+        poly_set = PolygonSet(
+            polygons.reshape((len(polygons), -1, 2)),
+            lambda i, j: boundary_iou(candidates[i][:-1], candidates[j][:-1]),
+        )
+        # per contour nms, visiting candidates from the highest score and
+        # breaking ties like the stable sort of poly_nms
+        order = np.lexsort((np.arange(len(labels)), score[:, 0], labels))
+        splits = np.nonzero(np.diff(labels[order]))[0] + 1
         boundaries = []
-        for cont in tr_contours:
-            deal_map = mask.copy().astype(np.int8)
-            cv2.drawContours(deal_map, [cont], -1, 1, -1)
-
-            score_map = score_pred * deal_map
-            score_mask = score_map > 0
-            xy_text = np.argwhere(score_mask)
-            dxy = xy_text[:, 1] + xy_text[:, 0] * 1j
-
-            x, y = x_pred[score_mask], y_pred[score_mask]
-            c = x + y * 1j
-            c[:, fourier_degree] = c[:, fourier_degree] + dxy
-            c *= scale
-
-            polygons = fourier2poly(c, num_reconstr_points)
-            score = score_map[score_mask].reshape(-1, 1)
-            polygons = poly_nms(np.hstack((polygons, score)).tolist(), nms_thr)
-
-            boundaries = boundaries + polygons
+        for group in np.split(order, splits):
+            keep = poly_set.nms(group[::-1], nms_thr)
+            boundaries = boundaries + candidates[keep].tolist()
 
         boundaries = poly_nms(boundaries, nms_thr)
 
@@ -6,6 +6,8 @@ This code is referred from: https://github.com/songdejia/EAST/blob/master/locali
 import numpy as np
 from shapely.geometry import Polygon
 
+from ppocr.utils.poly_nms import PolygonSet
+
 
 def intersection(g, p):
     """
@@ -52,19 +54,24 @@ def weighted_merge(g, p):
     return g
 
 
-def standard_nms(S, thres):
+def quad_nms_inds(S, thres):
     """
-    Standard nms.
+    Greedy nms over N x 9 quads, batched through PolygonSet.
     """
     order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
+    if order.size == 0:
+        return []
+    poly_set = PolygonSet(
+        S[:, :8].reshape((-1, 4, 2)), lambda i, j: intersection(S[i], S[j])
+    )
+    return poly_set.nms(order, thres)
 
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
+
+def standard_nms(S, thres):
+    """
+    Standard nms.
+    """
+    keep = quad_nms_inds(S, thres)
 
     return S[keep]
 
@@ -73,15 +80,7 @@ def standard_nms_inds(S, thres):
     """
     Standard nms, return inds.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
+    keep = quad_nms_inds(S, thres)
 
     return keep
 
@@ -90,15 +89,7 @@ def nms(S, thres):
     """
     nms.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
+    keep = quad_nms_inds(S, thres)
 
     return keep
 
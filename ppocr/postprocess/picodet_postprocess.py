@@ -48,6 +48,73 @@ def hard_nms(box_scores, iou_threshold, top_k=-1, candidate_size=200):
     return box_scores[picked, :]
 
 
+def multiclass_nms(
+    bboxes, confidences, score_threshold, iou_threshold, top_k=-1, candidate_size=200
+):
+    """
+    Hard nms of the boxes of all classes at once, the result is the same as
+    hard_nms run on the boxes of every class. The candidates of all classes
+    are selected and sorted in one pass. With the boxes offset by class, the
+    IoU matrix of the candidates would be block diagonal, so only the blocks
+    of every class are computed, once, instead of an IoU per picked box.
+    Args:
+        bboxes (N, 4): boxes in corner-form.
+        confidences (N, C): probabilities of the classes.
+        score_threshold: the candidates of a class have a probability above it.
+        iou_threshold: intersection over union threshold.
+        top_k: keep top_k results per class. If k <= 0, keep all the results.
+        candidate_size: only consider the candidates of a class with the
+            highest scores.
+    Returns:
+        box_probs (M, 5): the kept boxes and probabilities, by class and by
+            descending probability within a class.
+        labels (M): the classes of the kept boxes.
+    """
+    box_ids, labels = np.nonzero(confidences > score_threshold)
+    probs = confidences[box_ids, labels]
+    order = np.lexsort((-probs, labels))
+    box_ids, labels, probs = box_ids[order], labels[order], probs[order]
+    class_begs = np.flatnonzero(np.diff(labels, prepend=-1))
+    class_ends = np.append(class_begs[1:], len(labels))
+
+    picked = []
+    for beg, end in zip(class_begs, class_ends):
+        end = min(end, beg + candidate_size)
+        boxes = bboxes[box_ids[beg:end]]
+        suppressed = iou_matrix(boxes) > iou_threshold
+        indexes = np.arange(end - beg)
+        num_picked = 0
+        while len(indexes) > 0:
+            current = indexes[0]
+            picked.append(beg + current)
+            num_picked += 1
+            if num_picked == top_k:
+                break
+            indexes = indexes[1:]
+            indexes = indexes[~suppressed[current, indexes]]
+    box_probs = np.concatenate(
+        [bboxes[box_ids[picked]], probs[picked, None]], axis=1
+    ).reshape(-1, 5)
+    return box_probs, labels[picked]
+
+
+def iou_matrix(boxes, eps=1e-5):
+    """Return the IoUs of all pairs of boxes, iou_matrix(boxes)[i] is the same
+    as iou_of(boxes, boxes[i:i+1]).
+    Args:
+        boxes (N, 4): boxes in corner-form.
+        eps: a small number to avoid 0 as denominator.
+    Returns:
+        iou (N, N): IoU values.
+    """
+    x1, y1, x2, y2 = [coord[:, None] for coord in boxes.T]
+    overlap_w = np.clip(np.minimum(x2, x2.T) - np.maximum(x1, x1.T), 0.0, None)
+    overlap_h = np.clip(np.minimum(y2, y2.T) - np.maximum(y1, y1.T), 0.0, None)
+    overlap_area = overlap_w * overlap_h
+    area = np.clip(x2 - x1, 0.0, None) * np.clip(y2 - y1, 0.0, None)
+    return overlap_area / (area.T + area - overlap_area + eps)
+
+
 def iou_of(boxes0, boxes1, eps=1e-5):
     """Return intersection-over-union (Jaccard index) of boxes.
     Args:
@@ -159,125 +226,130 @@ class PicoDetPostProcess(object):
         scale_factor = np.array([im_scale_y, im_scale_x], dtype=np.float32)
         img_shape = np.array(img.shape[2:], dtype=np.float32)
 
-        input_shape = np.array(img).astype("float32").shape[2:]
+        input_shape = img.shape[2:]
         ori_shape = np.array((img_shape,)).astype("float32")
         scale_factor = np.array((scale_factor,)).astype("float32")
         return ori_shape, input_shape, scale_factor
 
+    def decode(self, raw_boxes, scores, batch_id, centers, reg_max):
+        """Decode the boxes and scores of the top candidates of every stride."""
+        decode_boxes = []
+        select_scores = []
+        reg_range = np.arange(reg_max + 1)
+        for stride, center, box_distribute, score in zip(
+            self.strides, centers, raw_boxes, scores
+        ):
+            box_distribute = box_distribute[batch_id]
+            score = score[batch_id]
+
+            # box distribution to distance
+            box_distance = box_distribute.reshape((-1, reg_max + 1))
+            box_distance = softmax(box_distance, axis=1)
+            box_distance = box_distance * np.expand_dims(reg_range, axis=0)
+            box_distance = np.sum(box_distance, axis=1).reshape((-1, 4))
+            box_distance = box_distance * stride
+
+            # top K candidate
+            topk_idx = np.argsort(score.max(axis=1))[::-1]
+            topk_idx = topk_idx[: self.nms_top_k]
+            center = center[topk_idx]
+            score = score[topk_idx]
+            box_distance = box_distance[topk_idx]
+
+            # decode box
+            decode_box = center + [-1, -1, 1, 1] * box_distance
+
+            select_scores.append(score)
+            decode_boxes.append(decode_box)
+        return np.concatenate(decode_boxes, axis=0), np.concatenate(
+            select_scores, axis=0
+        )
+
     def __call__(self, ori_img, img, preds):
+        """
+        Args:
+            ori_img: the original image, or the list of the original images
+                of a batch.
+            img (B, C, H, W): the network input.
+            preds: the scores and the box distributions of every stride.
+        Returns:
+            the layout regions of the image, a list of them per image when
+            ori_img is a list.
+        """
+        ori_imgs = ori_img if isinstance(ori_img, list) else [ori_img]
         scores, raw_boxes = preds["boxes"], preds["boxes_num"]
-        batch_size = raw_boxes[0].shape[0]
         reg_max = int(raw_boxes[0].shape[-1] / 4 - 1)
-        out_boxes_num = []
-        out_boxes_list = []
-        results = []
-        ori_shape, input_shape, scale_factor = self.img_info(ori_img, img)
-
-        for batch_id in range(batch_size):
-            # generate centers
-            decode_boxes = []
-            select_scores = []
-            for stride, box_distribute, score in zip(self.strides, raw_boxes, scores):
-                box_distribute = box_distribute[batch_id]
-                score = score[batch_id]
-                # centers
-                fm_h = input_shape[0] / stride
-                fm_w = input_shape[1] / stride
-                h_range = np.arange(fm_h)
-                w_range = np.arange(fm_w)
-                ww, hh = np.meshgrid(w_range, h_range)
-                ct_row = (hh.flatten() + 0.5) * stride
-                ct_col = (ww.flatten() + 0.5) * stride
-                center = np.stack((ct_col, ct_row, ct_col, ct_row), axis=1)
-
-                # box distribution to distance
-                reg_range = np.arange(reg_max + 1)
-                box_distance = box_distribute.reshape((-1, reg_max + 1))
-                box_distance = softmax(box_distance, axis=1)
-                box_distance = box_distance * np.expand_dims(reg_range, axis=0)
-                box_distance = np.sum(box_distance, axis=1).reshape((-1, 4))
-                box_distance = box_distance * stride
-
-                # top K candidate
-                topk_idx = np.argsort(score.max(axis=1))[::-1]
-                topk_idx = topk_idx[: self.nms_top_k]
-                center = center[topk_idx]
-                score = score[topk_idx]
-                box_distance = box_distance[topk_idx]
-
-                # decode box
-                decode_box = center + [-1, -1, 1, 1] * box_distance
-
-                select_scores.append(score)
-                decode_boxes.append(decode_box)
-
-            # nms
-            bboxes = np.concatenate(decode_boxes, axis=0)
-            confidences = np.concatenate(select_scores, axis=0)
-            picked_box_probs = []
-            picked_labels = []
-            for class_index in range(0, confidences.shape[1]):
-                probs = confidences[:, class_index]
-                mask = probs > self.score_threshold
-                probs = probs[mask]
-                if probs.shape[0] == 0:
-                    continue
-                subset_boxes = bboxes[mask, :]
-                box_probs = np.concatenate([subset_boxes, probs.reshape(-1, 1)], axis=1)
-                box_probs = hard_nms(
-                    box_probs,
-                    iou_threshold=self.nms_threshold,
-                    top_k=self.keep_top_k,
-                )
-                picked_box_probs.append(box_probs)
-                picked_labels.extend([class_index] * box_probs.shape[0])
-
-            if len(picked_box_probs) == 0:
-                out_boxes_list.append(np.empty((0, 4)))
-                out_boxes_num.append(0)
-
-            else:
-                picked_box_probs = np.concatenate(picked_box_probs)
+        input_shape = img.shape[2:]
+
+        # the centers of the anchors only depend on the input shape
+        centers = []
+        for stride in self.strides:
+            fm_h = input_shape[0] / stride
+            fm_w = input_shape[1] / stride
+            ww, hh = np.meshgrid(np.arange(fm_w), np.arange(fm_h))
+            ct_row = (hh.flatten() + 0.5) * stride
+            ct_col = (ww.flatten() + 0.5) * stride
+            centers.append(np.stack((ct_col, ct_row, ct_col, ct_row), axis=1))
+
+        batch_results = []
+        for batch_id, image in enumerate(ori_imgs):
+            ori_shape, _, scale_factor = self.img_info(image, img)
+            bboxes, confidences = self.decode(
+                raw_boxes, scores, batch_id, centers, reg_max
+            )
+            picked_box_probs, picked_labels = multiclass_nms(
+                bboxes,
+                confidences,
+                self.score_threshold,
+                self.nms_threshold,
+                top_k=self.keep_top_k,
+            )
 
+            results = []
+            if len(picked_labels) > 0:
                 # resize output boxes
                 picked_box_probs[:, :4] = self.warp_boxes(
-                    picked_box_probs[:, :4], ori_shape[batch_id]
+                    picked_box_probs[:, :4], ori_shape[0]
                 )
                 im_scale = np.concatenate(
-                    [scale_factor[batch_id][::-1], scale_factor[batch_id][::-1]]
+                    [scale_factor[0][::-1], scale_factor[0][::-1]]
                 )
                 picked_box_probs[:, :4] /= im_scale
-                # clas score box
-                out_boxes_list.append(
-                    np.concatenate(
-                        [
-                            np.expand_dims(np.array(picked_labels), axis=-1),
-                            np.expand_dims(picked_box_probs[:, 4], axis=-1),
-                            picked_box_probs[:, :4],
-                        ],
-                        axis=1,
+                for clsid, box_prob in zip(picked_labels, picked_box_probs):
+                    results.append(
+                        {
+                            "bbox": box_prob[:4],
+                            "label": self.labels[int(clsid)],
+                            "score": box_prob[4],
+                        }
                     )
-                )
-                out_boxes_num.append(len(picked_labels))
-
-        out_boxes_list = np.concatenate(out_boxes_list, axis=0)
-        out_boxes_num = np.asarray(out_boxes_num).astype(np.int32)
-
-        for dt in out_boxes_list:
-            clsid, bbox, score = int(dt[0]), dt[2:], dt[1]
-            label = self.labels[clsid]
-            result = {"bbox": bbox, "label": label, "score": score}
-            results.append(result)
-
-        # Handle conflict where a box is simultaneously recognized as multiple labels.
-        # Use IoU to find similar boxes. Prioritize labels as table, text, and others when deduplicate similar boxes.
+            batch_results.append(self.remove_duplicates(results))
+
+        if isinstance(ori_img, list):
+            return batch_results
+        return batch_results[0]
+
+    def remove_duplicates(self, results):
+        """
+        Handle conflict where a box is simultaneously recognized as multiple
+        labels. Use containment to find similar boxes. Prioritize labels as
+        table, text, and others when deduplicate similar boxes.
+        """
+        if len(results) == 0:
+            return results
         bboxes = np.array([x["bbox"] for x in results])
-        duplicate_idx = list()
+        # containments[i] == calculate_containment(bboxes, bboxes[i])
+        overlap_left_top = np.maximum(bboxes[None, :, :2], bboxes[:, None, :2])
+        overlap_right_bottom = np.minimum(bboxes[None, :, 2:], bboxes[:, None, 2:])
+        overlap_area = area_of(overlap_left_top, overlap_right_bottom)
+        area = area_of(bboxes[:, :2], bboxes[:, 2:])
+        containments = overlap_area / np.minimum(area[None, :], area[:, None])
+
+        duplicate_idx = set()
         for i in range(len(results)):
             if i in duplicate_idx:
                 continue
-            containments = calculate_containment(bboxes, bboxes[i, ...])
-            overlaps = np.where(containments > 0.5)[0]
+            overlaps = np.where(containments[i] > 0.5)[0]
             if len(overlaps) > 1:
                 table_box = [x for x in overlaps if results[x]["label"] == "table"]
                 if len(table_box) > 0:
@@ -292,6 +364,5 @@ class PicoDetPostProcess(object):
                         key=lambda x: x[1]["score"],
                         reverse=True,
                     )[0][0]
-                duplicate_idx.extend([x for x in overlaps if x != keep])
-        results = [x for i, x in enumerate(results) if i not in duplicate_idx]
-        return results
+                duplicate_idx.update(x for x in overlaps if x != keep)
+        return [x for i, x in enumerate(results) if i not in duplicate_idx]
@@ -11,23 +11,22 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import sys
-import os
-import subprocess
+"""
+Progressive scale expansion kernels.
 
-python_path = sys.executable
+The Cython kernel in pse.pyx is used when it has been built beforehand with
+`python3 setup.py build_ext --inplace` in this directory; otherwise the pure
+numpy/OpenCV implementation in pse_numpy.py is used. Nothing is compiled at
+import time.
+"""
 
-ori_path = os.getcwd()
-os.chdir("ppocr/postprocess/pse_postprocess/pse")
-if (
-    subprocess.call("{} setup.py build_ext --inplace".format(python_path), shell=True)
-    != 0
-):
-    raise RuntimeError(
-        "Cannot compile pse: {}, if your system is windows, you need to install all the default components of `desktop development using C++` in visual studio 2019+".format(
-            os.path.dirname(os.path.realpath(__file__))
-        )
-    )
-os.chdir(ori_path)
+from .pse_numpy import pse as pse_numpy
 
-from .pse import pse
+try:
+    from .pse import pse as pse_cython
+except (ImportError, ValueError):
+    pse_cython = None
+
+pse = pse_cython if pse_cython is not None else pse_numpy
+
+__all__ = ["pse", "pse_numpy", "pse_cython"]
@@ -0,0 +1,96 @@
+# copyright (c) 2020 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pure numpy/OpenCV progressive scale expansion, a drop-in replacement for the
+Cython kernel in pse.pyx.
+
+The queue of pse.pyx is processed one BFS generation at a time: every pixel of
+the current generation proposes its 4 neighbours in queue order and the first
+proposal for a free kernel pixel wins, which is exactly the claim order of the
+sequential FIFO. Pixels that claimed nothing are kept as the seeds of the next
+kernel, in the order the queue visited them.
+"""
+
+import cv2
+import numpy as np
+
+# same neighbour order as pse.pyx: up, down, left, right
+_DX = np.array([-1, 1, 0, 0], dtype=np.int64)
+_DY = np.array([0, 0, -1, 1], dtype=np.int64)
+
+
+def _expand(kernel, pred, queue, height, width):
+    """Expand labelled pixels into one kernel.
+
+    Args:
+        kernel (ndarray): Flattened uint8 kernel map of size height * width.
+        pred (ndarray): Flattened int32 label map, updated in place.
+        queue (ndarray): Flat pixel indices in FIFO order.
+
+    Returns:
+        edges (ndarray): Pixels that claimed no neighbour, in FIFO order.
+    """
+    edges = []
+    while len(queue) > 0:
+        rows, cols = np.divmod(queue, width)
+        nx = rows[:, None] + _DX[None, :]
+        ny = cols[:, None] + _DY[None, :]
+        inside = (nx >= 0) & (nx < height) & (ny >= 0) & (ny < width)
+        target = np.where(inside, nx * width + ny, 0)
+        free = inside & (kernel[target] != 0) & (pred[target] == 0)
+
+        # proposals are ordered by queue position, then neighbour order
+        src, direction = np.nonzero(free)
+        target = target[src, direction]
+        _, first = np.unique(target, return_index=True)
+        first.sort()
+        winners = src[first]
+        claimed = target[first]
+        pred[claimed] = pred[queue[winners]]
+
+        grown = np.zeros((len(queue),), dtype=bool)
+        grown[winners] = True
+        edges.append(queue[~grown])
+        queue = claimed
+    if not edges:
+        return queue
+    return np.concatenate(edges)
+
+
+def pse(kernels, min_area):
+    """Progressive scale expansion.
+
+    Args:
+        kernels (ndarray): uint8 kernels shaped (n, h, w), from the largest
+            text region to the smallest kernel.
+        min_area (float): Seed components smaller than it are dropped.
+
+    Returns:
+        pred (ndarray): int32 label map shaped (h, w).
+    """
+    kernel_num, height, width = kernels.shape
+    label_num, label = cv2.connectedComponents(kernels[-1], connectivity=4)
+    label = label.astype(np.int32)
+    if label_num > 1:
+        areas = np.bincount(label.ravel(), minlength=label_num)
+        small = areas < min_area
+        small[0] = False
+        label[small[label]] = 0
+
+    pred = label.ravel().copy()
+    queue = np.flatnonzero(pred)
+    for kernel_idx in range(kernel_num - 2, -1, -1):
+        kernel = np.ascontiguousarray(kernels[kernel_idx]).ravel()
+        queue = _expand(kernel, pred, queue, height, width)
+    return pred.reshape(height, width)
@@ -19,6 +19,8 @@ from paddle.nn import functional as F
 import re
 import json
 
+from ppocr.utils.character_table import get_character_table, load_character_dict
+
 
 class BaseRecLabelDecode(object):
     """Convert between text-label and text-index"""
@@ -31,24 +33,20 @@ class BaseRecLabelDecode(object):
 
         if character_dict_path is None:
             self.character_str = "0123456789abcdefghijklmnopqrstuvwxyz"
-            dict_character = list(self.character_str)
+            characters = tuple(self.character_str)
+            source = None
         else:
-            with open(character_dict_path, "rb") as fin:
-                lines = fin.readlines()
-                for line in lines:
-                    line = line.decode("utf-8").strip("\n").strip("\r\n")
-                    self.character_str.append(line)
-            if use_space_char:
-                self.character_str.append(" ")
-            dict_character = list(self.character_str)
+            characters = load_character_dict(character_dict_path, use_space_char)
+            self.character_str = characters
+            source = (character_dict_path, use_space_char)
             if "arabic" in character_dict_path:
                 self.reverse = True
 
-        dict_character = self.add_special_char(dict_character)
-        self.dict = {}
-        for i, char in enumerate(dict_character):
-            self.dict[char] = i
-        self.character = dict_character
+        dict_character = self.add_special_char(list(characters))
+        # shared with every decoder built from the same dict and special tokens
+        self.character_table = get_character_table(characters, dict_character, source)
+        self.dict = self.character_table.index
+        self.character = self.character_table.characters
 
     def pred_reverse(self, pred):
         pred_re = []
@@ -153,9 +151,9 @@ class BaseRecLabelDecode(object):
             for ignored_token in ignored_tokens:
                 selection &= text_index[batch_idx] != ignored_token
 
-            char_list = [
-                self.character[text_id] for text_id in text_index[batch_idx][selection]
-            ]
+            char_list = self.character_table.char_array[
+                np.asarray(text_index[batch_idx])[selection]
+            ].tolist()
             if text_prob is not None:
                 conf_list = text_prob[batch_idx][selection]
             else:
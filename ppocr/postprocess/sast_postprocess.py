@@ -62,12 +62,9 @@ class SASTPostProcess(object):
         Transfer vertical point_pairs into poly point in clockwise.
         """
         # construct poly
-        point_num = len(point_pair_list) * 2
-        point_list = [0] * point_num
-        for idx, point_pair in enumerate(point_pair_list):
-            point_list[idx] = point_pair[0]
-            point_list[point_num - 1 - idx] = point_pair[1]
-        return np.array(point_list).reshape(-1, 2)
+        point_pairs = np.asarray(point_pair_list).reshape(-1, 2, 2)
+        point_list = np.concatenate([point_pairs[:, 0], point_pairs[::-1, 1]])
+        return point_list.reshape(-1, 2)
 
     def shrink_quad_along_width(self, quad, begin_width_ratio=0.0, end_width_ratio=1.0):
         """
@@ -135,13 +132,15 @@ class SASTPostProcess(object):
         """
         compute area of a quad.
         """
-        edge = [
-            (quad[1][0] - quad[0][0]) * (quad[1][1] + quad[0][1]),
-            (quad[2][0] - quad[1][0]) * (quad[2][1] + quad[1][1]),
-            (quad[3][0] - quad[2][0]) * (quad[3][1] + quad[2][1]),
-            (quad[0][0] - quad[3][0]) * (quad[0][1] + quad[3][1]),
-        ]
-        return np.sum(edge) / 2.0
+        return self.quad_areas(quad[np.newaxis])[0]
+
+    def quad_areas(self, quads):
+        """
+        compute area of n quads shaped (n, 4, 2).
+        """
+        nxt = quads[:, [1, 2, 3, 0]]
+        edge = (nxt[:, :, 0] - quads[:, :, 0]) * (nxt[:, :, 1] + quads[:, :, 1])
+        return np.sum(edge, axis=1) / 2.0
 
     def nms(self, dets):
         if self.is_python35:
@@ -175,9 +174,9 @@ class SASTPostProcess(object):
         m = quads.shape[0]
         gt_tc = np.mean(quads, axis=1)  # (m, 2)
 
-        pred_tc_tile = np.tile(pred_tc[:, np.newaxis, :], (1, m, 1))  # (n, m, 2)
-        gt_tc_tile = np.tile(gt_tc[np.newaxis, :, :], (n, 1, 1))  # (n, m, 2)
-        dist_mat = np.linalg.norm(pred_tc_tile - gt_tc_tile, axis=2)  # (n, m)
+        dist_mat = np.linalg.norm(
+            pred_tc[:, np.newaxis, :] - gt_tc[np.newaxis, :, :], axis=2
+        )  # (n, m)
         xy_text_assign = np.argmin(dist_mat, axis=1) + 1  # (n,)
 
         instance_label_map[xy_text[:, 1], xy_text[:, 0]] = xy_text_assign
@@ -238,9 +237,7 @@ class SASTPostProcess(object):
         quads = dets[:, :-1].reshape(-1, 4, 2)
 
         # Compute quad area
-        quad_areas = []
-        for quad in quads:
-            quad_areas.append(-self.quad_area(quad))
+        quad_areas = -self.quad_areas(quads)
 
         # instance segmentation
         # instance_count, instance_label_map = cv2.connectedComponents(tcl_map.astype(np.uint8), connectivity=8)
@@ -248,10 +245,19 @@ class SASTPostProcess(object):
             tcl_map, tcl_map_thresh, quads, tco_map
         )
 
+        # group the tcl pixels of every instance in one scan, row-major order
+        instance_yx = np.argwhere(instance_label_map > 0)
+        instance_ids = instance_label_map[instance_yx[:, 0], instance_yx[:, 1]]
+        instance_yx = instance_yx[np.argsort(instance_ids, kind="stable")]
+        instance_sizes = np.bincount(instance_ids, minlength=instance_count)
+        instance_ends = np.cumsum(instance_sizes)
+
         # restore single poly with tcl instance.
         poly_list = []
         for instance_idx in range(1, instance_count):
-            xy_text = np.argwhere(instance_label_map == instance_idx)[:, ::-1]
+            xy_text = instance_yx[
+                instance_ends[instance_idx - 1] : instance_ends[instance_idx], ::-1
+            ]
             quad = quads[instance_idx - 1]
             q_area = quad_areas[instance_idx - 1]
             if q_area < 5:
@@ -302,28 +308,26 @@ class SASTPostProcess(object):
                 ).astype(np.int32)
             ]
 
-            point_pair_list = []
-            for x, y in xy_center_line:
-                # get corresponding offset
-                offset = tbo_map[y, x, :].reshape(2, 2)
-                if offset_expand != 1.0:
-                    offset_length = np.linalg.norm(offset, axis=1, keepdims=True)
-                    expand_length = np.clip(
-                        offset_length * (offset_expand - 1), a_min=0.5, a_max=3.0
-                    )
-                    offset_detal = offset / offset_length * expand_length
-                    offset = offset + offset_detal
-                    # original point
-                ori_yx = np.array([y, x], dtype=np.float32)
-                point_pair = (
-                    (ori_yx + offset)[:, ::-1]
-                    * out_strid
-                    / np.array([ratio_w, ratio_h]).reshape(-1, 2)
+            # get corresponding offset of all sampled points, (k, 2, 2)
+            xs, ys = xy_center_line[:, 0], xy_center_line[:, 1]
+            offset = tbo_map[ys, xs, :].reshape(-1, 2, 2)
+            if offset_expand != 1.0:
+                offset_length = np.linalg.norm(offset, axis=2, keepdims=True)
+                expand_length = np.clip(
+                    offset_length * (offset_expand - 1), a_min=0.5, a_max=3.0
                 )
-                point_pair_list.append(point_pair)
+                offset_detal = offset / offset_length * expand_length
+                offset = offset + offset_detal
+            # original point
+            ori_yx = xy_center_line[:, ::-1].astype(np.float32)[:, np.newaxis, :]
+            point_pairs = (
+                (ori_yx + offset)[:, :, ::-1]
+                * out_strid
+                / np.array([ratio_w, ratio_h]).reshape(1, -1, 2)
+            )
 
             # ndarry: (x, 2), expand poly along width
-            detected_poly = self.point_pair2poly(point_pair_list)
+            detected_poly = self.point_pair2poly(point_pairs)
             detected_poly = self.expand_poly_along_width(
                 detected_poly, shrink_ratio_of_width
             )
@@ -15,6 +15,7 @@
 import numpy as np
 import paddle
 
+from ppocr.utils.character_table import get_character_table, load_character_dict
 from .rec_postprocess import AttnLabelDecode
 
 
@@ -22,24 +23,22 @@ class TableLabelDecode(AttnLabelDecode):
     """ """
 
     def __init__(self, character_dict_path, merge_no_span_structure=False, **kwargs):
-        dict_character = []
-        with open(character_dict_path, "rb") as fin:
-            lines = fin.readlines()
-            for line in lines:
-                line = line.decode("utf-8").strip("\n").strip("\r\n")
-                dict_character.append(line)
-
+        characters = load_character_dict(character_dict_path)
         if merge_no_span_structure:
+            dict_character = list(characters)
             if "<td></td>" not in dict_character:
                 dict_character.append("<td></td>")
             if "<td>" in dict_character:
                 dict_character.remove("<td>")
-
-        dict_character = self.add_special_char(dict_character)
-        self.dict = {}
-        for i, char in enumerate(dict_character):
-            self.dict[char] = i
-        self.character = dict_character
+            characters = tuple(dict_character)
+            source = None
+        else:
+            source = (character_dict_path, False)
+
+        dict_character = self.add_special_char(list(characters))
+        self.character_table = get_character_table(characters, dict_character, source)
+        self.dict = self.character_table.index
+        self.character = self.character_table.characters
         self.td_token = ["<td>", "<td", "<td></td>"]
 
     def __call__(self, preds, batch=None):
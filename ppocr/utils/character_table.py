@@ -0,0 +1,157 @@
+# copyright (c) 2020 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Process-wide cache of parsed character dictionaries.
+
+Label decoders built from the same dictionary file share one immutable
+CharacterTable instead of re-reading the file and rebuilding the char -> index
+map on every construction. Entries are keyed by the dictionary path,
+use_space_char and the special tokens a decoder wraps around the characters,
+and are reloaded when the file's mtime or size changes.
+"""
+
+import os
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+__all__ = [
+    "CharacterTable",
+    "load_character_dict",
+    "get_character_table",
+    "clear_character_table_cache",
+]
+
+_lock = threading.Lock()
+# (path, use_space_char) -> (stamp, characters)
+_dict_cache = {}
+# (source, prefix tokens, suffix tokens) -> (characters, CharacterTable)
+_table_cache = {}
+
+
+class CharacterTable(object):
+    """Immutable character table.
+
+    Attributes:
+        characters (tuple): Index -> character.
+        index (Mapping): Read-only character -> index map. Duplicated
+            characters map to their last index.
+        char_array (ndarray): Read-only object array of the characters, so a
+            whole index sequence is decoded with one fancy-indexing call.
+    """
+
+    __slots__ = ("characters", "index", "char_array")
+
+    def __init__(self, characters):
+        characters = tuple(characters)
+        char_array = np.empty((len(characters),), dtype=object)
+        char_array[:] = characters
+        char_array.setflags(write=False)
+        object.__setattr__(self, "characters", characters)
+        object.__setattr__(
+            self, "index", MappingProxyType({c: i for i, c in enumerate(characters)})
+        )
+        object.__setattr__(self, "char_array", char_array)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CharacterTable is immutable")
+
+    def __len__(self):
+        return len(self.characters)
+
+    def decode(self, text_index):
+        """Join the characters of an index sequence into a string."""
+        return "".join(self.char_array[np.asarray(text_index, dtype=np.int64)])
+
+
+def _file_stamp(character_dict_path):
+    stat = os.stat(character_dict_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_character_dict(character_dict_path, use_space_char=False):
+    """Read a character dictionary file, one character per line.
+
+    Returns:
+        characters (tuple): The characters, with a trailing space if
+            use_space_char is set. Cached until the file changes.
+    """
+    key = (os.path.realpath(character_dict_path), bool(use_space_char))
+    stamp = _file_stamp(character_dict_path)
+    cached = _dict_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    characters = []
+    with open(character_dict_path, "rb") as fin:
+        lines = fin.readlines()
+        for line in lines:
+            line = line.decode("utf-8").strip("\n").strip("\r\n")
+            characters.append(line)
+    if use_space_char:
+        characters.append(" ")
+    characters = tuple(characters)
+    with _lock:
+        _dict_cache[key] = (stamp, characters)
+    return characters
+
+
+def get_character_table(characters, dict_character, source=None):
+    """Get the shared table of dict_character.
+
+    Args:
+        characters (tuple): The characters returned by load_character_dict.
+        dict_character (list): characters wrapped by special tokens, as
+            returned by a decoder's add_special_char.
+        source (hashable): Identifies where characters come from, e.g. the
+            dictionary path and use_space_char. No caching when None.
+
+    Returns:
+        table (CharacterTable): The table of dict_character.
+    """
+    if source is None:
+        return CharacterTable(dict_character)
+
+    num = len(characters)
+    prefix = None
+    for start in range(len(dict_character) - num + 1):
+        if num > 0 and dict_character[start] is not characters[0]:
+            continue
+        if tuple(dict_character[start : start + num]) == characters:
+            prefix = start
+            break
+    if prefix is None:
+        # special tokens were not simply prepended and appended
+        return CharacterTable(dict_character)
+
+    key = (
+        source,
+        tuple(dict_character[:prefix]),
+        tuple(dict_character[prefix + num :]),
+    )
+    cached = _table_cache.get(key)
+    # a reloaded dictionary comes back as a new tuple
+    if cached is not None and cached[0] is characters:
+        return cached[1]
+    table = CharacterTable(dict_character)
+    with _lock:
+        _table_cache[key] = (characters, table)
+    return table
+
+
+def clear_character_table_cache():
+    with _lock:
+        _dict_cache.clear()
+        _table_cache.clear()
@@ -167,33 +167,32 @@ def sort_with_direction(pos_list, f_direction):
         point_direction = np.array(point_direction).reshape(-1, 2)
         average_direction = np.mean(point_direction, axis=0, keepdims=True)
         pos_proj_leng = np.sum(pos_list * average_direction, axis=1)
-        sorted_list = pos_list[np.argsort(pos_proj_leng)].tolist()
-        sorted_direction = point_direction[np.argsort(pos_proj_leng)].tolist()
-        return sorted_list, sorted_direction
+        order = np.argsort(pos_proj_leng)
+        return pos_list[order], point_direction[order]
 
     pos_list = np.array(pos_list).reshape(-1, 2)
     point_direction = f_direction[pos_list[:, 0], pos_list[:, 1]]  # x, y
     point_direction = point_direction[:, ::-1]  # x, y -> y, x
     sorted_point, sorted_direction = sort_part_with_direction(pos_list, point_direction)
+    # the halves are re-sorted with float64 directions, like the former
+    # list round trip did
+    sorted_direction = sorted_direction.astype(np.float64)
 
     point_num = len(sorted_point)
     if point_num >= 16:
         middle_num = point_num // 2
-        first_part_point = sorted_point[:middle_num]
-        first_point_direction = sorted_direction[:middle_num]
         sorted_fist_part_point, sorted_fist_part_direction = sort_part_with_direction(
-            first_part_point, first_point_direction
+            sorted_point[:middle_num], sorted_direction[:middle_num]
         )
-
-        last_part_point = sorted_point[middle_num:]
-        last_point_direction = sorted_direction[middle_num:]
         sorted_last_part_point, sorted_last_part_direction = sort_part_with_direction(
-            last_part_point, last_point_direction
+            sorted_point[middle_num:], sorted_direction[middle_num:]
+        )
+        sorted_point = np.concatenate([sorted_fist_part_point, sorted_last_part_point])
+        sorted_direction = np.concatenate(
+            [sorted_fist_part_direction, sorted_last_part_direction]
         )
-        sorted_point = sorted_fist_part_point + sorted_last_part_point
-        sorted_direction = sorted_fist_part_direction + sorted_last_part_direction
 
-    return sorted_point, np.array(sorted_direction)
+    return sorted_point.tolist(), sorted_direction
 
 
 def add_id(pos_list, image_id=0):
@@ -254,13 +253,31 @@ def sort_and_expand_with_direction(pos_list, f_direction):
     return all_list
 
 
+def extend_along_direction(start, step, max_append_num, binary_tcl_map):
+    """
+    Walk from start along step and collect the distinct pixels until the first
+    one that leaves the tcl map, skipping pixels past the bottom/right border.
+    """
+    h, w = binary_tcl_map.shape[:2]
+    offsets = np.arange(1, max_append_num + 1).reshape(-1, 1)
+    points = np.round(start + step * offsets).astype("int32")
+    if len(points) == 0:
+        return []
+    # rounded points of a ray are monotone, so repeats are always adjacent
+    repeated = np.zeros((len(points),), dtype=bool)
+    repeated[1:] = np.all(points[1:] == points[:-1], axis=1)
+    candidates = points[(points[:, 0] < h) & (points[:, 1] < w) & ~repeated]
+    on_tcl = binary_tcl_map[candidates[:, 0], candidates[:, 1]] > 0.5
+    stop = np.argmin(on_tcl) if not on_tcl.all() else len(candidates)
+    return [tuple(point) for point in candidates[:stop].tolist()]
+
+
 def sort_and_expand_with_direction_v2(pos_list, f_direction, binary_tcl_map):
     """
     f_direction: h x w x 2
     pos_list: [[y, x], [y, x], [y, x] ...]
     binary_tcl_map: h x w
     """
-    h, w, _ = f_direction.shape
     sorted_list, point_direction = sort_with_direction(pos_list, f_direction)
 
     point_num = len(sorted_list)
@@ -281,33 +298,12 @@ def sort_and_expand_with_direction_v2(pos_list, f_direction, binary_tcl_map):
     append_num = max(int((left_average_len + right_average_len) / 2.0 * 0.15), 1)
     max_append_num = 2 * append_num
 
-    left_list = []
-    right_list = []
-    for i in range(max_append_num):
-        ly, lx = (
-            np.round(left_start + left_step * (i + 1))
-            .flatten()
-            .astype("int32")
-            .tolist()
-        )
-        if ly < h and lx < w and (ly, lx) not in left_list:
-            if binary_tcl_map[ly, lx] > 0.5:
-                left_list.append((ly, lx))
-            else:
-                break
-
-    for i in range(max_append_num):
-        ry, rx = (
-            np.round(right_start + right_step * (i + 1))
-            .flatten()
-            .astype("int32")
-            .tolist()
-        )
-        if ry < h and rx < w and (ry, rx) not in right_list:
-            if binary_tcl_map[ry, rx] > 0.5:
-                right_list.append((ry, rx))
-            else:
-                break
+    left_list = extend_along_direction(
+        left_start, left_step, max_append_num, binary_tcl_map
+    )
+    right_list = extend_along_direction(
+        right_start, right_step, max_append_num, binary_tcl_map
+    )
 
     all_list = left_list[::-1] + sorted_list + right_list
     return all_list
@@ -317,12 +313,9 @@ def point_pair2poly(point_pair_list):
     """
     Transfer vertical point_pairs into poly point in clockwise.
     """
-    point_num = len(point_pair_list) * 2
-    point_list = [0] * point_num
-    for idx, point_pair in enumerate(point_pair_list):
-        point_list[idx] = point_pair[0]
-        point_list[point_num - 1 - idx] = point_pair[1]
-    return np.array(point_list).reshape(-1, 2)
+    point_pairs = np.asarray(point_pair_list).reshape(-1, 2, 2)
+    point_list = np.concatenate([point_pairs[:, 0], point_pairs[::-1, 1]])
+    return point_list.reshape(-1, 2)
 
 
 def shrink_quad_along_width(quad, begin_width_ratio=0.0, end_width_ratio=1.0):
@@ -378,18 +371,17 @@ def restore_poly(
         if valid_set == "totaltext":
             offset_expand = 1.2
 
-        point_pair_list = []
-        for y, x in yx_center_line:
-            offset = p_border[:, y, x].reshape(2, 2) * offset_expand
-            ori_yx = np.array([y, x], dtype=np.float32)
-            point_pair = (
-                (ori_yx + offset)[:, ::-1]
-                * 4.0
-                / np.array([ratio_w, ratio_h]).reshape(-1, 2)
-            )
-            point_pair_list.append(point_pair)
+        yx_center_line = np.array(yx_center_line).reshape(-1, 2)
+        ys, xs = yx_center_line[:, 0], yx_center_line[:, 1]
+        offset = p_border[:, ys, xs].T.reshape(-1, 2, 2) * offset_expand
+        ori_yx = yx_center_line.astype(np.float32)[:, np.newaxis, :]
+        point_pairs = (
+            (ori_yx + offset)[:, :, ::-1]
+            * 4.0
+            / np.array([ratio_w, ratio_h]).reshape(1, -1, 2)
+        )
 
-        detected_poly = point_pair2poly(point_pair_list)
+        detected_poly = point_pair2poly(point_pairs)
         detected_poly = expand_poly_along_width(
             detected_poly, shrink_ratio_of_width=0.2
         )
@@ -409,6 +401,18 @@ def restore_poly(
     return poly_list, keep_str_list
 
 
+def group_pos_by_label(label_map, label_num):
+    """
+    Collect the [y, x] pixels of every label 1..label_num-1 in row-major order
+    with a single scan of the label map.
+    """
+    pos = np.argwhere(label_map > 0)
+    labels = label_map[pos[:, 0], pos[:, 1]]
+    pos = pos[np.argsort(labels, kind="stable")]
+    counts = np.bincount(labels, minlength=label_num)[1:label_num]
+    return np.split(pos, np.cumsum(counts)[:-1])
+
+
 def generate_pivot_list_fast(
     p_score,
     p_char_maps,
@@ -431,11 +435,7 @@ def generate_pivot_list_fast(
     # get TCL Instance
     all_pos_yxs = []
     if instance_count > 0:
-        for instance_id in range(1, instance_count):
-            pos_list = []
-            ys, xs = np.where(instance_label_map == instance_id)
-            pos_list = list(zip(ys, xs))
-
+        for pos_list in group_pos_by_label(instance_label_map, instance_count):
             if len(pos_list) < 3:
                 continue
 
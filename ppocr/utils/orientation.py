@@ -0,0 +1,119 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Cheap orientation checks, to skip the orientation classifiers on pages and
+text boxes that are upright beyond doubt. The checks only ever answer "upright"
+or "unknown", the classifier decides the unknown cases.
+"""
+
+import cv2
+import numpy as np
+
+__all__ = ["text_line_bands", "is_upright_page", "is_upright_box"]
+
+
+def text_line_bands(binary, min_ink=0.02, min_height=4, max_height=None):
+    """Rows [y1, y2) of the horizontal bands of ink of a binary image, cut at
+    the rows with less than min_ink of their pixels set."""
+    on = np.concatenate([[False], binary.mean(axis=1) > min_ink, [False]])
+    edges = np.flatnonzero(on[1:] != on[:-1])
+    bands = []
+    for y1, y2 in zip(edges[0::2], edges[1::2]):
+        if y2 - y1 < min_height or (max_height is not None and y2 - y1 > max_height):
+            continue
+        bands.append((y1, y2))
+    return bands
+
+
+def _line_vote(band, margin=1.5):
+    """1 if a line of text looks upright, -1 if upside down, 0 if unsure.
+
+    Latin-like scripts have more ascenders and capitals above their x-height
+    than descenders below it, so an upright line has more ink above its
+    dense core than below.
+    """
+    profile = band.mean(axis=1)
+    core = np.flatnonzero(profile >= 0.5 * profile.max())
+    core_ink = profile[core[0] : core[-1] + 1].sum()
+    above, below = profile[: core[0]].sum(), profile[core[-1] + 1 :].sum()
+    if above - margin * below > 0.05 * core_ink:
+        return 1
+    if below - margin * above > 0.05 * core_ink:
+        return -1
+    return 0
+
+
+def is_upright_page(
+    img, max_side=1000, max_aspect_ratio=2.5, min_lines=8, min_agreement=4.0
+):
+    """Whether a page is upright beyond doubt.
+
+    Only pages with a page-like aspect ratio are checked, the bands of ink of
+    strips need not be lines of text. The page is binarized and cropped to its
+    ink. Its text must run horizontally, i.e. its row profile varies more than
+    its column profile, and at least min_lines of its text lines must vote
+    upright, min_agreement times more than vote upside down. Pages of scripts
+    without ascenders, e.g. CJK, photos and pages with little text are left to
+    the classifier.
+
+    args:
+        img(array): BGR or gray image of the page
+        max_side(int): the page is downscaled to this size first
+        max_aspect_ratio(float): the largest ratio of the long to the short
+            side of the page checked
+    return:
+        True if the page is upright, False if unknown
+    """
+    if max(img.shape[:2]) > max_aspect_ratio * min(img.shape[:2]):
+        return False
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    scale = max_side / max(gray.shape[:2])
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    ys, xs = np.nonzero(binary)
+    if len(ys) == 0:
+        return False
+    binary = binary[ys.min() : ys.max() + 1, xs.min() : xs.max() + 1]
+    binary = binary.astype(np.float32)
+
+    rows, cols = binary.mean(axis=1), binary.mean(axis=0)
+    if rows.std() / rows.mean() <= cols.std() / cols.mean():
+        return False
+    votes = [
+        _line_vote(binary[y1:y2])
+        for y1, y2 in text_line_bands(binary, max_height=binary.shape[0] // 10)
+    ]
+    upright, upside_down = votes.count(1), votes.count(-1)
+    return upright >= min_lines and upright >= min_agreement * upside_down
+
+
+def is_upright_box(box, min_aspect_ratio=1.0, max_angle=10):
+    """Whether the crop of a text box of an upright page is upright.
+
+    The crop is upright when the box is horizontal, at least min_aspect_ratio
+    times wider than high, and its top edge is within max_angle degrees of
+    the horizontal. Vertical boxes, whose crops get_rotate_crop_image turns
+    by 90 degrees, and skewed boxes are left to the classifier.
+
+    args:
+        box(array): the 4 points of the box, clockwise from the top left
+    """
+    box = np.asarray(box, dtype=np.float32)
+    width = np.linalg.norm(box[1] - box[0])
+    height = np.linalg.norm(box[3] - box[0])
+    if width < min_aspect_ratio * height or width == 0:
+        return False
+    dx, dy = box[1] - box[0]
+    return abs(np.degrees(np.arctan2(dy, dx))) <= max_angle
@@ -124,23 +124,272 @@ def poly_iou(poly_det, poly_gt):
     return area_inters / area_union
 
 
+def polygon_bboxes(points):
+    """Compute the axis-aligned bounding boxes of a batch of polygons.
+
+    Args:
+        points (ndarray): Polygons shaped (n, k, 2).
+
+    Returns:
+        bboxes (ndarray): Boxes shaped (n, 4) as (xmin, ymin, xmax, ymax).
+    """
+    return np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+
+
+def polygon_signed_areas(points, counts=None):
+    """Shoelace signed areas of a batch of polygons.
+
+    Args:
+        points (ndarray): Polygons shaped (n, k, 2).
+        counts (ndarray, optional): Number of valid leading vertices of each
+            polygon, the rest is padding. Defaults to k for all polygons.
+
+    Returns:
+        areas (ndarray): Signed areas shaped (n,), positive for
+            counter-clockwise polygons.
+    """
+    n, k = points.shape[:2]
+    if counts is None:
+        nxt = np.roll(points, -1, axis=1)
+        cross = points[..., 0] * nxt[..., 1] - nxt[..., 0] * points[..., 1]
+        return 0.5 * cross.sum(axis=1)
+    idx = np.arange(k)[None, :]
+    valid = idx < counts[:, None]
+    nxt_idx = np.where(idx + 1 < counts[:, None], idx + 1, 0)
+    nxt = np.take_along_axis(points, nxt_idx[..., None], axis=1)
+    cross = points[..., 0] * nxt[..., 1] - nxt[..., 0] * points[..., 1]
+    return 0.5 * np.where(valid, cross, 0.0).sum(axis=1)
+
+
+def polygon_convex_mask(points, eps=1e-6):
+    """Check which polygons of a batch are strictly convex and simple.
+
+    Polygons with repeated vertices or collinear runs are reported as
+    non-convex, which is conservative: they are handled by the exact shapely
+    fallback.
+
+    Args:
+        points (ndarray): Polygons shaped (n, k, 2).
+
+    Returns:
+        convex (ndarray): Boolean mask shaped (n,).
+    """
+    edges = np.roll(points, -1, axis=1) - points
+    nxt_edges = np.roll(edges, -1, axis=1)
+    cross = edges[..., 0] * nxt_edges[..., 1] - edges[..., 1] * nxt_edges[..., 0]
+    dot = (edges * nxt_edges).sum(axis=-1)
+    same_sign = np.all(cross > eps, axis=1) | np.all(cross < -eps, axis=1)
+    # a star polygon turns the same way at every vertex but winds more than once
+    turning = np.abs(np.arctan2(cross, dot).sum(axis=1))
+    return same_sign & (np.abs(turning - 2 * np.pi) < 1e-3)
+
+
+def polygon_simple_mask(points, chunk_size=256):
+    """Check which polygons of a batch have no self-intersections.
+
+    Touching or collinear overlapping edges count as intersections, so the
+    mask only marks polygons that are certainly simple.
+
+    Args:
+        points (ndarray): Polygons shaped (n, k, 2).
+        chunk_size (int): Number of polygons tested per vectorized chunk.
+
+    Returns:
+        simple (ndarray): Boolean mask shaped (n,).
+    """
+    n, k = points.shape[:2]
+    simple = np.ones((n,), dtype=bool)
+    if k < 4:
+        return simple
+    ia, ib = np.triu_indices(k, 2)
+    # the first and the last edge share a vertex as well
+    pairs = ~((ia == 0) & (ib == k - 1))
+    ia, ib = ia[pairs], ib[pairs]
+
+    def orient(p, q, r):
+        return (q[..., 0] - p[..., 0]) * (r[..., 1] - p[..., 1]) - (
+            q[..., 1] - p[..., 1]
+        ) * (r[..., 0] - p[..., 0])
+
+    for start in range(0, n, chunk_size):
+        pts = points[start : start + chunk_size]
+        nxt = np.roll(pts, -1, axis=1)
+        p1, p2 = pts[:, ia], nxt[:, ia]
+        p3, p4 = pts[:, ib], nxt[:, ib]
+        d1 = orient(p3, p4, p1)
+        d2 = orient(p3, p4, p2)
+        d3 = orient(p1, p2, p3)
+        d4 = orient(p1, p2, p4)
+        hit = (d1 * d2 <= 0) & (d3 * d4 <= 0)
+        simple[start : start + chunk_size] = ~np.any(hit, axis=1)
+    return simple
+
+
+def convex_clip_areas(subject, clip):
+    """Intersection areas of polygon pairs by batched Sutherland-Hodgman.
+
+    The clipping polygons must be convex and counter-clockwise, the subject
+    polygons only need to be simple.
+
+    Args:
+        subject (ndarray): Subject polygons shaped (p, k, 2).
+        clip (ndarray): Convex clipping polygons shaped (p, m, 2).
+
+    Returns:
+        areas (ndarray): Intersection areas shaped (p,).
+    """
+    num, k = subject.shape[:2]
+    m = clip.shape[1]
+    pts = np.asarray(subject, dtype=np.float64)
+    counts = np.full((num,), k, dtype=np.int64)
+    for j in range(m):
+        if pts.shape[1] == 0:
+            break
+        a = clip[:, j][:, None, :]
+        edge = clip[:, (j + 1) % m][:, None, :] - a
+        idx = np.arange(pts.shape[1])[None, :]
+        valid = idx < counts[:, None]
+        prev_idx = np.where(idx == 0, np.maximum(counts[:, None] - 1, 0), idx - 1)
+        prev = np.take_along_axis(pts, prev_idx[..., None], axis=1)
+
+        side = edge[..., 0] * (pts[..., 1] - a[..., 1]) - edge[..., 1] * (
+            pts[..., 0] - a[..., 0]
+        )
+        prev_side = np.take_along_axis(side, prev_idx, axis=1)
+        inside = side >= 0
+        prev_inside = prev_side >= 0
+
+        crossing = (inside != prev_inside) & valid
+        denom = np.where(crossing, prev_side - side, 1.0)
+        t = (prev_side / denom)[..., None]
+        cross_pts = prev + t * (pts - prev)
+
+        # every input edge emits its crossing point first, then its end point
+        out = np.stack([cross_pts, pts], axis=2).reshape(num, -1, 2)
+        keep = np.stack([crossing, inside & valid], axis=2).reshape(num, -1)
+        order = np.argsort(~keep, axis=1, kind="stable")
+        counts = keep.sum(axis=1)
+        width = int(counts.max()) if num > 0 else 0
+        pts = np.take_along_axis(out, order[:, :width, None], axis=1)
+
+    if pts.shape[1] < 3:
+        return np.zeros((num,), dtype=np.float64)
+    areas = np.abs(polygon_signed_areas(pts, counts))
+    areas[counts < 3] = 0.0
+    return areas
+
+
+class PolygonSet(object):
+    """Precomputed geometry of a batch of polygons for repeated IoU queries.
+
+    Candidate pairs are first filtered by axis-aligned bounding box overlap.
+    Pairs where one polygon is convex and the other is simple go through
+    `convex_clip_areas` in one batch, quads being the cheapest case with four
+    clipping edges. Remaining pairs use `fallback_iou`, which returns the
+    IoU of two polygons given their indices.
+    """
+
+    def __init__(self, points, fallback_iou):
+        points = np.asarray(points, dtype=np.float64)
+        assert points.ndim == 3 and points.shape[2] == 2
+        self.points = points
+        self.fallback_iou = fallback_iou
+        self.bboxes = polygon_bboxes(points)
+        signed = polygon_signed_areas(points)
+        self.areas = np.abs(signed)
+        self.convex = polygon_convex_mask(points)
+        self.simple = self.convex.copy()
+        if points.shape[1] > 3 and not self.convex.all():
+            self.simple[~self.convex] = polygon_simple_mask(points[~self.convex])
+        # convex clipping polygons need counter-clockwise order
+        self.ccw = np.where((signed < 0)[:, None, None], points[:, ::-1], points)
+
+    def overlapping(self, i, candidates):
+        """Return the candidates whose bounding boxes overlap polygon i."""
+        box = self.bboxes[i]
+        others = self.bboxes[candidates]
+        overlap = (
+            (others[:, 0] < box[2])
+            & (others[:, 2] > box[0])
+            & (others[:, 1] < box[3])
+            & (others[:, 3] > box[1])
+        )
+        return candidates[overlap]
+
+    def iou(self, i, candidates):
+        """IoU between polygon i and each polygon of candidates."""
+        candidates = np.asarray(candidates, dtype=np.int64)
+        ious = np.zeros((len(candidates),), dtype=np.float64)
+        if len(candidates) == 0:
+            return ious
+        inters = np.zeros_like(ious)
+
+        if self.convex[i]:
+            clip_by_i = self.simple[candidates]
+        else:
+            clip_by_i = np.zeros((len(candidates),), dtype=bool)
+        clip_by_j = ~clip_by_i & self.convex[candidates] & self.simple[i]
+        fallback = ~(clip_by_i | clip_by_j)
+
+        if clip_by_i.any():
+            subject = self.points[candidates[clip_by_i]]
+            clip = np.broadcast_to(self.ccw[i], (len(subject),) + self.ccw[i].shape)
+            inters[clip_by_i] = convex_clip_areas(subject, clip)
+        if clip_by_j.any():
+            clip = self.ccw[candidates[clip_by_j]]
+            subject = np.broadcast_to(
+                self.points[i], (len(clip),) + self.points[i].shape
+            )
+            inters[clip_by_j] = convex_clip_areas(subject, clip)
+
+        exact = ~fallback
+        union = self.areas[i] + self.areas[candidates[exact]] - inters[exact]
+        ious[exact] = np.where(union > 0, inters[exact] / np.maximum(union, 1e-12), 0)
+        for pos in np.nonzero(fallback)[0]:
+            ious[pos] = self.fallback_iou(i, candidates[pos])
+        return ious
+
+    def nms(self, order, threshold):
+        """Greedy NMS visiting polygons in the given order.
+
+        Args:
+            order (ndarray): Polygon indices, highest priority first.
+            threshold (float): Candidates with IoU above it are suppressed.
+
+        Returns:
+            keep (list[int]): Indices of the kept polygons.
+        """
+        order = np.asarray(order, dtype=np.int64)
+        suppressed = np.zeros((len(self.points),), dtype=bool)
+        keep = []
+        for pos, i in enumerate(order):
+            if suppressed[i]:
+                continue
+            keep.append(int(i))
+            rest = order[pos + 1 :]
+            rest = rest[~suppressed[rest]]
+            if len(rest) == 0:
+                break
+            candidates = self.overlapping(i, rest)
+            if len(candidates) == 0:
+                continue
+            ious = self.iou(i, candidates)
+            suppressed[candidates[ious > threshold]] = True
+        return keep
+
+
 def poly_nms(polygons, threshold):
     assert isinstance(polygons, list)
 
     polygons = np.array(sorted(polygons, key=lambda x: x[-1]))
+    if len(polygons) == 0:
+        return []
+
+    def fallback_iou(i, j):
+        return boundary_iou(polygons[i][:-1], polygons[j][:-1])
+
+    points = polygons[:, :-1].reshape([len(polygons), -1, 2])
+    poly_set = PolygonSet(points, fallback_iou)
+    keep = poly_set.nms(np.arange(len(polygons))[::-1], threshold)
 
-    keep_poly = []
-    index = [i for i in range(polygons.shape[0])]
-
-    while len(index) > 0:
-        keep_poly.append(polygons[index[-1]].tolist())
-        A = polygons[index[-1]][:-1]
-        index = np.delete(index, -1)
-        iou_list = np.zeros((len(index),))
-        for i in range(len(index)):
-            B = polygons[index[i]][:-1]
-            iou_list[i] = boundary_iou(A, B)
-        remove_index = np.where(iou_list > threshold)
-        index = np.delete(index, remove_index)
-
-    return keep_poly
+    return [polygons[i].tolist() for i in keep]
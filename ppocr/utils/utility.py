@@ -21,6 +21,8 @@ import paddle
 import importlib.util
 import sys
 import subprocess
+import queue
+import threading
 
 
 def print_dict(d, logger, delimiter=0):
@@ -132,26 +134,249 @@ def check_and_read(img_path):
         from paddle.utils import try_import
 
         fitz = try_import("fitz")
-        from PIL import Image
 
         imgs = []
         with fitz.open(img_path) as pdf:
             for pg in range(0, pdf.page_count):
-                page = pdf[pg]
-                mat = fitz.Matrix(2, 2)
-                pm = page.get_pixmap(matrix=mat, alpha=False)
-
-                # if width or height > 2000 pixels, don't enlarge the image
-                if pm.width > 2000 or pm.height > 2000:
-                    pm = page.get_pixmap(matrix=fitz.Matrix(1, 1), alpha=False)
-
-                img = Image.frombytes("RGB", [pm.width, pm.height], pm.samples)
-                img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-                imgs.append(img)
+                imgs.append(pdf_page_to_img(pdf[pg]))
             return imgs, False, True
     return None, False, False
 
 
+def pdf_page_zoom(page, text_height=20, max_side=2000):
+    """Zoom of the rendering of a pdf page, picked from its size so that the
+    page is rendered once.
+
+    Body text, about 10 pt high, is rendered text_height pixels high, unless
+    the page would then exceed max_side pixels, in which case it is fit in
+    max_side pixels, but never rendered below 72 dpi.
+    """
+    zoom = text_height / 10.0
+    longest = max(page.rect.width, page.rect.height)
+    if longest * zoom > max_side:
+        zoom = max(max_side / longest, 1.0)
+    return zoom
+
+
+def pdf_page_to_img(page, text_height=20, max_side=2000):
+    """Render a page of a pdf opened with fitz into a BGR image."""
+    from paddle.utils import try_import
+
+    fitz = try_import("fitz")
+
+    zoom = pdf_page_zoom(page, text_height, max_side)
+    pm = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    img = np.frombuffer(pm.samples, dtype=np.uint8).reshape(pm.height, pm.width, 3)
+    return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+
+def pdf_page_text_layer(page, zoom, min_image_side=32):
+    """
+    The text lines of the text layer of a pdf page, in the pixels of the page
+    rendered at zoom, to skip the ocr of born-digital pages.
+
+    A line of the layer is split where its spans are further apart than the
+    font size, e.g. in the cells of a table row, like the text detector does.
+    Returns:
+        dt_boxes (list): 4x2 float32 boxes of the lines.
+        rec_res (list): (text, 1.0) of the lines.
+        image_boxes (list): [x1, y1, x2, y2] of the images of the page, whose
+            text is not in the layer. The images under invisible text, i.e.
+            the scans of searchable pdfs, whose text is the layer, are left
+            out.
+        or None if the page has no usable text layer, e.g. a scanned page or
+        fonts without a unicode mapping.
+    """
+    from paddle.utils import try_import
+
+    fitz = try_import("fitz")
+
+    def to_pixels(bbox):
+        rect = fitz.Rect(bbox) * page.rotation_matrix
+        return [rect.x0 * zoom, rect.y0 * zoom, rect.x1 * zoom, rect.y1 * zoom]
+
+    dt_boxes, rec_res = [], []
+    # the boxes of the lines of invisible text, i.e. the ocr of a scan
+    invisible_boxes = []
+    num_chars = num_unknown_chars = 0
+    page_text = page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)
+    for block in page_text["blocks"]:
+        for line in block.get("lines", []):
+            pieces = []
+            for span in line["spans"]:
+                if not span["text"].strip():
+                    continue
+                x0, y0, x1, y1 = span["bbox"]
+                invisible = span.get("alpha", 255) == 0
+                if pieces and x0 - pieces[-1][1][2] <= span["size"]:
+                    text, bbox, piece_invisible = pieces[-1]
+                    pieces[-1] = (
+                        text + span["text"],
+                        [bbox[0], min(bbox[1], y0), x1, max(bbox[3], y1)],
+                        piece_invisible and invisible,
+                    )
+                else:
+                    pieces.append((span["text"], [x0, y0, x1, y1], invisible))
+            for text, bbox, invisible in pieces:
+                text = text.strip()
+                num_chars += len(text)
+                num_unknown_chars += text.count("\ufffd")
+                x1, y1, x2, y2 = to_pixels(bbox)
+                dt_boxes.append(
+                    np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+                )
+                rec_res.append((text, 1.0))
+                if invisible:
+                    invisible_boxes.append([x1, y1, x2, y2])
+    if num_chars == 0 or num_unknown_chars > 0.1 * num_chars:
+        return None
+
+    width, height = page.rect.width * zoom, page.rect.height * zoom
+    image_boxes = []
+    for image in page.get_image_info():
+        x1, y1, x2, y2 = [int(round(v)) for v in to_pixels(image["bbox"])]
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, int(round(width))), min(y2, int(round(height)))
+        if min(x2 - x1, y2 - y1) < min_image_side:
+            continue
+        # an invisible line inside the image is its ocr
+        if any(
+            bx1 >= x1 - 1 and by1 >= y1 - 1 and bx2 <= x2 + 1 and by2 <= y2 + 1
+            for bx1, by1, bx2, by2 in invisible_boxes
+        ):
+            continue
+        image_boxes.append([x1, y1, x2, y2])
+    return dt_boxes, rec_res, image_boxes
+
+
+def parse_page_range(page_range, page_count):
+    """Indexes of the pages of a page range like "1-3,7", numbered from 1."""
+    pages = []
+    for part in page_range.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        start = int(start) if start else 1
+        if not sep:
+            end = start
+        else:
+            end = int(end) if end else page_count
+        pages.extend(range(max(start, 1) - 1, min(end, page_count)))
+    return pages
+
+
+class PdfPageSource(object):
+    """
+    The pages of a pdf, rendered on demand.
+
+    Iterating yields the BGR images of the selected pages in order,
+    iter_pages also yields their index and text layer. With prefetch > 0, a
+    thread renders up to prefetch pages ahead of the caller, so that the
+    rendering overlaps the inference and at most prefetch pages wait in
+    memory.
+    Args:
+        pdf_path (str): path of the pdf.
+        page_num (int): only the first page_num pages, all of them if 0.
+        page_range (str): the pages to render, like "1-3,7", numbered from 1,
+            it takes precedence over page_num.
+        prefetch (int): number of pages rendered ahead, 0 to render them in
+            the caller.
+        text_height, max_side: see pdf_page_zoom.
+        text_layer (bool): whether to extract the text layers of the pages,
+            see pdf_page_text_layer.
+    """
+
+    def __init__(
+        self,
+        pdf_path,
+        page_num=0,
+        page_range=None,
+        prefetch=2,
+        text_height=20,
+        max_side=2000,
+        text_layer=False,
+    ):
+        from paddle.utils import try_import
+
+        fitz = try_import("fitz")
+        with fitz.open(pdf_path) as pdf:
+            page_count = pdf.page_count
+        if page_range:
+            self.pages = parse_page_range(page_range, page_count)
+        elif 0 < page_num < page_count:
+            self.pages = list(range(page_num))
+        else:
+            self.pages = list(range(page_count))
+        self.pdf_path = pdf_path
+        self.prefetch = prefetch
+        self.text_height = text_height
+        self.max_side = max_side
+        self.text_layer = text_layer
+
+    def __len__(self):
+        return len(self.pages)
+
+    def render(self):
+        from paddle.utils import try_import
+
+        fitz = try_import("fitz")
+        with fitz.open(self.pdf_path) as pdf:
+            for page_idx in self.pages:
+                page = pdf[page_idx]
+                img = pdf_page_to_img(page, self.text_height, self.max_side)
+                text_layer = None
+                if self.text_layer:
+                    zoom = pdf_page_zoom(page, self.text_height, self.max_side)
+                    text_layer = pdf_page_text_layer(page, zoom)
+                yield page_idx, img, text_layer
+
+    def __iter__(self):
+        for _, img, _ in self.iter_pages():
+            yield img
+
+    def iter_pages(self):
+        """Yield the index, the image and the text layer of the pages."""
+        if self.prefetch <= 0:
+            yield from self.render()
+            return
+
+        pages = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def prefetch_pages():
+            try:
+                for page in self.render():
+                    if not put(("page", page)):
+                        return
+                put(("end", None))
+            except Exception as ex:
+                put(("error", ex))
+
+        thread = threading.Thread(target=prefetch_pages, daemon=True)
+        thread.start()
+        try:
+            while True:
+                kind, value = pages.get()
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            stop.set()
+            thread.join()
+
+
 def load_vqa_bio_label_maps(label_map_path):
     with open(label_map_path, "r", encoding="utf-8") as fin:
         lines = fin.readlines()
@@ -32,22 +32,36 @@ from ppocr.utils.logging import get_logger
 from ppocr.utils.visual import draw_ser_results
 from ppocr.utils.utility import get_image_file_list, check_and_read
 from ppstructure.utility import parse_args
-
-from paddleocr import PaddleOCR
+from tools.infer.predict_system import TextSystem
 
 logger = get_logger()
 
 
+def load_ocr_results(ocr_result_path):
+    """Load the ocr results saved by tools/infer/predict_system.py.
+
+    Returns a dict from the image name to its [{"transcription", "points"}].
+    """
+    ocr_results = {}
+    with open(ocr_result_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            image_name, ocr_result = line.split("\t", 1)
+            ocr_results[image_name] = json.loads(ocr_result)
+    return ocr_results
+
+
 class SerPredictor(object):
-    def __init__(self, args):
+    def __init__(self, args, ocr_engine=None):
+        """
+        args:
+            ocr_engine: a TextSystem shared with the caller, or None to create
+                a PaddleOCR on the first page without an ocr result given
+        """
         self.args = args
-        self.ocr_engine = PaddleOCR(
-            use_angle_cls=args.use_angle_cls,
-            det_model_dir=args.det_model_dir,
-            rec_model_dir=args.rec_model_dir,
-            show_log=False,
-            use_gpu=args.use_gpu,
-        )
+        self.ocr_engine = ocr_engine
 
         pre_process_list = [
             {
@@ -55,12 +69,9 @@ class SerPredictor(object):
                     "algorithm": args.kie_algorithm,
                     "class_path": args.ser_dict_path,
                     "contains_re": False,
-                    "ocr_engine": self.ocr_engine,
                     "order_method": args.ocr_order_method,
                 }
             },
-            {"VQATokenPad": {"max_seq_len": 512, "return_attention_mask": True}},
-            {"VQASerTokenChunk": {"max_seq_len": 512, "return_attention_mask": True}},
             {"Resize": {"size": [224, 224]}},
             {
                 "NormalizeImage": {
@@ -83,6 +94,7 @@ class SerPredictor(object):
                         "segment_offset_id",
                         "ocr_info",
                         "entities",
+                        "tokenizer_params",
                     ]
                 }
             },
@@ -92,6 +104,10 @@ class SerPredictor(object):
             "class_path": args.ser_dict_path,
         }
 
+        # the exported models take sequences of 512 tokens, longer pages are
+        # split into several chunks
+        self.max_seq_len = 512
+        self.ser_batch_num = getattr(args, "ser_batch_num", 8)
         self.preprocess_op = create_operators(pre_process_list, {"infer_mode": True})
         self.postprocess_op = build_post_process(postprocess_params)
         (
@@ -101,48 +117,150 @@ class SerPredictor(object):
             self.config,
         ) = utility.create_predictor(args, "ser", logger)
 
-    def __call__(self, img):
-        ori_im = img.copy()
-        data = {"image": img}
-        data = transform(data, self.preprocess_op)
-        if data[0] is None:
-            return None, 0
-        starttime = time.time()
+    def make_chunks(self, data):
+        """Split the tokens of a page into padded chunks of max_seq_len.
 
-        for idx in range(len(data)):
-            if isinstance(data[idx], np.ndarray):
-                data[idx] = np.expand_dims(data[idx], axis=0)
+        Returns the chunks, each a list of input_ids, bbox, attention_mask,
+        token_type_ids and image, and the slices of the tokens of the page
+        in every chunk.
+        """
+        input_ids, bbox, _, token_type_ids, image = data[:5]
+        tokenizer_params = data[9]
+        seq_len = len(input_ids)
+        chunks, token_slices = [], []
+        for start in range(0, max(seq_len, 1), self.max_seq_len):
+            end = min(start + self.max_seq_len, seq_len)
+            num_pad = self.max_seq_len - (end - start)
+            chunk = [
+                input_ids[start:end] + [tokenizer_params["pad_token_id"]] * num_pad,
+                bbox[start:end] + [[0, 0, 0, 0]] * num_pad,
+                [1] * (end - start) + [0] * num_pad,
+                token_type_ids[start:end]
+                + [tokenizer_params["pad_token_type_id"]] * num_pad,
+            ]
+            if tokenizer_params["padding_side"] == "left":
+                chunk = [field[end - start :] + field[: end - start] for field in chunk]
+                token_slices.append(slice(num_pad, self.max_seq_len))
             else:
-                data[idx] = [data[idx]]
+                token_slices.append(slice(0, end - start))
+            chunk = [np.array(field, dtype="int64") for field in chunk]
+            chunks.append(chunk + [image])
+        return chunks, token_slices
+
+    def get_ocr_result(self, img):
+        """Run the ocr of a page, in the format of the given ocr results."""
+        if self.ocr_engine is None:
+            from paddleocr import PaddleOCR
+
+            self.ocr_engine = PaddleOCR(
+                use_angle_cls=self.args.use_angle_cls,
+                det_model_dir=self.args.det_model_dir,
+                rec_model_dir=self.args.rec_model_dir,
+                show_log=False,
+                use_gpu=self.args.use_gpu,
+            )
+        if isinstance(self.ocr_engine, TextSystem):
+            dt_boxes, rec_res, _ = self.ocr_engine(img, cls=False)
+            if dt_boxes is None:
+                return []
+            return [
+                {"transcription": text, "points": np.array(box).tolist()}
+                for box, (text, _) in zip(dt_boxes, rec_res)
+            ]
+        ocr_result = self.ocr_engine.ocr(img, cls=False)[0] or []
+        return [{"transcription": res[1][0], "points": res[0]} for res in ocr_result]
+
+    def run_batch(self, chunks):
+        inputs = [
+            np.stack([chunk[idx] for chunk in chunks])
+            for idx in range(len(self.input_tensor))
+        ]
         if self.args.use_onnx:
             input_tensor = {
-                name: data[idx] for idx, name in enumerate(self.input_tensor)
+                name: inputs[idx] for idx, name in enumerate(self.input_tensor)
             }
             self.output_tensors = self.predictor.run(None, input_tensor)
-        else:
-            for idx in range(len(self.input_tensor)):
-                self.input_tensor[idx].copy_from_cpu(data[idx])
+            return self.output_tensors[0]
+        for idx in range(len(self.input_tensor)):
+            self.input_tensor[idx].copy_from_cpu(inputs[idx])
+        self.predictor.run()
+        return self.output_tensors[0].copy_to_cpu()
+
+    def predict_batch(self, imgs, ocr_results=None):
+        """Recognize the entities of several pages.
+
+        The ocr results of the pages, [{"transcription", "points"}] as saved
+        by tools/infer/predict_system.py, may be given, the ocr only runs on
+        the pages whose result is None.
 
-            self.predictor.run()
+        The chunks of all pages are run in batches of ser_batch_num and the
+        predictions of the tokens of a page are merged back before the post
+        process assigns them to the lines by segment_offset_id.
 
-        outputs = []
-        for output_tensor in self.output_tensors:
-            output = (
-                output_tensor if self.args.use_onnx else output_tensor.copy_to_cpu()
+        Returns:
+            post_results (list): For every page, the ocr_info with the
+                predictions, None if the page could not be encoded.
+            inputs (list): For every page, the model inputs of its first chunk
+                with a batch axis, as the RE predictor takes them.
+            elapse (float): Time of the model runs and the post process.
+        """
+        if ocr_results is None:
+            ocr_results = [None] * len(imgs)
+        pages, chunks, token_slices = [], [], []
+        for img, ocr_result in zip(imgs, ocr_results):
+            if ocr_result is None:
+                ocr_result = self.get_ocr_result(img)
+            data = transform(
+                {"image": img, "ocr_result": ocr_result}, self.preprocess_op
             )
-            outputs.append(output)
-        preds = outputs[0]
+            if data is None or data[0] is None:
+                pages.append(None)
+                continue
+            page_chunks, page_token_slices = self.make_chunks(data)
+            pages.append((data, len(chunks), len(page_chunks)))
+            chunks.extend(page_chunks)
+            token_slices.extend(page_token_slices)
+        starttime = time.time()
+
+        chunk_preds = []
+        for beg in range(0, len(chunks), self.ser_batch_num):
+            preds = self.run_batch(chunks[beg : beg + self.ser_batch_num])
+            chunk_preds.extend(list(preds))
+        chunk_preds = [
+            pred[token_slice] for pred, token_slice in zip(chunk_preds, token_slices)
+        ]
 
-        post_result = self.postprocess_op(
-            preds, segment_offset_ids=data[6], ocr_infos=data[7]
-        )
+        post_results, inputs = [], []
+        for page in pages:
+            if page is None:
+                post_results.append(None)
+                inputs.append(None)
+                continue
+            data, chunk_beg, num_chunks = page
+            preds = np.concatenate(chunk_preds[chunk_beg : chunk_beg + num_chunks])
+            post_results.append(
+                self.postprocess_op(
+                    [preds], segment_offset_ids=[data[6]], ocr_infos=[data[7]]
+                )[0]
+            )
+            page_inputs = [np.expand_dims(field, axis=0) for field in chunks[chunk_beg]]
+            inputs.append(page_inputs + [[field] for field in data[5:9]])
         elapse = time.time() - starttime
-        return post_result, data, elapse
+        return post_results, inputs, elapse
+
+    def __call__(self, img, ocr_result=None):
+        post_results, inputs, elapse = self.predict_batch([img], [ocr_result])
+        if post_results[0] is None:
+            return None, 0
+        return [post_results[0]], inputs[0], elapse
 
 
 def main(args):
     image_file_list = get_image_file_list(args.image_dir)
     ser_predictor = SerPredictor(args)
+    ocr_results = {}
+    if args.kie_ocr_result_path is not None:
+        ocr_results = load_ocr_results(args.kie_ocr_result_path)
     count = 0
     total_time = 0
 
@@ -150,41 +268,63 @@ def main(args):
     with open(
         os.path.join(args.output, "infer.txt"), mode="w", encoding="utf-8"
     ) as f_w:
-        for image_file in image_file_list:
+        batch_files, batch_imgs, batch_ocr_results = [], [], []
+        for file_idx, image_file in enumerate(image_file_list):
             img, flag, _ = check_and_read(image_file)
             if not flag:
                 img = cv2.imread(image_file)
                 img = img[:, :, ::-1]
             if img is None:
                 logger.info("error in loading image:{}".format(image_file))
+            else:
+                batch_files.append(image_file)
+                batch_imgs.append(img)
+                batch_ocr_results.append(ocr_results.get(os.path.basename(image_file)))
+            # pages of several images share the batches of the model
+            if (
+                len(batch_imgs) < ser_predictor.ser_batch_num
+                and file_idx < len(image_file_list) - 1
+            ):
+                continue
+            if len(batch_imgs) == 0:
                 continue
-            ser_res, _, elapse = ser_predictor(img)
-            ser_res = ser_res[0]
-
-            res_str = "{}\t{}\n".format(
-                image_file,
-                json.dumps(
-                    {
-                        "ocr_info": ser_res,
-                    },
-                    ensure_ascii=False,
-                ),
+            ser_results, _, elapse = ser_predictor.predict_batch(
+                batch_imgs, batch_ocr_results
             )
-            f_w.write(res_str)
+            for image_file, ser_res in zip(batch_files, ser_results):
+                if ser_res is None:
+                    logger.info("error in encoding image:{}".format(image_file))
+                    continue
 
-            img_res = draw_ser_results(
-                image_file,
-                ser_res,
-                font_path=args.vis_font_path,
-            )
+                res_str = "{}\t{}\n".format(
+                    image_file,
+                    json.dumps(
+                        {
+                            "ocr_info": ser_res,
+                        },
+                        ensure_ascii=False,
+                    ),
+                )
+                f_w.write(res_str)
+
+                img_res = draw_ser_results(
+                    image_file,
+                    ser_res,
+                    font_path=args.vis_font_path,
+                )
 
-            img_save_path = os.path.join(args.output, os.path.basename(image_file))
-            cv2.imwrite(img_save_path, img_res)
-            logger.info("save vis result to {}".format(img_save_path))
+                img_save_path = os.path.join(args.output, os.path.basename(image_file))
+                cv2.imwrite(img_save_path, img_res)
+                logger.info("save vis result to {}".format(img_save_path))
             if count > 0:
                 total_time += elapse
-            count += 1
-            logger.info("Predict time of {}: {}".format(image_file, elapse))
+            count += len(batch_files)
+            logger.info(
+                "Predict time of {} images ending with {}: {}".format(
+                    len(batch_files), batch_files[-1], elapse
+                )
+            )
+            batch_files, batch_imgs, batch_ocr_results = [], [], []
 
 
 if __name__ == "__main__":
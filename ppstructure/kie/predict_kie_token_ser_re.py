@@ -32,15 +32,15 @@ from ppocr.utils.logging import get_logger
 from ppocr.utils.visual import draw_ser_results, draw_re_results
 from ppocr.utils.utility import get_image_file_list, check_and_read
 from ppstructure.utility import parse_args
-from ppstructure.kie.predict_kie_token_ser import SerPredictor
+from ppstructure.kie.predict_kie_token_ser import SerPredictor, load_ocr_results
 
 logger = get_logger()
 
 
 class SerRePredictor(object):
-    def __init__(self, args):
+    def __init__(self, args, ocr_engine=None):
         self.use_visual_backbone = args.use_visual_backbone
-        self.ser_engine = SerPredictor(args)
+        self.ser_engine = SerPredictor(args, ocr_engine)
         if args.re_model_dir is not None:
             postprocess_params = {"name": "VQAReTokenLayoutLMPostProcess"}
             self.postprocess_op = build_post_process(postprocess_params)
@@ -53,12 +53,13 @@ class SerRePredictor(object):
         else:
             self.predictor = None
 
-    def __call__(self, img):
+    def __call__(self, img, ocr_result=None):
         starttime = time.time()
-        ser_results, ser_inputs, ser_elapse = self.ser_engine(img)
+        ser_results, ser_inputs, ser_elapse = self.ser_engine(img, ocr_result)
         if self.predictor is None:
             return ser_results, ser_elapse
 
+        # the re model takes the tokens encoded for the ser model as they are
         re_input, entity_idx_dict_batch = make_input(ser_inputs, ser_results)
         if self.use_visual_backbone == False:
             re_input.pop(4)
@@ -87,6 +88,9 @@ class SerRePredictor(object):
 def main(args):
     image_file_list = get_image_file_list(args.image_dir)
     ser_re_predictor = SerRePredictor(args)
+    ocr_results = {}
+    if args.kie_ocr_result_path is not None:
+        ocr_results = load_ocr_results(args.kie_ocr_result_path)
     count = 0
     total_time = 0
 
@@ -102,7 +106,9 @@ def main(args):
             if img is None:
                 logger.info("error in loading image:{}".format(image_file))
                 continue
-            re_res, elapse = ser_re_predictor(img)
+            re_res, elapse = ser_re_predictor(
+                img, ocr_results.get(os.path.basename(image_file))
+            )
             re_res = re_res[0]
 
             res_str = "{}\t{}\n".format(
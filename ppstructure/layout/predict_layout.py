@@ -68,18 +68,33 @@ class LayoutPredictor(object):
         self.use_onnx = args.use_onnx
 
     def __call__(self, img):
-        ori_im = img.copy()
-        data = {"image": img}
-        data = transform(data, self.preprocess_op)
-        img = data[0]
+        post_preds, elapse = self.predict_batch([img])
+        return post_preds[0], elapse
+
+    def predict_batch(self, imgs):
+        """Detect the layout of several images in one run of the model.
+
+        The images are all resized to the input size of the model, so they
+        are stacked as they are.
+
+        Returns:
+            post_preds (list): The layout regions of every image, None if
+                the image could not be preprocessed.
+            elapse (float): Time of the model run and the post process.
+        """
+        valid_ids, ori_ims, norm_imgs = [], [], []
+        post_preds = [None] * len(imgs)
+        for idx, img in enumerate(imgs):
+            data = transform({"image": img}, self.preprocess_op)
+            if data is None or data[0] is None:
+                continue
+            valid_ids.append(idx)
+            ori_ims.append(img)
+            norm_imgs.append(data[0])
+        if len(norm_imgs) == 0:
+            return post_preds, 0
+        img = np.stack(norm_imgs)
 
-        if img is None:
-            return None, 0
-
-        img = np.expand_dims(img, axis=0)
-        img = img.copy()
-
-        preds, elapse = 0, 1
         starttime = time.time()
 
         np_score_list, np_boxes_list = [], []
@@ -109,7 +124,9 @@ class LayoutPredictor(object):
                 )
         preds = dict(boxes=np_score_list, boxes_num=np_boxes_list)
 
-        post_preds = self.postprocess_op(ori_im, img, preds)
+        batch_preds = self.postprocess_op(ori_ims, img, preds)
+        for idx, layout_res in zip(valid_ids, batch_preds):
+            post_preds[idx] = layout_res
         elapse = time.time() - starttime
         return post_preds, elapse
 
@@ -15,6 +15,8 @@
 import os
 import sys
 import subprocess
+import multiprocessing
+import itertools
 
 __dir__ = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(__dir__)
@@ -29,13 +31,27 @@ import logging
 from copy import deepcopy
 
 from paddle.utils import try_import
-from ppocr.utils.utility import get_image_file_list, check_and_read
+from ppocr.utils.utility import (
+    get_image_file_list,
+    check_and_read,
+    pdf_page_to_img,
+    pdf_page_zoom,
+    pdf_page_text_layer,
+    PdfPageSource,
+)
 from ppocr.utils.logging import get_logger
+from ppocr.utils.orientation import is_upright_page
 from ppocr.utils.visual import draw_ser_results, draw_re_results
-from tools.infer.predict_system import TextSystem
+from tools.infer.predict_system import TextSystem, ocr_with_text_layer
 from tools.infer.predict_rec import TextRecognizer
 from ppstructure.layout.predict_layout import LayoutPredictor
-from ppstructure.table.predict_table import TableSystem, to_excel
+from ppstructure.spatial_index import BoxIndex
+from ppstructure.table.predict_table import (
+    TableSystem,
+    crop_ocr_result,
+    ocr_line_index,
+    to_excel,
+)
 from ppstructure.utility import parse_args, draw_structure_result, cal_ocr_word_box
 
 logger = get_logger()
@@ -43,8 +59,10 @@ logger = get_logger()
 
 class StructureSystem(object):
     def __init__(self, args):
+        self.args = args
         self.mode = args.mode
         self.recovery = args.recovery
+        self.table_reuse_ocr = getattr(args, "table_reuse_ocr", False)
 
         self.image_orientation_predictor = None
         if args.image_orientation:
@@ -53,6 +71,7 @@ class StructureSystem(object):
             self.image_orientation_predictor = paddleclas.PaddleClas(
                 model_name="text_image_orientation"
             )
+        self.orientation_gate = getattr(args, "use_orientation_gate", False)
 
         if self.mode == "structure":
             if not args.show_log:
@@ -88,48 +107,104 @@ class StructureSystem(object):
                 args_formula.rec_batch_num = args.formula_batch_num
                 self.formula_system = TextRecognizer(args_formula)
 
+            # the labels of the layout regions whose text is never used, the
+            # text boxes inside them are not recognized
+            self.ocr_skip_labels = set(
+                label.strip().lower()
+                for label in getattr(args, "ocr_skip_labels", "").split(",")
+                if label.strip()
+            )
+            if not self.table_reuse_ocr:
+                self.ocr_skip_labels.add("table")
+            if self.formula_system is not None:
+                self.ocr_skip_labels.add("equation")
+
         elif self.mode == "kie":
             from ppstructure.kie.predict_kie_token_ser_re import SerRePredictor
 
-            self.kie_predictor = SerRePredictor(args)
+            # with the det and rec models given, the ocr of the kie runs on
+            # a text system that callers can share
+            self.text_system = None
+            if args.det_model_dir is not None and args.rec_model_dir is not None:
+                self.text_system = TextSystem(args)
+            self.kie_predictor = SerRePredictor(args, ocr_engine=self.text_system)
 
         self.return_word_box = args.return_word_box
 
-    def __call__(self, img, return_ocr_result_in_table=False, img_idx=0):
+    def __call__(
+        self,
+        img,
+        return_ocr_result_in_table=False,
+        img_idx=0,
+        ocr_result=None,
+        layout_res=None,
+        text_layer=None,
+    ):
+        """
+        args:
+            ocr_result: in kie mode, the ocr result of the image as saved by
+                tools/infer/predict_system.py, [{"transcription", "points"}],
+                to skip the ocr of the kie
+            layout_res: in structure mode, the layout regions of the image
+                already detected, e.g. by LayoutPredictor.predict_batch
+            text_layer: in structure mode, the text layer of a pdf page, see
+                pdf_page_text_layer, its lines are not recognized again
+
+        With the orientation gate on, pages that is_upright_page finds upright
+        skip the image orientation classifier, counted in
+        time_dict["image_orientation_skip"]. The horizontal text boxes of such
+        pages skip the text classifier, counted in time_dict["cls_skip"].
+        The text boxes inside the layout regions of ocr_skip_labels are not
+        recognized, counted in time_dict["rec_skip"].
+        """
         time_dict = {
             "image_orientation": 0,
+            "image_orientation_skip": 0,
             "layout": 0,
             "table": 0,
             "table_match": 0,
             "formula": 0,
             "det": 0,
             "rec": 0,
+            "cls_num": 0,
+            "cls_skip": 0,
+            "rec_skip": 0,
             "kie": 0,
             "all": 0,
         }
         start = time.time()
 
+        # whether the page is upright, None if not checked
+        upright = None
         if self.image_orientation_predictor is not None:
             tic = time.time()
-            cls_result = self.image_orientation_predictor.predict(input_data=img)
-            cls_res = next(cls_result)
-            angle = cls_res[0]["label_names"][0]
-            cv_rotate_code = {
-                "90": cv2.ROTATE_90_COUNTERCLOCKWISE,
-                "180": cv2.ROTATE_180,
-                "270": cv2.ROTATE_90_CLOCKWISE,
-            }
-            if angle in cv_rotate_code:
-                img = cv2.rotate(img, cv_rotate_code[angle])
+            if self.orientation_gate:
+                upright = is_upright_page(img)
+            if upright:
+                time_dict["image_orientation_skip"] = 1
+            else:
+                cls_result = self.image_orientation_predictor.predict(input_data=img)
+                cls_res = next(cls_result)
+                angle = cls_res[0]["label_names"][0]
+                cv_rotate_code = {
+                    "90": cv2.ROTATE_90_COUNTERCLOCKWISE,
+                    "180": cv2.ROTATE_180,
+                    "270": cv2.ROTATE_90_CLOCKWISE,
+                }
+                if angle in cv_rotate_code:
+                    img = cv2.rotate(img, cv_rotate_code[angle])
+                    # the text layer is in the coordinates of the page as it was
+                    text_layer = None
+                    upright = None
             toc = time.time()
             time_dict["image_orientation"] = toc - tic
 
         if self.mode == "structure":
             ori_im = img.copy()
-            if self.layout_predictor is not None:
+            if layout_res is None and self.layout_predictor is not None:
                 layout_res, elapse = self.layout_predictor(img)
                 time_dict["layout"] += elapse
-            else:
+            elif layout_res is None:
                 h, w = ori_im.shape[:2]
                 layout_res = [dict(bbox=None, label="table", score=0.0)]
 
@@ -140,28 +215,55 @@ class StructureSystem(object):
             # To enhance the OCR recognition accuracy, we implement a patch fix
             # that first use text_system to detect and recognize all text information
             # and then filter out relevant texts according to the layout regions.
+            region_bboxes = []
+            for region in layout_res:
+                if region["bbox"] is not None:
+                    x1, y1, x2, y2 = region["bbox"]
+                    region_bboxes.append([int(x1), int(y1), int(x2), int(y2)])
+                else:
+                    region_bboxes.append([0, 0, w, h])
+
             text_res = None
+            ocr_result = None
             if self.text_system is not None:
-                text_res, ocr_time_dict = self._predict_text(img)
-                time_dict["det"] += ocr_time_dict["det"]
-                time_dict["rec"] += ocr_time_dict["rec"]
+                skip_regions = [
+                    bbox
+                    for region, bbox in zip(layout_res, region_bboxes)
+                    if region["label"].lower() in self.ocr_skip_labels
+                ]
+                text_res, ocr_time_dict, ocr_result = self._predict_text(
+                    img, text_layer, upright, skip_regions
+                )
+                for key in ["det", "rec", "cls_num", "cls_skip", "rec_skip"]:
+                    time_dict[key] += ocr_time_dict[key]
+
+            region_text_res = None
+            if text_res is not None:
+                region_text_res = self._filter_text_res(text_res, region_bboxes)
+            table_line_index = None
 
             res_list = []
-            for region in layout_res:
+            formula_res_list = []
+            for region_idx, (region, bbox) in enumerate(zip(layout_res, region_bboxes)):
                 res = ""
-                if region["bbox"] is not None:
-                    x1, y1, x2, y2 = region["bbox"]
-                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                    roi_img = ori_im[y1:y2, x1:x2, :]
-                else:
-                    x1, y1, x2, y2 = 0, 0, w, h
-                    roi_img = ori_im
-                bbox = [x1, y1, x2, y2]
+                x1, y1, x2, y2 = bbox
+                roi_img = ori_im[y1:y2, x1:x2, :]
 
                 if region["label"] == "table":
                     if self.table_system is not None:
+                        table_ocr_result = None
+                        if self.table_reuse_ocr and ocr_result is not None:
+                            # the page was already recognized, only boxes split
+                            # by cell boundaries are recognized again
+                            if table_line_index is None:
+                                table_line_index = ocr_line_index(ocr_result[0])
+                            table_ocr_result = crop_ocr_result(
+                                *ocr_result, bbox, line_index=table_line_index
+                            )
                         res, table_time_dict = self.table_system(
-                            roi_img, return_ocr_result_in_table
+                            roi_img,
+                            return_ocr_result_in_table,
+                            ocr_result=table_ocr_result,
                         )
                         time_dict["table"] += table_time_dict["table"]
                         time_dict["table_match"] += table_time_dict["match"]
@@ -169,14 +271,13 @@ class StructureSystem(object):
                         time_dict["rec"] += table_time_dict["rec"]
 
                 elif region["label"] == "equation" and self.formula_system is not None:
-                    latex_res, formula_time = self.formula_system([roi_img])
-                    time_dict["formula"] += formula_time
-                    res = {"latex": latex_res[0]}
+                    # recognized together with the other formulas of the page
+                    formula_res_list.append(len(res_list))
 
                 else:
-                    if text_res is not None:
-                        # Filter the text results whose regions intersect with the current layout bbox.
-                        res = self._filter_text_res(text_res, bbox)
+                    if region_text_res is not None:
+                        # The text results whose regions intersect with the current layout bbox.
+                        res = region_text_res[region_idx]
 
                 res_list.append(
                     {
@@ -189,20 +290,43 @@ class StructureSystem(object):
                     }
                 )
 
+            if formula_res_list:
+                time_dict["formula"] += self._predict_formula(
+                    [res_list[i] for i in formula_res_list]
+                )
+
             end = time.time()
             time_dict["all"] = end - start
             return res_list, time_dict
 
         elif self.mode == "kie":
-            re_res, elapse = self.kie_predictor(img)
+            re_res, elapse = self.kie_predictor(img, ocr_result)
             time_dict["kie"] = elapse
             time_dict["all"] = elapse
             return re_res[0], time_dict
 
         return None, None
 
-    def _predict_text(self, img):
-        filter_boxes, filter_rec_res, ocr_time_dict = self.text_system(img)
+    def _predict_formula(self, formula_res_list):
+        """Recognize the equation regions in batches and fill in their res."""
+        latex_res, formula_time = self.formula_system(
+            [region["img"] for region in formula_res_list]
+        )
+        for region, latex in zip(formula_res_list, latex_res):
+            region["res"] = {"latex": latex}
+        return formula_time
+
+    def _predict_text(self, img, text_layer=None, upright=None, skip_regions=None):
+        if text_layer is not None and not self.return_word_box:
+            filter_boxes, filter_rec_res, ocr_time_dict = ocr_with_text_layer(
+                self.text_system, img, text_layer, skip_regions=skip_regions
+            )
+        else:
+            filter_boxes, filter_rec_res, ocr_time_dict = self.text_system(
+                img, upright=upright, skip_regions=skip_regions
+            )
+        if filter_boxes is None:
+            filter_boxes, filter_rec_res = [], []
 
         # remove style char,
         # when using the recognition model trained on the PubtabNet dataset,
@@ -250,25 +374,15 @@ class StructureSystem(object):
                         "text_region": box.tolist(),
                     }
                 )
-        return res, ocr_time_dict
+        # the raw result keeps the style tokens for table recognition
+        return res, ocr_time_dict, (filter_boxes, filter_rec_res)
 
-    def _filter_text_res(self, text_res, bbox):
-        res = []
-        for r in text_res:
-            box = r["text_region"]
-            rect = box[0][0], box[0][1], box[2][0], box[2][1]
-            if self._has_intersection(bbox, rect):
-                res.append(r)
-        return res
-
-    def _has_intersection(self, rect1, rect2):
-        x_min1, y_min1, x_max1, y_max1 = rect1
-        x_min2, y_min2, x_max2, y_max2 = rect2
-        if x_min1 > x_max2 or x_max1 < x_min2:
-            return False
-        if y_min1 > y_max2 or y_max1 < y_min2:
-            return False
-        return True
+    def _filter_text_res(self, text_res, bboxes):
+        """Assign the text results to every layout bbox they intersect."""
+        boxes = [r["text_region"] for r in text_res]
+        rects = [[box[0][0], box[0][1], box[2][0], box[2][1]] for box in boxes]
+        region_lines = BoxIndex(rects).assign(bboxes)
+        return [[text_res[i] for i in lines] for lines in region_lines]
 
 
 def save_structure_res(res, save_folder, img_name, img_idx=0):
@@ -301,99 +415,303 @@ def save_structure_res(res, save_folder, img_name, img_idx=0):
                 cv2.imwrite(img_path, roi_img)
 
 
+def process_page(
+    structure_sys, img, image_file, save_folder, img_name, index, **kwargs
+):
+    """Predict the structure of a page and save its results and visualization."""
+    args = structure_sys.args
+    res, time_dict = structure_sys(img, img_idx=index, **kwargs)
+    img_save_path = os.path.join(save_folder, img_name, "show_{}.jpg".format(index))
+    os.makedirs(os.path.join(save_folder, img_name), exist_ok=True)
+    if structure_sys.mode == "structure" and res != []:
+        draw_img = draw_structure_result(img, res, args.vis_font_path)
+        save_structure_res(res, save_folder, img_name, index)
+    elif structure_sys.mode == "kie":
+        if structure_sys.kie_predictor.predictor is not None:
+            draw_img = draw_re_results(img, res, font_path=args.vis_font_path)
+        else:
+            draw_img = draw_ser_results(img, res, font_path=args.vis_font_path)
+
+        with open(
+            os.path.join(save_folder, img_name, "res_{}_kie.txt".format(index)),
+            "w",
+            encoding="utf8",
+        ) as f:
+            res_str = "{}\t{}\n".format(
+                image_file, json.dumps({"ocr_info": res}, ensure_ascii=False)
+            )
+            f.write(res_str)
+    if res != []:
+        cv2.imwrite(img_save_path, draw_img)
+        logger.info("result save to {}".format(img_save_path))
+    return res, time_dict
+
+
+def predict_pages(structure_sys, pages, image_file, save_folder, img_name):
+    """Predict the pages of a document, given as (index, img, text_layer),
+    one by one, yield index, res, time_dict and the page width in page
+    order."""
+    args = structure_sys.args
+    # the layout of the pages of a pdf is detected in batches, unless the
+    # pages are rotated first
+    batch_num = 1
+    if (
+        structure_sys.mode == "structure"
+        and structure_sys.layout_predictor is not None
+        and structure_sys.image_orientation_predictor is None
+    ):
+        batch_num = args.layout_batch_num
+    pages = iter(pages)
+    while True:
+        batch = list(itertools.islice(pages, batch_num))
+        if len(batch) == 0:
+            return
+        batch_layout_res = [None] * len(batch)
+        if len(batch) > 1:
+            batch_layout_res, elapse = structure_sys.layout_predictor.predict_batch(
+                [img for _, img, _ in batch]
+            )
+            logger.debug(
+                "layout of {} pages: {:.3f}s".format(len(batch_layout_res), elapse)
+            )
+        for (index, img, text_layer), layout_res in zip(batch, batch_layout_res):
+            res, time_dict = process_page(
+                structure_sys,
+                img,
+                image_file,
+                save_folder,
+                img_name,
+                index,
+                layout_res=layout_res,
+                text_layer=text_layer,
+            )
+            yield index, res, time_dict, img.shape[1]
+
+
+# the state of a page worker process, see init_page_worker
+_page_worker = {}
+
+
+def init_page_worker(args):
+    """Load the models once in every page worker process."""
+    _page_worker["structure_sys"] = StructureSystem(args)
+    _page_worker["pdf_path"] = None
+
+
+def predict_pdf_page(task):
+    """Render and predict a page of a pdf in a page worker process."""
+    image_file, index, save_folder, img_name = task
+    if _page_worker["pdf_path"] != image_file:
+        fitz = try_import("fitz")
+        if _page_worker["pdf_path"] is not None:
+            _page_worker["pdf"].close()
+        _page_worker["pdf"] = fitz.open(image_file)
+        _page_worker["pdf_path"] = image_file
+    page = _page_worker["pdf"][index]
+    img = pdf_page_to_img(page)
+    text_layer = None
+    if _page_worker["structure_sys"].args.use_pdf_text_layer:
+        text_layer = pdf_page_text_layer(page, pdf_page_zoom(page))
+    res, time_dict = process_page(
+        _page_worker["structure_sys"],
+        img,
+        image_file,
+        save_folder,
+        img_name,
+        index,
+        text_layer=text_layer,
+    )
+    # the region images are saved already and not sent back, the kie
+    # results have no region images
+    if _page_worker["structure_sys"].mode == "structure":
+        for region in res:
+            region.pop("img", None)
+    return index, res, time_dict, img.shape[1]
+
+
+def log_skips(args, skip_dict):
+    """Log how many pages and text boxes skipped the orientation classifiers
+    and how many text boxes were not recognized."""
+    if args.image_orientation:
+        logger.info(
+            "Image orientation skipped : {}/{} pages".format(
+                skip_dict["image_orientation_skip"], skip_dict["pages"]
+            )
+        )
+    num_boxes = skip_dict["cls_num"] + skip_dict["cls_skip"]
+    if num_boxes > 0:
+        logger.info(
+            "Cls skipped : {}/{} text boxes ({:.1%})".format(
+                skip_dict["cls_skip"], num_boxes, skip_dict["cls_skip"] / num_boxes
+            )
+        )
+    if skip_dict["rec_skip"] > 0:
+        logger.info(
+            "Rec skipped : {} text boxes in non-text regions".format(
+                skip_dict["rec_skip"]
+            )
+        )
+
+
 def main(args):
     image_file_list = get_image_file_list(args.image_dir)
     image_file_list = image_file_list
     image_file_list = image_file_list[args.process_id :: args.total_process_num]
 
+    # the models of the main process are only loaded for the files that are
+    # not predicted by the page workers
+    structure_sys = None
     if not args.use_pdf2docx_api:
-        structure_sys = StructureSystem(args)
-        save_folder = os.path.join(args.output, structure_sys.mode)
+        save_folder = os.path.join(args.output, args.mode)
         os.makedirs(save_folder, exist_ok=True)
     img_num = len(image_file_list)
-
-    for i, image_file in enumerate(image_file_list):
-        logger.info("[{}/{}] {}".format(i, img_num, image_file))
-        img, flag_gif, flag_pdf = check_and_read(image_file)
-        img_name = os.path.basename(image_file).split(".")[0]
-
-        if args.recovery and args.use_pdf2docx_api and flag_pdf:
-            try_import("pdf2docx")
-            from pdf2docx.converter import Converter
-
-            os.makedirs(args.output, exist_ok=True)
-            docx_file = os.path.join(args.output, "{}_api.docx".format(img_name))
-            cv = Converter(image_file)
-            cv.convert(docx_file)
-            cv.close()
-            logger.info("docx save to {}".format(docx_file))
-            continue
-
-        if not flag_gif and not flag_pdf:
-            img = cv2.imread(image_file)
-
-        if not flag_pdf:
-            if img is None:
-                logger.error("error in loading image:{}".format(image_file))
+    # created on the first pdf and shared by all of them
+    page_pool = None
+
+    try:
+        for i, image_file in enumerate(image_file_list):
+            logger.info("[{}/{}] {}".format(i, img_num, image_file))
+            img_name = os.path.basename(image_file).split(".")[0]
+            is_pdf = os.path.basename(image_file)[-3:].lower() == "pdf"
+
+            if args.recovery and args.use_pdf2docx_api and is_pdf:
+                try_import("pdf2docx")
+                from pdf2docx.converter import Converter
+
+                os.makedirs(args.output, exist_ok=True)
+                docx_file = os.path.join(args.output, "{}_api.docx".format(img_name))
+                cv = Converter(image_file)
+                cv.convert(docx_file)
+                cv.close()
+                logger.info("docx save to {}".format(docx_file))
                 continue
-            imgs = [img]
-        else:
-            imgs = img
 
-        all_res = []
-        for index, img in enumerate(imgs):
-            res, time_dict = structure_sys(img, img_idx=index)
-            img_save_path = os.path.join(
-                save_folder, img_name, "show_{}.jpg".format(index)
-            )
-            os.makedirs(os.path.join(save_folder, img_name), exist_ok=True)
-            if structure_sys.mode == "structure" and res != []:
-                draw_img = draw_structure_result(img, res, args.vis_font_path)
-                save_structure_res(res, save_folder, img_name, index)
-            elif structure_sys.mode == "kie":
-                if structure_sys.kie_predictor.predictor is not None:
-                    draw_img = draw_re_results(img, res, font_path=args.vis_font_path)
-                else:
-                    draw_img = draw_ser_results(img, res, font_path=args.vis_font_path)
-
-                with open(
-                    os.path.join(save_folder, img_name, "res_{}_kie.txt".format(index)),
-                    "w",
-                    encoding="utf8",
-                ) as f:
-                    res_str = "{}\t{}\n".format(
-                        image_file, json.dumps({"ocr_info": res}, ensure_ascii=False)
+            use_page_workers = is_pdf and args.page_workers > 1
+            if structure_sys is None and not use_page_workers:
+                structure_sys = StructureSystem(args)
+
+            if use_page_workers:
+                # the pages are rendered and predicted by the workers, the
+                # results come back in page order
+                if page_pool is None:
+                    page_pool = multiprocessing.get_context("spawn").Pool(
+                        args.page_workers,
+                        initializer=init_page_worker,
+                        initargs=(args,),
                     )
-                    f.write(res_str)
-            if res != []:
-                cv2.imwrite(img_save_path, draw_img)
-                logger.info("result save to {}".format(img_save_path))
-            if args.recovery and res != []:
-                from ppstructure.recovery.recovery_to_doc import (
-                    sorted_layout_boxes,
-                    convert_info_docx,
+                page_ids = PdfPageSource(
+                    image_file, args.page_num, args.page_range
+                ).pages
+                pages = page_pool.imap(
+                    predict_pdf_page,
+                    [(image_file, index, save_folder, img_name) for index in page_ids],
                 )
-                from ppstructure.recovery.recovery_to_markdown import (
-                    convert_info_markdown,
+            elif is_pdf:
+                # the pages are rendered on demand
+                imgs = PdfPageSource(
+                    image_file,
+                    args.page_num,
+                    args.page_range,
+                    text_layer=args.use_pdf_text_layer,
+                )
+                pages = predict_pages(
+                    structure_sys,
+                    imgs.iter_pages(),
+                    image_file,
+                    save_folder,
+                    img_name,
+                )
+            else:
+                img, flag_gif, _ = check_and_read(image_file)
+                if not flag_gif:
+                    img = cv2.imread(image_file)
+                if img is None:
+                    logger.error("error in loading image:{}".format(image_file))
+                    continue
+                pages = predict_pages(
+                    structure_sys, [(0, img, None)], image_file, save_folder, img_name
                 )
 
-                h, w, _ = img.shape
-                res = sorted_layout_boxes(res, w)
-                all_res += res
+            recovery_writers = []
+            if args.recovery:
+                from ppstructure.recovery.reading_order import sorted_layout_boxes
+                from ppstructure.recovery.recovery_to_doc import DocxRecoveryWriter
+                from ppstructure.recovery.recovery_to_markdown import (
+                    MarkdownRecoveryWriter,
+                )
 
-        if args.recovery and all_res != []:
-            try:
-                convert_info_docx(img, all_res, save_folder, img_name)
+                recovery_writers.append(DocxRecoveryWriter(save_folder, img_name))
                 if args.recovery_to_markdown:
-                    convert_info_markdown(all_res, save_folder, img_name)
-            except Exception as ex:
-                logger.error(
-                    "error in layout recovery image:{}, err msg: {}".format(
-                        image_file, ex
+                    recovery_writers.append(
+                        MarkdownRecoveryWriter(save_folder, img_name)
                     )
-                )
-                continue
-        logger.info("Predict time : {:.3f}s".format(time_dict["all"]))
+            recovered_pages = 0
+            time_dict = {"all": 0}
+            skip_dict = {
+                "pages": 0,
+                "image_orientation_skip": 0,
+                "cls_num": 0,
+                "cls_skip": 0,
+                "rec_skip": 0,
+            }
+            for index, res, time_dict, w in pages:
+                skip_dict["pages"] += 1
+                for key in [
+                    "image_orientation_skip",
+                    "cls_num",
+                    "cls_skip",
+                    "rec_skip",
+                ]:
+                    skip_dict[key] += time_dict[key]
+                if recovery_writers and res != []:
+                    res = sorted_layout_boxes(res, w)
+                    # figures are read back from the images saved above, so
+                    # the region images are not kept until the document is done
+                    for region in res:
+                        region.pop("img", None)
+                    try:
+                        for writer in recovery_writers:
+                            writer.add_page(res)
+                        recovered_pages += 1
+                    except Exception as ex:
+                        logger.error(
+                            "error in layout recovery image:{}, err msg: {}".format(
+                                image_file, ex
+                            )
+                        )
+                        for writer in recovery_writers:
+                            writer.abort()
+                        recovery_writers = []
+
+            if recovery_writers:
+                if recovered_pages > 0:
+                    try:
+                        for writer in recovery_writers:
+                            writer.close()
+                    except Exception as ex:
+                        logger.error(
+                            "error in layout recovery image:{}, err msg: {}".format(
+                                image_file, ex
+                            )
+                        )
+                        for writer in recovery_writers:
+                            writer.abort()
+                        continue
+                else:
+                    for writer in recovery_writers:
+                        writer.abort()
+            logger.info("Predict time : {:.3f}s".format(time_dict["all"]))
+            log_skips(args, skip_dict)
+    except BaseException:
+        # the pages still queued in the workers are not waited for
+        if page_pool is not None:
+            page_pool.terminate()
+            page_pool.join()
+        raise
+    else:
+        if page_pool is not None:
+            page_pool.close()
+            page_pool.join()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Reading order of layout regions by recursive XY-cut, shared by the docx and
+markdown recovery.
+"""
+
+__all__ = ["xycut_order", "sorted_layout_boxes"]
+
+
+def _split(order, lo, hi):
+    """Split boxes at the gaps of their projection on one axis.
+
+    order holds box indexes sorted by lo, each group keeps that order.
+    """
+    groups = []
+    reach = None
+    for i in order:
+        if reach is None or lo[i] > reach:
+            groups.append([])
+            reach = hi[i]
+        groups[-1].append(i)
+        reach = max(reach, hi[i])
+    return groups
+
+
+def _coverage(order, lo, hi):
+    """Covered intervals of the projection of boxes sorted by lo."""
+    return [
+        (lo[group[0]], max(hi[i] for i in group)) for group in _split(order, lo, hi)
+    ]
+
+
+def _merge_coverage(cover_1, cover_2):
+    intervals = sorted(cover_1 + cover_2)
+    merged = [intervals[0]]
+    for start, end in intervals[1:]:
+        if start > merged[-1][1]:
+            merged.append((start, end))
+        else:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+    return merged
+
+
+def _bucket(order, groups):
+    """Split order into one list per group, keeping the order within each.
+
+    groups are lists of box indexes, order holds all of them.
+    """
+    group_ids = {i: k for k, group in enumerate(groups) for i in group}
+    buckets = [[] for _ in groups]
+    for i in order:
+        buckets[group_ids[i]].append(i)
+    return buckets
+
+
+def xycut_order(bboxes, tolerance=0.05):
+    """Reading order of boxes by recursive XY-cut.
+
+    A node is first cut at the vertical gaps of its boxes into columns, read
+    left to right. When there is no such gap, e.g. because of a title across
+    the columns, it is cut at the horizontal gaps into bands, read top to
+    bottom. Consecutive bands whose union still has a vertical gap are merged
+    before recursing, so paragraphs that happen to be aligned across the
+    columns do not interleave the columns. Boxes that cannot be cut are read
+    by (y1, x1).
+
+    The boxes are sorted once per axis and the recursion only splits the
+    sorted lists by a bucket pass, so every level of the recursion is linear.
+
+    Args:
+        bboxes (list): Boxes [x1, y1, x2, y2].
+        tolerance (float): Fraction of its width and height every box is
+            shrunk by on each side for the projections, so that regions
+            slightly overlapping a gutter do not hide it.
+
+    Returns:
+        order (list): Box indexes in reading order.
+        columns (list): For every box, the number of columns of the
+            outermost column cut containing it, 1 if there is none.
+    """
+    num = len(bboxes)
+    x1, y1, x2, y2 = [], [], [], []
+    for box in bboxes:
+        dx = (box[2] - box[0]) * tolerance
+        dy = (box[3] - box[1]) * tolerance
+        x1.append(box[0] + dx)
+        y1.append(box[1] + dy)
+        x2.append(box[2] - dx)
+        y2.append(box[3] - dy)
+    x_order = sorted(range(num), key=lambda i: x1[i])
+    y_order = sorted(range(num), key=lambda i: y1[i])
+
+    order = []
+    columns = [1] * num
+    # iterative to keep deep staircase layouts off the python stack
+    stack = [(x_order, y_order, None)]
+    while stack:
+        node_x_order, node_y_order, node_columns = stack.pop()
+        x_groups = _split(node_x_order, x1, x2)
+        if len(x_groups) > 1:
+            if node_columns is None:
+                node_columns = len(x_groups)
+            children = [
+                (group, group_y_order, node_columns)
+                for group, group_y_order in zip(
+                    x_groups, _bucket(node_y_order, x_groups)
+                )
+            ]
+            stack.extend(reversed(children))
+            continue
+
+        y_groups = _split(node_y_order, y1, y2)
+        if len(y_groups) == 1:
+            leaf = sorted(node_y_order, key=lambda i: (bboxes[i][1], bboxes[i][0]))
+            for i in leaf:
+                columns[i] = node_columns or 1
+            order.extend(leaf)
+            continue
+
+        group_x_orders = _bucket(node_x_order, y_groups)
+        bands = []
+        cover = None
+        for group, group_x_order in zip(y_groups, group_x_orders):
+            group_cover = _coverage(group_x_order, x1, x2)
+            if cover is not None:
+                merged_cover = _merge_coverage(cover, group_cover)
+                if len(merged_cover) > 1:
+                    bands[-1].extend(group)
+                    cover = merged_cover
+                    continue
+            bands.append(list(group))
+            cover = group_cover
+        children = [
+            (band_x_order, band, node_columns)
+            for band, band_x_order in zip(bands, _bucket(node_x_order, bands))
+        ]
+        stack.extend(reversed(children))
+    return order, columns
+
+
+def sorted_layout_boxes(res, w):
+    """
+    Sort the layout regions of a page in reading order
+    args:
+        res(list):ppstructure results
+        w(int):page width, unused, kept for compatibility
+    return:
+        sorted results(list), with "columns", the number of columns of the
+        section the region belongs to, and "layout", "single" or "double"
+    """
+    order, columns = xycut_order([region["bbox"] for region in res])
+    new_res = []
+    for i in order:
+        res[i]["columns"] = columns[i]
+        res[i]["layout"] = "single" if columns[i] == 1 else "double"
+        new_res.append(res[i])
+    return new_res
@@ -126,6 +126,87 @@ def convert_text_space_tail(in_region):
     return text
 
 
+def replace_special_char(content):
+    special_chars = ["*", "`", "~", "$"]
+    for char in special_chars:
+        content = content.replace(char, "\\" + char)
+    return content
+
+
+def convert_region_markdown(region, img_name):
+    """Markdown of a layout region, None if the region is skipped."""
+    if not region["res"] and region["type"].lower() != "figure":
+        return None
+    img_idx = region["img_idx"]
+
+    if region["type"].lower() == "figure":
+        img_file_name = "{}_{}.jpg".format(region["bbox"], img_idx)
+        return f"""<div align="center">\n\t<img src="{img_name+"/"+img_file_name}">\n</div>"""
+    elif region["type"].lower() == "title":
+        return f"""# {region['res'][0]['text']}""" + "".join(
+            [" " + one_region["text"] for one_region in region["res"][1:]]
+        )
+    elif region["type"].lower() == "table":
+        return region["res"]["html"]
+    elif region["type"].lower() == "header" or region["type"].lower() == "footer":
+        return None
+    elif region["type"].lower() == "equation" and "latex" in region["res"]:
+        return f"""$${region["res"]["latex"]}$$"""
+    elif region["type"].lower() == "text":
+        merge_func = check_merge_method(region)
+        # logger.warning(f"use merge method:{merge_func.__name__}")
+        return replace_special_char(merge_func(region))
+    else:
+        string = ""
+        for line in region["res"]:
+            string += line["text"] + " "
+        return string
+
+
+class MarkdownRecoveryWriter(object):
+    """Appends the pages of a document to a markdown file page by page.
+
+    The file is written under a temporary name and renamed on close, so a
+    failed document leaves no partial markdown behind.
+    """
+
+    def __init__(self, save_folder, img_name):
+        self.img_name = img_name
+        self.md_path = os.path.join(save_folder, "{}_ocr.md".format(img_name))
+        self.tmp_path = self.md_path + ".tmp"
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+        self.first = True
+        # trailing newlines not written yet, runs of 3 or more newlines are
+        # collapsed to 2 and may continue in the next region
+        self.pending_newlines = 0
+
+    def add_page(self, res):
+        for region in res:
+            markdown_string = convert_region_markdown(region, self.img_name)
+            if markdown_string is None:
+                continue
+            if not self.first:
+                markdown_string = (
+                    "\n" * self.pending_newlines + "\n\n" + markdown_string
+                )
+            self.first = False
+            body = markdown_string.rstrip("\n")
+            self.pending_newlines = len(markdown_string) - len(body)
+            self.file.write(re.sub(r"\n{3,}", "\n\n", body))
+
+    def close(self):
+        self.file.write(re.sub(r"\n{3,}", "\n\n", "\n" * self.pending_newlines))
+        self.file.close()
+        os.replace(self.tmp_path, self.md_path)
+        logger.info("markdown save to {}".format(self.md_path))
+
+    def abort(self):
+        if not self.file.closed:
+            self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
 def convert_info_markdown(res, save_folder, img_name):
     """Save the recognition result as a markdown file.
 
@@ -137,51 +218,6 @@ def convert_info_markdown(res, save_folder, img_name):
     Returns:
         None
     """
-
-    def replace_special_char(content):
-        special_chars = ["*", "`", "~", "$"]
-        for char in special_chars:
-            content = content.replace(char, "\\" + char)
-        return content
-
-    markdown_string = []
-
-    for i, region in enumerate(res):
-        if not region["res"] and region["type"].lower() != "figure":
-            continue
-        img_idx = region["img_idx"]
-
-        if region["type"].lower() == "figure":
-            img_file_name = "{}_{}.jpg".format(region["bbox"], img_idx)
-            markdown_string.append(
-                f"""<div align="center">\n\t<img src="{img_name+"/"+img_file_name}">\n</div>"""
-            )
-        elif region["type"].lower() == "title":
-            markdown_string.append(
-                f"""# {region['res'][0]['text']}"""
-                + "".join(
-                    [" " + one_region["text"] for one_region in region["res"][1:]]
-                )
-            )
-        elif region["type"].lower() == "table":
-            markdown_string.append(region["res"]["html"])
-        elif region["type"].lower() == "header" or region["type"].lower() == "footer":
-            pass
-        elif region["type"].lower() == "equation" and "latex" in region["res"]:
-            markdown_string.append(f"""$${region["res"]["latex"]}$$""")
-        elif region["type"].lower() == "text":
-            merge_func = check_merge_method(region)
-            # logger.warning(f"use merge method:{merge_func.__name__}")
-            markdown_string.append(replace_special_char(merge_func(region)))
-        else:
-            string = ""
-            for line in region["res"]:
-                string += line["text"] + " "
-            markdown_string.append(string)
-
-    md_path = os.path.join(save_folder, "{}_ocr.md".format(img_name))
-    markdown_string = "\n\n".join(markdown_string)
-    markdown_string = re.sub(r"\n{3,}", "\n\n", markdown_string)
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(markdown_string)
-    logger.info("markdown save to {}".format(md_path))
+    writer = MarkdownRecoveryWriter(save_folder, img_name)
+    writer.add_page(res)
+    writer.close()
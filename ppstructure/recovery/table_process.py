@@ -18,8 +18,14 @@ This code is refer from: https://github.com/weizwx/html2docx/blob/master/htmldoc
 import re
 import docx
 from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Emu
+from docx.table import Table
 from bs4 import BeautifulSoup
 from html.parser import HTMLParser
+from functools import lru_cache
+from xml.sax.saxutils import escape
 
 
 def get_table_rows(table_soup):
@@ -139,6 +145,216 @@ font_names = {
 }
 
 
+VOID_TAGS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "wbr"}
+
+
+def parse_span(value):
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+class TableTokenizer(HTMLParser):
+    """Collects the cells of the outermost table of a html string.
+
+    Every cell is a dict with its tag, colspan, rowspan and text chunks, the
+    texts between tags that the per cell parsing of handle_table_by_cells
+    writes as runs: the direct children of a cell are separated by a space
+    and a cell without children reads as a single space.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self.table_depth = 0
+        self.cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.cell is not None and not (
+            self.table_depth == 1 and tag in ("td", "th", "tr")
+        ):
+            if tag == "table":
+                self.table_depth += 1
+            self.start_child(text=False)
+            if tag not in VOID_TAGS:
+                self.cell_depth += 1
+            return
+        if tag == "table":
+            self.table_depth += 1
+        elif self.table_depth != 1:
+            return
+        elif tag == "tr":
+            self.end_cell()
+            self.rows.append([])
+        elif tag in ("td", "th") and self.rows:
+            self.end_cell()
+            attrs = dict(attrs)
+            self.cell = {
+                "tag": tag,
+                "colspan": parse_span(attrs.get("colspan")),
+                "rowspan": parse_span(attrs.get("rowspan")),
+                "chunks": [],
+                "num_children": 0,
+            }
+            self.rows[-1].append(self.cell)
+            self.cell_depth = 0
+            self.last_child_text = False
+            self.buffer = ""
+
+    def handle_endtag(self, tag):
+        if self.cell is not None:
+            if self.table_depth == 1 and tag in ("td", "th", "tr", "table"):
+                self.end_cell()
+            else:
+                if tag == "table":
+                    self.table_depth -= 1
+                self.flush()
+                if self.cell_depth > 0:
+                    self.cell_depth -= 1
+                return
+        if tag == "table":
+            self.table_depth -= 1
+
+    def handle_data(self, data):
+        if self.cell is None:
+            return
+        if self.cell_depth == 0:
+            self.start_child(text=True)
+        self.buffer += data
+
+    def start_child(self, text):
+        if self.cell_depth == 0 and not (text and self.last_child_text):
+            if self.cell["num_children"] > 0:
+                self.buffer += " "
+            self.cell["num_children"] += 1
+        if self.cell_depth == 0:
+            self.last_child_text = text
+        if not text:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.cell["chunks"].append(self.buffer)
+            self.buffer = ""
+
+    def end_cell(self):
+        if self.cell is None:
+            return
+        self.flush()
+        if self.cell["num_children"] == 0 and self.cell["tag"] == "td":
+            self.cell["chunks"].append(" ")
+        self.cell = None
+
+
+def get_table_grid(rows):
+    """Places the cells of the rows on a grid.
+
+    The column count comes from the first row, cells and spans beyond the
+    grid are clipped and a cell starts at the first slot of its row not
+    covered by a cell above.
+
+    Returns:
+        grid (list): For every row, a list of slots that are None, a cell
+            origin (cell, rowspan, colspan) or ("continue", colspan) for the
+            slots of a vertically merged cell below its origin.
+        num_cols (int): Number of columns.
+    """
+    num_rows = len(rows)
+    num_cols = sum(cell["colspan"] for cell in rows[0]) if rows else 0
+    grid = [[None] * num_cols for _ in range(num_rows)]
+    covered = [[False] * num_cols for _ in range(num_rows)]
+    for row_idx, row in enumerate(rows):
+        col_idx = 0
+        for cell in row:
+            while col_idx < num_cols and covered[row_idx][col_idx]:
+                col_idx += 1
+            if col_idx >= num_cols:
+                break
+            colspan = 1
+            while (
+                colspan < cell["colspan"]
+                and col_idx + colspan < num_cols
+                and not covered[row_idx][col_idx + colspan]
+            ):
+                colspan += 1
+            rowspan = min(cell["rowspan"], num_rows - row_idx)
+            for r in range(row_idx, row_idx + rowspan):
+                for c in range(col_idx, col_idx + colspan):
+                    covered[r][c] = True
+                if r > row_idx:
+                    grid[r][col_idx] = ("continue", colspan)
+            grid[row_idx][col_idx] = (cell, rowspan, colspan)
+            col_idx += colspan
+    return grid, num_cols
+
+
+def get_run_xml(text):
+    if not text:
+        return "<w:r/>"
+    if text.strip() != text:
+        return '<w:r><w:t xml:space="preserve">%s</w:t></w:r>' % escape(text)
+    return "<w:r><w:t>%s</w:t></w:r>" % escape(text)
+
+
+def get_tc_xml(col_width, colspan, vmerge, chunks):
+    tc_pr = '<w:tcW w:type="dxa" w:w="%d"/>' % (col_width * colspan)
+    if colspan > 1:
+        tc_pr += '<w:gridSpan w:val="%d"/>' % colspan
+    if vmerge is not None:
+        tc_pr += vmerge
+    if chunks:
+        runs = "".join(
+            get_run_xml(remove_whitespace(chunk, True, True)) for chunk in chunks
+        )
+        paragraph = "<w:p>%s</w:p>" % runs
+    else:
+        paragraph = "<w:p/>"
+    return "<w:tc><w:tcPr>%s</w:tcPr>%s</w:tc>" % (tc_pr, paragraph)
+
+
+@lru_cache(maxsize=256)
+def get_table_xml(html, block_width, style_id):
+    """The w:tbl xml of a html table, the same doc.add_table plus per cell
+    merges and runs give, built as one string."""
+    tokenizer = TableTokenizer()
+    tokenizer.feed(html)
+    tokenizer.close()
+    tokenizer.end_cell()
+    grid, num_cols = get_table_grid(tokenizer.rows)
+    col_width = Emu(block_width // num_cols).twips if num_cols > 0 else 0
+
+    xml = [
+        "<w:tbl %s><w:tblPr>" % nsdecls("w"),
+        '<w:tblStyle w:val="%s"/>' % escape(style_id, {'"': "&quot;"}),
+        '<w:tblW w:type="auto" w:w="0"/>',
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" '
+        'w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/>',
+        "</w:tblPr><w:tblGrid>",
+        '<w:gridCol w:w="%d"/>' % col_width * num_cols,
+        "</w:tblGrid>",
+    ]
+    for grid_row in grid:
+        xml.append("<w:tr>")
+        col_idx = 0
+        while col_idx < num_cols:
+            slot = grid_row[col_idx]
+            if slot is None:
+                xml.append(get_tc_xml(col_width, 1, None, None))
+                col_idx += 1
+            elif slot[0] == "continue":
+                xml.append(get_tc_xml(col_width, slot[1], "<w:vMerge/>", None))
+                col_idx += slot[1]
+            else:
+                cell, rowspan, colspan = slot
+                vmerge = '<w:vMerge w:val="restart"/>' if rowspan > 1 else None
+                xml.append(get_tc_xml(col_width, colspan, vmerge, cell["chunks"]))
+                col_idx += colspan
+        xml.append("</w:tr>")
+    xml.append("</w:tbl>")
+    return "".join(xml)
+
+
 class HtmlToDocx(HTMLParser):
     def __init__(self):
         super().__init__()
@@ -237,6 +453,22 @@ class HtmlToDocx(HTMLParser):
             raise ValueError(f"Unable to apply style {self.paragraph_style}.") from e
 
     def handle_table(self, html, doc):
+        """
+        Add the html table to the document.
+        The cells are parsed with a light tokenizer and the whole docx table is
+        built as one xml string instead of merging and filling cells through
+        python-docx, which is linear in the size of the table instead of
+        quadratic. The output is the one of handle_table_by_cells, except that
+        spans overlapping other cells or the table edges are clipped.
+        """
+        xml = get_table_xml(
+            html, int(doc._block_width), doc.styles["Table Grid"].style_id
+        )
+        tbl = parse_xml(xml)
+        doc.element.body._insert_tbl(tbl)
+        return Table(tbl, doc)
+
+    def handle_table_by_cells(self, html, doc):
         """
         To handle nested tables, we will parse tables manually as follows:
         Get table soup
@@ -0,0 +1,163 @@
+# copyright (c) 2024 PaddlePaddle Authors. All Rights Reserve.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Uniform grid over axis aligned boxes, used to assign OCR lines to layout
+regions without testing every line against every region.
+"""
+
+import numpy as np
+
+__all__ = ["BoxIndex"]
+
+
+class BoxIndex(object):
+    """Index of boxes [x1, y1, x2, y2].
+
+    Every box is registered in the grid cells it covers. A query collects the
+    boxes of the cells covered by a region and tests only those exactly.
+
+    Args:
+        boxes (array): Boxes shaped (n, 4).
+        cell_size (float): Side of a grid cell. By default the median box
+            size, but at most 256 cells along the longer side of the extent.
+    """
+
+    def __init__(self, boxes, cell_size=None):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.boxes = np.concatenate(
+            [
+                np.minimum(boxes[:, :2], boxes[:, 2:]),
+                np.maximum(boxes[:, :2], boxes[:, 2:]),
+            ],
+            axis=1,
+        )
+        wh = self.boxes[:, 2:] - self.boxes[:, :2]
+        self.areas = wh[:, 0] * wh[:, 1]
+        if len(self.boxes) == 0:
+            self.origin = np.zeros((2,))
+            self.cell_size = 1.0 if cell_size is None else float(cell_size)
+            self.grid_shape = np.ones((2,), dtype=np.int64)
+            self._cell_box_ids = np.zeros((0,), dtype=np.int64)
+            self._cell_starts = np.zeros((2,), dtype=np.int64)
+            return
+
+        self.origin = self.boxes[:, :2].min(axis=0)
+        if cell_size is None:
+            extent = (self.boxes[:, 2:].max(axis=0) - self.origin).max()
+            cell_size = max(np.median(wh.max(axis=1)), extent / 256.0, 1.0)
+        self.cell_size = float(cell_size)
+        cell_min = self._cells(self.boxes[:, :2], clip=False)
+        cell_max = self._cells(self.boxes[:, 2:], clip=False)
+        self.grid_shape = cell_max.max(axis=0) + 1
+
+        cell_ids, box_ids = self._covered_cells(cell_min, cell_max)
+        order = np.argsort(cell_ids, kind="stable")
+        self._cell_box_ids = box_ids[order]
+        self._cell_starts = np.searchsorted(
+            cell_ids[order], np.arange(self.grid_shape.prod() + 1)
+        )
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cells(self, points, clip=True):
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        if clip:
+            cells = np.clip(cells, 0, self.grid_shape - 1)
+        return cells
+
+    def _covered_cells(self, cell_min, cell_max):
+        """Expand cell ranges into (cell id, item id) pairs."""
+        span = cell_max - cell_min + 1
+        counts = span[:, 0] * span[:, 1]
+        item_ids = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        x = cell_min[item_ids, 0] + offsets % span[item_ids, 0]
+        y = cell_min[item_ids, 1] + offsets // span[item_ids, 0]
+        return y * self.grid_shape[0] + x, item_ids
+
+    def assign(self, regions, min_overlap=0.0, exclusive=False):
+        """Assign the indexed boxes to regions.
+
+        Args:
+            regions (array): Regions [x1, y1, x2, y2] shaped (m, 4).
+            min_overlap (float): Minimum part of a box's area that has to lie
+                inside a region. With 0 every box touching the region counts.
+            exclusive (bool): Give every box only to the region that holds
+                the largest part of it, the first one on ties.
+
+        Returns:
+            box_ids (list): For every region, the ascending indices of its boxes.
+        """
+        regions = np.asarray(regions, dtype=np.float64).reshape(-1, 4)
+        num_regions, num_boxes = len(regions), len(self.boxes)
+        if num_regions == 0 or num_boxes == 0:
+            return [np.zeros((0,), dtype=np.int64) for _ in range(num_regions)]
+        regions = np.concatenate(
+            [
+                np.minimum(regions[:, :2], regions[:, 2:]),
+                np.maximum(regions[:, :2], regions[:, 2:]),
+            ],
+            axis=1,
+        )
+
+        # candidate (region, box) pairs from the shared grid cells
+        cell_ids, region_ids = self._covered_cells(
+            self._cells(regions[:, :2]), self._cells(regions[:, 2:])
+        )
+        starts = self._cell_starts[cell_ids]
+        counts = self._cell_starts[cell_ids + 1] - starts
+        offsets = (
+            np.arange(counts.sum())
+            - np.repeat(np.cumsum(counts) - counts, counts)
+            + np.repeat(starts, counts)
+        )
+        pairs = np.unique(
+            np.repeat(region_ids, counts) * num_boxes + self._cell_box_ids[offsets]
+        )
+        region_ids, box_ids = pairs // num_boxes, pairs % num_boxes
+
+        boxes, regions = self.boxes[box_ids], regions[region_ids]
+        inter_w = np.minimum(boxes[:, 2], regions[:, 2]) - np.maximum(
+            boxes[:, 0], regions[:, 0]
+        )
+        inter_h = np.minimum(boxes[:, 3], regions[:, 3]) - np.maximum(
+            boxes[:, 1], regions[:, 1]
+        )
+        ratio = (
+            np.clip(inter_w, 0, None)
+            * np.clip(inter_h, 0, None)
+            / np.maximum(self.areas[box_ids], 1e-6)
+        )
+        if min_overlap > 0:
+            hit = ratio >= min_overlap
+        else:
+            hit = (inter_w >= 0) & (inter_h >= 0)
+        region_ids, box_ids, ratio = region_ids[hit], box_ids[hit], ratio[hit]
+
+        if exclusive and len(box_ids) > 0:
+            order = np.lexsort((region_ids, -ratio, box_ids))
+            first = np.ones((len(order),), dtype=bool)
+            first[1:] = box_ids[order][1:] != box_ids[order][:-1]
+            keep = np.sort(order[first])
+            region_ids, box_ids = region_ids[keep], box_ids[keep]
+
+        split = np.cumsum(np.bincount(region_ids, minlength=num_regions))[:-1]
+        return np.split(box_ids, split)
+
+    def query(self, region, min_overlap=0.0):
+        """Indices of the boxes in one region, see assign."""
+        return self.assign([region], min_overlap)[0]
@@ -55,6 +55,62 @@ def compute_iou(rec1, rec2):
         return (intersect / (sum_area - intersect)) * 1.0
 
 
+def distance_matrix(boxes_1, boxes_2):
+    """distance of every pair of boxes (n, 4) and (m, 4), shaped (n, m)."""
+    diff = np.abs(boxes_2[None, :, :] - boxes_1[:, None, :])
+    dis_2 = diff[..., 0] + diff[..., 1]
+    dis_3 = diff[..., 2] + diff[..., 3]
+    dis = dis_2 + diff[..., 2] + diff[..., 3]
+    return dis + np.minimum(dis_2, dis_3)
+
+
+def iou_matrix(recs_1, recs_2):
+    """compute_iou of every pair of rects (n, 4) and (m, 4), shaped (n, m)."""
+    area_1 = (recs_1[:, 2] - recs_1[:, 0]) * (recs_1[:, 3] - recs_1[:, 1])
+    area_2 = (recs_2[:, 2] - recs_2[:, 0]) * (recs_2[:, 3] - recs_2[:, 1])
+    sum_area = area_1[:, None] + area_2[None, :]
+    left_line = np.maximum(recs_1[:, None, 1], recs_2[None, :, 1])
+    right_line = np.minimum(recs_1[:, None, 3], recs_2[None, :, 3])
+    top_line = np.maximum(recs_1[:, None, 0], recs_2[None, :, 0])
+    bottom_line = np.minimum(recs_1[:, None, 2], recs_2[None, :, 2])
+    intersect = (right_line - left_line) * (bottom_line - top_line)
+    valid = (left_line < right_line) & (top_line < bottom_line)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iou = intersect / (sum_area - intersect)
+    return np.where(valid, iou, 0.0).astype(iou.dtype)
+
+
+def merge_cell_contents(ocr_contents, ocr_indexes):
+    """
+    Texts of the ocr results matched to one cell.
+    When several results share the cell, their leading space and <b></b> are
+    removed and they are joined with a space.
+    :return: the texts, and whether the cell is bold
+    """
+    multi = len(ocr_indexes) > 1
+    b_with = multi and "<b>" in ocr_contents[ocr_indexes[0]]
+    if not multi:
+        return [ocr_contents[ocr_indexes[0]][0]], b_with
+    contents = []
+    last = len(ocr_indexes) - 1
+    for i, ocr_index in enumerate(ocr_indexes):
+        content = ocr_contents[ocr_index][0]
+        if len(content) == 0:
+            continue
+        if content[0] == " ":
+            content = content[1:]
+        if "<b>" in content:
+            content = content[3:]
+        if "</b>" in content:
+            content = content[:-4]
+        if len(content) == 0:
+            continue
+        if i != last and " " != content[-1]:
+            content += " "
+        contents.append(content)
+    return contents, b_with
+
+
 class TableMatch:
     def __init__(self, filter_ocr_result=False, use_master=False):
         self.filter_ocr_result = filter_ocr_result
@@ -76,29 +132,34 @@ class TableMatch:
         return pred_html
 
     def match_result(self, dt_boxes, pred_bboxes):
-        matched = {}
-        for i, gt_box in enumerate(dt_boxes):
-            distances = []
-            for j, pred_box in enumerate(pred_bboxes):
-                if len(pred_box) == 8:
-                    pred_box = [
-                        np.min(pred_box[0::2]),
-                        np.min(pred_box[1::2]),
-                        np.max(pred_box[0::2]),
-                        np.max(pred_box[1::2]),
-                    ]
-                distances.append(
-                    (distance(gt_box, pred_box), 1.0 - compute_iou(gt_box, pred_box))
-                )  # compute iou and l1 distance
-            sorted_distances = distances.copy()
-            # select det box by iou and l1 distance
-            sorted_distances = sorted(
-                sorted_distances, key=lambda item: (item[1], item[0])
+        if len(dt_boxes) == 0 or len(pred_bboxes) == 0:
+            return {}
+        dt_boxes = np.asarray(dt_boxes)
+        pred_bboxes = np.asarray(pred_bboxes)
+        dtype = np.result_type(dt_boxes, pred_bboxes)
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.float64
+        dt_boxes = dt_boxes.astype(dtype).reshape(len(dt_boxes), 4)
+        pred_bboxes = pred_bboxes.astype(dtype).reshape(len(pred_bboxes), -1)
+        if pred_bboxes.shape[1] == 8:
+            pred_bboxes = np.stack(
+                [
+                    pred_bboxes[:, 0::2].min(axis=1),
+                    pred_bboxes[:, 1::2].min(axis=1),
+                    pred_bboxes[:, 0::2].max(axis=1),
+                    pred_bboxes[:, 1::2].max(axis=1),
+                ],
+                axis=1,
             )
-            if distances.index(sorted_distances[0]) not in matched.keys():
-                matched[distances.index(sorted_distances[0])] = [i]
-            else:
-                matched[distances.index(sorted_distances[0])].append(i)
+        # select det box by iou and l1 distance, the first cell on ties
+        iou_cost = 1.0 - iou_matrix(dt_boxes, pred_bboxes)
+        distances = distance_matrix(dt_boxes, pred_bboxes)
+        best_iou = iou_cost == iou_cost.min(axis=1, keepdims=True)
+        best = np.where(best_iou, distances, np.inf).argmin(axis=1)
+
+        matched = {}
+        for i, j in enumerate(best.tolist()):
+            matched.setdefault(j, []).append(i)
         return matched
 
     def get_pred_html(self, pred_structures, matched_index, ocr_contents):
@@ -107,38 +168,17 @@ class TableMatch:
         for tag in pred_structures:
             if "</td>" in tag:
                 if "<td></td>" == tag:
-                    end_html.extend("<td>")
-                if td_index in matched_index.keys():
-                    b_with = False
-                    if (
-                        "<b>" in ocr_contents[matched_index[td_index][0]]
-                        and len(matched_index[td_index]) > 1
-                    ):
-                        b_with = True
-                        end_html.extend("<b>")
-                    for i, td_index_index in enumerate(matched_index[td_index]):
-                        content = ocr_contents[td_index_index][0]
-                        if len(matched_index[td_index]) > 1:
-                            if len(content) == 0:
-                                continue
-                            if content[0] == " ":
-                                content = content[1:]
-                            if "<b>" in content:
-                                content = content[3:]
-                            if "</b>" in content:
-                                content = content[:-4]
-                            if len(content) == 0:
-                                continue
-                            if (
-                                i != len(matched_index[td_index]) - 1
-                                and " " != content[-1]
-                            ):
-                                content += " "
-                        # escape content
-                        content = html.escape(content)
-                        end_html.extend(content)
+                    end_html.append("<td>")
+                if td_index in matched_index:
+                    contents, b_with = merge_cell_contents(
+                        ocr_contents, matched_index[td_index]
+                    )
+                    if b_with:
+                        end_html.append("<b>")
+                    # escape content
+                    end_html.extend(html.escape(content) for content in contents)
                     if b_with:
-                        end_html.extend("</b>")
+                        end_html.append("</b>")
                 if "<td></td>" == tag:
                     end_html.append("</td>")
                 else:
@@ -155,31 +195,11 @@ class TableMatch:
             if "</td>" in token:
                 txt = ""
                 b_with = False
-                if td_index in matched_index.keys():
-                    if (
-                        "<b>" in ocr_contents[matched_index[td_index][0]]
-                        and len(matched_index[td_index]) > 1
-                    ):
-                        b_with = True
-                    for i, td_index_index in enumerate(matched_index[td_index]):
-                        content = ocr_contents[td_index_index][0]
-                        if len(matched_index[td_index]) > 1:
-                            if len(content) == 0:
-                                continue
-                            if content[0] == " ":
-                                content = content[1:]
-                            if "<b>" in content:
-                                content = content[3:]
-                            if "</b>" in content:
-                                content = content[:-4]
-                            if len(content) == 0:
-                                continue
-                            if (
-                                i != len(matched_index[td_index]) - 1
-                                and " " != content[-1]
-                            ):
-                                content += " "
-                        txt += content
+                if td_index in matched_index:
+                    contents, b_with = merge_cell_contents(
+                        ocr_contents, matched_index[td_index]
+                    )
+                    txt = "".join(contents)
                 if b_with:
                     txt = "<b>{}</b>".format(txt)
                 if "<td></td>" == token:
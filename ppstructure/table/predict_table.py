@@ -34,6 +34,7 @@ from ppocr.utils.utility import get_image_file_list, check_and_read
 from ppocr.utils.logging import get_logger
 from ppstructure.table.matcher import TableMatch
 from ppstructure.table.table_master_match import TableMasterMatcher
+from ppstructure.spatial_index import BoxIndex
 from ppstructure.utility import parse_args
 import ppstructure.table.predict_structure as predict_strture
 
@@ -55,6 +56,43 @@ def expand(pix, det_box, shape):
     return x0_, y0_, x1_, y1_
 
 
+def ocr_line_index(dt_boxes):
+    """BoxIndex over the bounding rects of text boxes shaped (4, 2)."""
+    boxes = np.array(dt_boxes, dtype=np.float32).reshape(-1, 4, 2)
+    return BoxIndex(np.concatenate([boxes.min(axis=1), boxes.max(axis=1)], axis=1))
+
+
+def crop_ocr_result(dt_boxes, rec_res, roi_bbox, min_inside_ratio=0.5, line_index=None):
+    """Select the page OCR lines of a table region.
+
+    Args:
+        dt_boxes (list): Page text boxes, each shaped (4, 2).
+        rec_res (list): (text, score) of every box.
+        roi_bbox (list): Region [x1, y1, x2, y2] in page coordinates.
+        min_inside_ratio (float): Minimum part of a box's bounding rect that
+            has to lie inside the region.
+        line_index (BoxIndex): ocr_line_index of dt_boxes, to share it between
+            the regions of a page.
+
+    Returns:
+        roi_boxes (list): Selected boxes, translated to the region and clipped
+            to its extent.
+        roi_rec_res (list): The matching recognition results.
+    """
+    if dt_boxes is None or len(dt_boxes) == 0:
+        return [], []
+    if line_index is None:
+        line_index = ocr_line_index(dt_boxes)
+    keep = line_index.query(roi_bbox, min_inside_ratio)
+    x1, y1, x2, y2 = roi_bbox
+    boxes = np.array(dt_boxes, dtype=np.float32).reshape(-1, 4, 2)
+    roi_boxes = boxes[keep] - np.array([x1, y1], dtype=np.float32)
+    roi_boxes[:, :, 0] = np.clip(roi_boxes[:, :, 0], 0, x2 - x1)
+    roi_boxes[:, :, 1] = np.clip(roi_boxes[:, :, 1], 0, y2 - y1)
+    roi_rec_res = [rec_res[i] for i in keep]
+    return list(roi_boxes), roi_rec_res
+
+
 class TableSystem(object):
     def __init__(self, args, text_detector=None, text_recognizer=None):
         self.args = args
@@ -89,7 +127,13 @@ class TableSystem(object):
             self.config,
         ) = utility.create_predictor(args, "table", logger)
 
-    def __call__(self, img, return_ocr_result_in_table=False):
+    def __call__(self, img, return_ocr_result_in_table=False, ocr_result=None):
+        """
+        ocr_result: optional (dt_boxes, rec_res) already recognized on this
+        table image, e.g. the page OCR clipped by crop_ocr_result. Detection is
+        skipped then and only boxes split by cell boundaries are recognized
+        again.
+        """
         result = dict()
         time_dict = {"det": 0, "rec": 0, "table": 0, "all": 0, "match": 0}
         start = time.time()
@@ -97,7 +141,13 @@ class TableSystem(object):
         result["cell_bbox"] = structure_res[1].tolist()
         time_dict["table"] = elapse
 
-        dt_boxes, rec_res, det_elapse, rec_elapse = self._ocr(copy.deepcopy(img))
+        if ocr_result is None:
+            dt_boxes, rec_res, det_elapse, rec_elapse = self._ocr(copy.deepcopy(img))
+        else:
+            dt_boxes, rec_res, rec_elapse = self._reuse_ocr(
+                img, structure_res[1], *ocr_result
+            )
+            det_elapse = 0
         time_dict["det"] = det_elapse
         time_dict["rec"] = rec_elapse
 
@@ -146,6 +196,77 @@ class TableSystem(object):
         logger.debug("rec_res num  : {}, elapse : {}".format(len(rec_res), rec_elapse))
         return dt_boxes, rec_res, det_elapse, rec_elapse
 
+    def _reuse_ocr(self, img, cell_bboxes, dt_boxes, rec_res, min_piece_ratio=0.2):
+        h, w = img.shape[:2]
+        if len(dt_boxes) == 0:
+            return np.zeros((0, 4)), [], 0
+        boxes = np.array(dt_boxes, dtype=np.float32).reshape(-1, 4, 2)
+        r_boxes = np.stack(
+            [
+                np.maximum(0, boxes[:, :, 0].min(axis=1) - 1),
+                np.maximum(0, boxes[:, :, 1].min(axis=1) - 1),
+                np.minimum(w, boxes[:, :, 0].max(axis=1) + 1),
+                np.minimum(h, boxes[:, :, 1].max(axis=1) + 1),
+            ],
+            axis=1,
+        )
+        cell_bboxes = np.array(cell_bboxes, dtype=np.float32)
+        if len(cell_bboxes) == 0:
+            return r_boxes, list(rec_res), 0
+        if cell_bboxes.shape[1] == 8:
+            cell_bboxes = np.stack(
+                [
+                    cell_bboxes[:, 0::2].min(axis=1),
+                    cell_bboxes[:, 1::2].min(axis=1),
+                    cell_bboxes[:, 0::2].max(axis=1),
+                    cell_bboxes[:, 1::2].max(axis=1),
+                ],
+                axis=1,
+            )
+
+        # (n, m, 4) intersection of every box with every cell
+        pieces = np.concatenate(
+            [
+                np.maximum(r_boxes[:, None, :2], cell_bboxes[None, :, :2]),
+                np.minimum(r_boxes[:, None, 2:], cell_bboxes[None, :, 2:]),
+            ],
+            axis=2,
+        )
+        piece_area = np.clip(pieces[..., 2] - pieces[..., 0], 0, None) * np.clip(
+            pieces[..., 3] - pieces[..., 1], 0, None
+        )
+        box_area = (r_boxes[:, 2] - r_boxes[:, 0]) * (r_boxes[:, 3] - r_boxes[:, 1])
+        covered = piece_area >= min_piece_ratio * np.maximum(box_area, 1e-6)[:, None]
+
+        # a box spread over several cells is cut along the cells and each
+        # piece is recognized again, other boxes keep the page result
+        new_boxes, new_rec_res, crops, crop_slots = [], [], [], []
+        for i in range(len(r_boxes)):
+            cells = np.nonzero(covered[i])[0]
+            if len(cells) < 2:
+                new_boxes.append(r_boxes[i])
+                new_rec_res.append(rec_res[i])
+                continue
+            cells = cells[np.lexsort((pieces[i, cells, 0], pieces[i, cells, 1]))]
+            for j in cells:
+                x0, y0, x1, y1 = expand(2, pieces[i, j], img.shape)
+                crops.append(img[int(y0) : int(y1), int(x0) : int(x1), :])
+                crop_slots.append(len(new_rec_res))
+                new_boxes.append(pieces[i, j])
+                new_rec_res.append(None)
+
+        rec_elapse = 0
+        if crops:
+            crop_rec_res, rec_elapse = self.text_recognizer(crops)
+            for slot, rec in zip(crop_slots, crop_rec_res):
+                new_rec_res[slot] = rec
+        logger.debug(
+            "reused ocr boxes: {}, re-recognized pieces: {}".format(
+                len(r_boxes), len(crops)
+            )
+        )
+        return np.array(new_boxes), new_rec_res, rec_elapse
+
 
 def to_excel(html_table, excel_path):
     from tablepyxl import tablepyxl
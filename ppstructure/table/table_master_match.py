@@ -23,6 +23,7 @@ import glob
 import copy
 import math
 import pickle
+import bisect
 import numpy as np
 
 from shapely.geometry import Polygon, MultiPoint
@@ -131,6 +132,45 @@ def cal_iou(bbox1, bbox2):
     return iou
 
 
+def cal_iou_matrix(bboxes1, bboxes2):
+    """
+    cal_iou of every pair of xyxy bboxes, shaped (n, m).
+    The union is the convex hull of both rectangles, that is their enclosing
+    rectangle without the corner triangles the hull cuts off.
+    :param bboxes1: (n, 4) xyxy bboxes
+    :param bboxes2: (m, 4) xyxy bboxes
+    :return: iou matrix
+    """
+    # convert_coord stores the corners as float32
+    b1 = np.asarray(bboxes1, dtype=np.float32).astype(np.float64).reshape(-1, 4)
+    b2 = np.asarray(bboxes2, dtype=np.float32).astype(np.float64).reshape(-1, 4)
+    b1 = np.concatenate(
+        [np.minimum(b1[:, :2], b1[:, 2:]), np.maximum(b1[:, :2], b1[:, 2:])], 1
+    )
+    b2 = np.concatenate(
+        [np.minimum(b2[:, :2], b2[:, 2:]), np.maximum(b2[:, :2], b2[:, 2:])], 1
+    )
+    b1, b2 = b1[:, None, :], b2[None, :, :]
+
+    inter_w = np.minimum(b1[..., 2], b2[..., 2]) - np.maximum(b1[..., 0], b2[..., 0])
+    inter_h = np.minimum(b1[..., 3], b2[..., 3]) - np.maximum(b1[..., 1], b2[..., 1])
+    inter_area = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+
+    hull_area = (
+        np.maximum(b1[..., 2], b2[..., 2]) - np.minimum(b1[..., 0], b2[..., 0])
+    ) * (np.maximum(b1[..., 3], b2[..., 3]) - np.minimum(b1[..., 1], b2[..., 1]))
+    diff = b1 - b2
+    # a corner of the enclosing rectangle is cut when one box reaches it in x
+    # and the other one in y
+    for dx, dy, sign in [(0, 1, -1), (2, 1, 1), (2, 3, -1), (0, 3, 1)]:
+        cross = diff[..., dx] * diff[..., dy] * sign
+        hull_area -= np.where(cross > 0, 0.5 * np.abs(diff[..., dx] * diff[..., dy]), 0)
+
+    iou = np.zeros_like(inter_area)
+    np.divide(inter_area, hull_area, out=iou, where=(inter_area > 0) & (hull_area > 0))
+    return iou
+
+
 def cal_distance(p1, p2):
     delta_x = p1[0] - p2[0]
     delta_y = p1[1] - p2[1]
@@ -176,13 +216,9 @@ def find_no_match(match_list, all_end2end_nums, type="end2end"):
     else:
         raise ValueError
 
-    no_match_indexs = []
     # m[0] is end2end index m[1] is master index
-    matched_bbox_indexs = [m[idx] for m in match_list]
-    for n in range(all_end2end_nums):
-        if n not in matched_bbox_indexs:
-            no_match_indexs.append(n)
-    return no_match_indexs
+    matched_bbox_indexs = set(m[idx] for m in match_list)
+    return [n for n in range(all_end2end_nums) if n not in matched_bbox_indexs]
 
 
 def is_abs_lower_than_threshold(this_bbox, target_bbox, threshold=3):
@@ -233,48 +269,50 @@ def sort_bbox(end2end_xywh_bboxes, no_match_end2end_indexes):
     :param no_match_end2end_indexes:
     :return:
     """
-    groups = []
-    bbox_groups = []
-    for index, end2end_xywh_bbox in zip(no_match_end2end_indexes, end2end_xywh_bboxes):
-        this_bbox = end2end_xywh_bbox
-        if len(groups) == 0:
-            groups.append([index])
-            bbox_groups.append([this_bbox])
+    # a bbox joins the first row whose first bbox is close to it in y, rows
+    # are at least the threshold apart so only the neighbouring row heads in
+    # y order have to be checked
+    head_ys, head_rows = [], []
+    row_heads, row_of_bbox = [], []
+    for end2end_xywh_bbox in end2end_xywh_bboxes:
+        pos = bisect.bisect_left(head_ys, end2end_xywh_bbox[1])
+        rows = [
+            head_rows[k]
+            for k in range(max(pos - 2, 0), min(pos + 2, len(head_ys)))
+            if is_abs_lower_than_threshold(end2end_xywh_bbox, row_heads[head_rows[k]])
+        ]
+        if rows:
+            row_of_bbox.append(min(rows))
         else:
-            flag = False
-            for g, bg in zip(groups, bbox_groups):
-                # this_bbox is belong to bg's row or not
-                if is_abs_lower_than_threshold(this_bbox, bg[0]):
-                    g.append(index)
-                    bg.append(this_bbox)
-                    flag = True
-                    break
-            if not flag:
-                # this_bbox is not belong to bg's row, create a row.
-                groups.append([index])
-                bbox_groups.append([this_bbox])
-
-    # sorted bboxes in a group
-    tmp_groups, tmp_bbox_groups = [], []
-    for g, bg in zip(groups, bbox_groups):
-        g_sorted, bg_sorted = sort_line_bbox(g, bg)
-        tmp_groups.append(g_sorted)
-        tmp_bbox_groups.append(bg_sorted)
-
-    # sorted groups, sort by coord y's value.
-    sorted_groups = [None] * len(tmp_groups)
-    sorted_bbox_groups = [None] * len(tmp_bbox_groups)
-    ys = [bg[0][1] for bg in tmp_bbox_groups]
-    sorted_ys = sorted(ys)
-    for g, bg in zip(tmp_groups, tmp_bbox_groups):
-        idx = sorted_ys.index(bg[0][1])
-        sorted_groups[idx] = g
-        sorted_bbox_groups[idx] = bg
-
-    # flatten, get final result
-    end2end_sorted_idx_list, end2end_sorted_bbox_list = flatten(
-        sorted_groups, sorted_bbox_groups
-    )
+            # this_bbox is not belong to any row, create a row.
+            head_ys.insert(pos, end2end_xywh_bbox[1])
+            head_rows.insert(pos, len(row_heads))
+            row_of_bbox.append(len(row_heads))
+            row_heads.append(end2end_xywh_bbox)
+    if len(row_heads) == 0:
+        return [], [], [], []
+
+    # sort bboxes in a row by coord x's value, and rows by coord y's value of
+    # their leftmost bbox.
+    row_of_bbox = np.array(row_of_bbox)
+    xs = np.array([end2end_xywh_bbox[0] for end2end_xywh_bbox in end2end_xywh_bboxes])
+    ys = np.array([end2end_xywh_bbox[1] for end2end_xywh_bbox in end2end_xywh_bboxes])
+    row_sizes = np.bincount(row_of_bbox, minlength=len(row_heads))
+    leftmost = np.lexsort((xs, row_of_bbox))[np.cumsum(row_sizes) - row_sizes]
+    row_order = np.argsort(ys[leftmost], kind="stable")
+    row_rank = np.empty_like(row_order)
+    row_rank[row_order] = np.arange(len(row_order))
+    order = np.lexsort((xs, row_rank[row_of_bbox])).tolist()
+    row_sizes = row_sizes[row_order].tolist()
+
+    end2end_sorted_idx_list = [no_match_end2end_indexes[k] for k in order]
+    end2end_sorted_bbox_list = [end2end_xywh_bboxes[k] for k in order]
+    sorted_groups, sorted_bbox_groups = [], []
+    start = 0
+    for size in row_sizes:
+        sorted_groups.append(end2end_sorted_idx_list[start : start + size])
+        sorted_bbox_groups.append(end2end_sorted_bbox_list[start : start + size])
+        start += size
 
     return (
         end2end_sorted_idx_list,
@@ -326,21 +364,14 @@ def center_rule_match(end2end_xywh_bboxes, structure_master_xyxy_bboxes):
     :param structure_master_xyxy_bboxes:
     :return: match pairs list, e.g. [[0,1], [1,2], ...]
     """
-    match_pairs_list = []
-    for i, end2end_xywh in enumerate(end2end_xywh_bboxes):
-        for j, master_xyxy in enumerate(structure_master_xyxy_bboxes):
-            x_end2end, y_end2end = end2end_xywh[0], end2end_xywh[1]
-            x_master1, y_master1, x_master2, y_master2 = (
-                master_xyxy[0],
-                master_xyxy[1],
-                master_xyxy[2],
-                master_xyxy[3],
-            )
-            center_point_end2end = (x_end2end, y_end2end)
-            corner_point_master = ((x_master1, y_master1), (x_master2, y_master2))
-            if is_inside(center_point_end2end, corner_point_master):
-                match_pairs_list.append([i, j])
-    return match_pairs_list
+    if len(end2end_xywh_bboxes) == 0 or len(structure_master_xyxy_bboxes) == 0:
+        return []
+    centers = np.asarray(end2end_xywh_bboxes)[:, None, :2]
+    masters = np.asarray(structure_master_xyxy_bboxes)[None, :, :]
+    inside = np.all(
+        (centers >= masters[..., 0:2]) & (centers <= masters[..., 2:4]), axis=2
+    )
+    return np.argwhere(inside).tolist()
 
 
 def iou_rule_match(
@@ -354,24 +385,17 @@ def iou_rule_match(
     :param structure_master_xyxy_bboxes:
     :return: match pairs list, e.g. [[0,1], [1,2], ...]
     """
+    if len(end2end_xyxy_bboxes) == 0 or len(structure_master_xyxy_bboxes) == 0:
+        return []
+    iou = cal_iou_matrix(end2end_xyxy_bboxes, structure_master_xyxy_bboxes)
+    # the first master bbox of the max iou, no match without overlap
+    max_match = iou.argmax(axis=1)
     match_pair_list = []
-    for end2end_xyxy_index, end2end_xyxy in zip(
-        end2end_xyxy_indexes, end2end_xyxy_bboxes
+    for end2end_xyxy_index, j, max_iou in zip(
+        end2end_xyxy_indexes, max_match.tolist(), iou.max(axis=1)
     ):
-        max_iou = 0
-        max_match = [None, None]
-        for j, master_xyxy in enumerate(structure_master_xyxy_bboxes):
-            end2end_4xy = convert_coord(end2end_xyxy)
-            master_4xy = convert_coord(master_xyxy)
-            iou = cal_iou(end2end_4xy, master_4xy)
-            if iou > max_iou:
-                max_match[0], max_match[1] = end2end_xyxy_index, j
-                max_iou = iou
-
-        if max_match[0] is None:
-            # no match
-            continue
-        match_pair_list.append(max_match)
+        if max_iou > 0:
+            match_pair_list.append([end2end_xyxy_index, j])
     return match_pair_list
 
 
@@ -387,21 +411,16 @@ def distance_rule_match(end2end_indexes, end2end_bboxes, master_indexes, master_
     :param master_bboxes:
     :return: match_pairs list, e.g. [[0,1], [1,2], ...]
     """
-    min_match_list = []
-    for j, master_bbox in zip(master_indexes, master_bboxes):
-        min_distance = np.inf
-        min_match = [0, 0]  # i, j
-        for i, end2end_bbox in zip(end2end_indexes, end2end_bboxes):
-            x_end2end, y_end2end = end2end_bbox[0], end2end_bbox[1]
-            x_master, y_master = master_bbox[0], master_bbox[1]
-            end2end_point = (x_end2end, y_end2end)
-            master_point = (x_master, y_master)
-            dist = cal_distance(master_point, end2end_point)
-            if dist < min_distance:
-                min_match[0], min_match[1] = i, j
-                min_distance = dist
-        min_match_list.append(min_match)
-    return min_match_list
+    if len(master_indexes) == 0:
+        return []
+    if len(end2end_indexes) == 0:
+        return [[0, 0] for _ in master_indexes]
+    end2end_points = np.asarray(end2end_bboxes)[None, :, :2]
+    master_points = np.asarray(master_bboxes)[:, None, :2]
+    delta = master_points - end2end_points
+    # the first end2end bbox of the min distance
+    min_match = (delta[..., 0] ** 2 + delta[..., 1] ** 2).argmin(axis=1)
+    return [[end2end_indexes[i], j] for i, j in zip(min_match.tolist(), master_indexes)]
 
 
 def extra_match(no_match_end2end_indexes, master_bbox_nums):
@@ -555,6 +574,8 @@ def deal_eb_token(master_token):
     :param master_token:
     :return:
     """
+    if "<eb" not in master_token:
+        return master_token
     master_token = master_token.replace("<eb></eb>", "<td></td>")
     master_token = master_token.replace("<eb1></eb1>", "<td> </td>")
     master_token = master_token.replace("<eb2></eb2>", "<td><b> </b></td>")
@@ -600,6 +621,36 @@ def insert_text_to_token(master_token_list, match_text_dict):
     return "".join(merged_result_list)
 
 
+ISOLATE_SPAN_PATTERN = re.compile(
+    r'<td></td> rowspan="(\d)+" colspan="(\d)+"></b></td>|'
+    r'<td></td> colspan="(\d)+" rowspan="(\d)+"></b></td>|'
+    r'<td></td> rowspan="(\d)+"></b></td>|'
+    r'<td></td> colspan="(\d)+"></b></td>'
+)
+SPAN_ATTR_PATTERN = re.compile(
+    r' rowspan="(\d)+" colspan="(\d)+"|'
+    r' colspan="(\d)+" rowspan="(\d)+"|'
+    r' rowspan="(\d)+"|'
+    r' colspan="(\d)+"'
+)
+SPAN_TD_PATTERN = re.compile(
+    r'<td rowspan="(\d)+" colspan="(\d)+">|'
+    r'<td colspan="(\d)+" rowspan="(\d)+">|'
+    r'<td rowspan="(\d)+">|'
+    r'<td colspan="(\d)+">'
+)
+TD_PATTERN = re.compile(
+    r'<td rowspan="(\d)+" colspan="(\d)+">(.+?)</td>|'
+    r'<td colspan="(\d)+" rowspan="(\d)+">(.+?)</td>|'
+    r'<td rowspan="(\d)+">(.+?)</td>|'
+    r'<td colspan="(\d)+">(.+?)</td>|'
+    r"<td>(.*?)</td>"
+)
+THEAD_PATTERN = re.compile("<thead>(.*?)</thead>")
+MULTI_B_PATTERN = re.compile("(<b>)+")
+MULTI_GB_PATTERN = re.compile("(</b>)+")
+
+
 def deal_isolate_span(thead_part):
     """
     Deal with isolate span cases in this function.
@@ -608,41 +659,13 @@ def deal_isolate_span(thead_part):
     :param thead_part:
     :return:
     """
-    # 1. find out isolate span tokens.
-    isolate_pattern = (
-        '<td></td> rowspan="(\d)+" colspan="(\d)+"></b></td>|'
-        '<td></td> colspan="(\d)+" rowspan="(\d)+"></b></td>|'
-        '<td></td> rowspan="(\d)+"></b></td>|'
-        '<td></td> colspan="(\d)+"></b></td>'
-    )
-    isolate_iter = re.finditer(isolate_pattern, thead_part)
-    isolate_list = [i.group() for i in isolate_iter]
-
-    # 2. find out span number, by step 1 results.
-    span_pattern = (
-        ' rowspan="(\d)+" colspan="(\d)+"|'
-        ' colspan="(\d)+" rowspan="(\d)+"|'
-        ' rowspan="(\d)+"|'
-        ' colspan="(\d)+"'
-    )
-    corrected_list = []
-    for isolate_item in isolate_list:
-        span_part = re.search(span_pattern, isolate_item)
-        spanStr_in_isolateItem = span_part.group()
-        # 3. merge the span number into the span token format string.
-        if spanStr_in_isolateItem is not None:
-            corrected_item = "<td{}></td>".format(spanStr_in_isolateItem)
-            corrected_list.append(corrected_item)
-        else:
-            corrected_list.append(None)
 
-    # 4. replace original isolated token.
-    for corrected_item, isolate_item in zip(corrected_list, isolate_list):
-        if corrected_item is not None:
-            thead_part = thead_part.replace(isolate_item, corrected_item)
-        else:
-            pass
-    return thead_part
+    # merge the span number of an isolate span token into the td token.
+    def correct_isolate_span(isolate_match):
+        span_part = SPAN_ATTR_PATTERN.search(isolate_match.group())
+        return "<td{}></td>".format(span_part.group())
+
+    return ISOLATE_SPAN_PATTERN.sub(correct_isolate_span, thead_part)
 
 
 def deal_duplicate_bb(thead_part):
@@ -652,33 +675,33 @@ def deal_duplicate_bb(thead_part):
     :param thead_part:
     :return:
     """
-    # 1. find out <td></td> in <thead></thead>.
-    td_pattern = (
-        '<td rowspan="(\d)+" colspan="(\d)+">(.+?)</td>|'
-        '<td colspan="(\d)+" rowspan="(\d)+">(.+?)</td>|'
-        '<td rowspan="(\d)+">(.+?)</td>|'
-        '<td colspan="(\d)+">(.+?)</td>|'
-        "<td>(.*?)</td>"
-    )
-    td_iter = re.finditer(td_pattern, thead_part)
-    td_list = [t.group() for t in td_iter]
 
-    # 2. is multiply <b></b> in <td></td> or not?
-    new_td_list = []
-    for td_item in td_list:
+    def keep_one_bb_text(td_item):
         if td_item.count("<b>") > 1 or td_item.count("</b>") > 1:
             # multiply <b></b> in <td></td> case.
             # 1. remove all <b></b>
             td_item = td_item.replace("<b>", "").replace("</b>", "")
             # 2. replace <tb> -> <tb><b>, </tb> -> </b></tb>.
             td_item = td_item.replace("<td>", "<td><b>").replace("</td>", "</b></td>")
-            new_td_list.append(td_item)
-        else:
-            new_td_list.append(td_item)
+        return td_item
 
-    # 3. replace original thead part.
-    for td_item, new_td_item in zip(td_list, new_td_list):
-        thead_part = thead_part.replace(td_item, new_td_item)
+    def keep_one_bb(td_match):
+        return keep_one_bb_text(td_match.group())
+
+    # 1. find out <td></td> in <thead></thead>.
+    td_list = [t.group() for t in TD_PATTERN.finditer(thead_part)]
+    if all(
+        td_item.find("<td", 1) < 0 and td_item.find("</td>") == len(td_item) - 5
+        for td_item in td_list
+    ):
+        # every td item occurs only where it is matched, so they can be
+        # replaced in one pass
+        return TD_PATTERN.sub(keep_one_bb, thead_part)
+
+    # text with td tokens inside a td item, replace every occurrence of the
+    # td items one by one.
+    for td_item in td_list:
+        thead_part = thead_part.replace(td_item, keep_one_bb_text(td_item))
     return thead_part
 
 
@@ -690,17 +713,14 @@ def deal_bb(result_token):
     :return:
     """
     # find out <thead></thead> parts.
-    thead_pattern = "<thead>(.*?)</thead>"
-    if re.search(thead_pattern, result_token) is None:
+    thead_match = THEAD_PATTERN.search(result_token)
+    if thead_match is None:
         return result_token
-    thead_part = re.search(thead_pattern, result_token).group()
-    origin_thead_part = copy.deepcopy(thead_part)
+    thead_part = thead_match.group()
+    origin_thead_part = thead_part
 
     # check "rowspan" or "colspan" occur in <thead></thead> parts or not .
-    span_pattern = '<td rowspan="(\d)+" colspan="(\d)+">|<td colspan="(\d)+" rowspan="(\d)+">|<td rowspan="(\d)+">|<td colspan="(\d)+">'
-    span_iter = re.finditer(span_pattern, thead_part)
-    span_list = [s.group() for s in span_iter]
-    has_span_in_head = True if len(span_list) > 0 else False
+    has_span_in_head = SPAN_TD_PATTERN.search(thead_part) is not None
 
     if not has_span_in_head:
         # <thead></thead> not include "rowspan" or "colspan" branch 1.
@@ -724,23 +744,16 @@ def deal_bb(result_token):
         # Secondly, deal ordinary cases like branch 1
 
         # replace ">" to "<b>"
-        replaced_span_list = []
-        for sp in span_list:
-            replaced_span_list.append(sp.replace(">", "><b>"))
-        for sp, rsp in zip(span_list, replaced_span_list):
-            thead_part = thead_part.replace(sp, rsp)
+        thead_part = SPAN_TD_PATTERN.sub(
+            lambda sp: sp.group().replace(">", "><b>"), thead_part
+        )
 
         # replace "</td>" to "</b></td>"
         thead_part = thead_part.replace("</td>", "</b></td>")
 
         # remove duplicated <b> by re.sub
-        mb_pattern = "(<b>)+"
-        single_b_string = "<b>"
-        thead_part = re.sub(mb_pattern, single_b_string, thead_part)
-
-        mgb_pattern = "(</b>)+"
-        single_gb_string = "</b>"
-        thead_part = re.sub(mgb_pattern, single_gb_string, thead_part)
+        thead_part = MULTI_B_PATTERN.sub("<b>", thead_part)
+        thead_part = MULTI_GB_PATTERN.sub("</b>", thead_part)
 
         # ordinary cases like branch 1
         thead_part = thead_part.replace("<td>", "<td><b>").replace("<b><b>", "<b>")
@@ -2,7 +2,19 @@ from tqdm import tqdm
 from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
-def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0):
+def _process_chunk(function, chunk, use_kwargs):
+    out = []
+    for a in chunk:
+        try:
+            out.append(function(**a) if use_kwargs else function(a))
+        except Exception as e:
+            out.append(e)
+    return out
+
+
+def parallel_process(
+    array, function, n_jobs=16, use_kwargs=False, front_num=0, chunk_size=1
+):
     """
     A parallel version of the map function with a progress bar.
     Args:
@@ -13,6 +25,8 @@ def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0):
             keyword arguments to function
         front_num (int, default=3): The number of iterations to run serially before kicking off the parallel job.
             Useful for catching bugs
+        chunk_size (int, default=1): The number of elements sent to a worker at once, larger chunks amortize
+            the inter-process communication of cheap function calls
     Returns:
         [function(array[0]), function(array[1]), ...]
     """
@@ -30,26 +44,30 @@ def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0):
             for a in tqdm(array[front_num:])
         ]
     # Assemble the workers
+    chunks = [
+        array[i : i + chunk_size] for i in range(front_num, len(array), chunk_size)
+    ]
     with ProcessPoolExecutor(max_workers=n_jobs) as pool:
-        # Pass the elements of array into function
-        if use_kwargs:
-            futures = [pool.submit(function, **a) for a in array[front_num:]]
-        else:
-            futures = [pool.submit(function, a) for a in array[front_num:]]
+        # Pass the chunks of array into function
+        futures = {
+            pool.submit(_process_chunk, function, chunk, use_kwargs): len(chunk)
+            for chunk in chunks
+        }
         kwargs = {
-            "total": len(futures),
+            "total": len(array) - front_num,
             "unit": "it",
             "unit_scale": True,
             "leave": True,
         }
         # Print out the progress as tasks complete
-        for f in tqdm(as_completed(futures), **kwargs):
-            pass
+        with tqdm(**kwargs) as pbar:
+            for f in as_completed(futures):
+                pbar.update(futures[f])
     out = []
-    # Get the results from the futures.
-    for i, future in tqdm(enumerate(futures)):
+    # Get the results from the futures, in the order of array.
+    for future, chunk in zip(futures, chunks):
         try:
-            out.append(future.result())
+            out.extend(future.result())
         except Exception as e:
-            out.append(e)
+            out.extend([e] * len(chunk))
     return front + out
@@ -12,7 +12,7 @@
 from rapidfuzz.distance import Levenshtein
 from apted import APTED, Config
 from apted.helpers import Tree
-from collections import deque
+from collections import OrderedDict, deque
 from .parallel import parallel_process
 from tqdm import tqdm
 from paddle.utils import try_import
@@ -106,16 +106,25 @@ class CustomConfig_del_block(Config):
         return 0.0
 
 
+# The parsed ground truth tables of the process. It is module state rather
+# than state of TEDS, so that a worker process of parallel_process keeps it
+# across the chunks it evaluates, while self is pickled with every chunk.
+_TREE_CACHE = OrderedDict()
+
+
 class TEDS(object):
     """Tree Edit Distance basead Similarity"""
 
-    def __init__(self, structure_only=False, n_jobs=1, ignore_nodes=None):
+    def __init__(
+        self, structure_only=False, n_jobs=1, ignore_nodes=None, cache_size=4096
+    ):
         assert isinstance(n_jobs, int) and (
             n_jobs >= 1
         ), "n_jobs must be an integer greater than 1"
         self.structure_only = structure_only
         self.n_jobs = n_jobs
         self.ignore_nodes = ignore_nodes
+        self.cache_size = cache_size
         self.__tokens__ = []
 
     def tokenize(self, node):
@@ -157,35 +166,66 @@ class TEDS(object):
         if parent is None:
             return new_node
 
-    def evaluate(self, pred, true):
-        """Computes TEDS score between the prediction and the ground truth of a
-        given sample
+    def parse_table(self, html_str):
+        """Parses the table of an HTML string.
+
+        Returns:
+            (tree, n_nodes, signature) or None if there is no table. n_nodes
+            counts the nodes below the table, signature is the bracket
+            notation of the tree, equal for trees at edit distance 0.
         """
         try_import("lxml")
         from lxml import etree, html
 
+        parser = html.HTMLParser(remove_comments=True, encoding="utf-8")
+        node = html.fromstring(html_str, parser=parser)
+        if not node.xpath("body/table"):
+            return None
+        node = node.xpath("body/table")[0]
+        if self.ignore_nodes:
+            etree.strip_tags(node, *self.ignore_nodes)
+        n_nodes = len(node.xpath(".//*"))
+        tree = self.load_html_tree(node)
+        return tree, n_nodes, tree.bracket()
+
+    def _parse_true(self, true):
+        """parse_table of a ground truth, cached in the process since it is
+        evaluated against every prediction of it."""
+        if self.cache_size <= 0:
+            return self.parse_table(true)
+        key = (self.structure_only, tuple(self.ignore_nodes or ()), true)
+        if key in _TREE_CACHE:
+            _TREE_CACHE.move_to_end(key)
+            return _TREE_CACHE[key]
+        parsed = self.parse_table(true)
+        _TREE_CACHE[key] = parsed
+        while len(_TREE_CACHE) > self.cache_size:
+            _TREE_CACHE.popitem(last=False)
+        return parsed
+
+    def evaluate(self, pred, true):
+        """Computes TEDS score between the prediction and the ground truth of a
+        given sample
+        """
         if (not pred) or (not true):
             return 0.0
-        parser = html.HTMLParser(remove_comments=True, encoding="utf-8")
-        pred = html.fromstring(pred, parser=parser)
-        true = html.fromstring(true, parser=parser)
-        if pred.xpath("body/table") and true.xpath("body/table"):
-            pred = pred.xpath("body/table")[0]
-            true = true.xpath("body/table")[0]
-            if self.ignore_nodes:
-                etree.strip_tags(pred, *self.ignore_nodes)
-                etree.strip_tags(true, *self.ignore_nodes)
-            n_nodes_pred = len(pred.xpath(".//*"))
-            n_nodes_true = len(true.xpath(".//*"))
-            n_nodes = max(n_nodes_pred, n_nodes_true)
-            tree_pred = self.load_html_tree(pred)
-            tree_true = self.load_html_tree(true)
-            distance = APTED(
-                tree_pred, tree_true, CustomConfig()
-            ).compute_edit_distance()
-            return 1.0 - (float(distance) / n_nodes)
-        else:
+        parsed_pred = self.parse_table(pred)
+        parsed_true = self._parse_true(true)
+        if parsed_pred is None or parsed_true is None:
             return 0.0
+        tree_pred, n_nodes_pred, signature_pred = parsed_pred
+        tree_true, n_nodes_true, signature_true = parsed_true
+        n_nodes = max(n_nodes_pred, n_nodes_true)
+        if signature_pred == signature_true:
+            # identical trees, no edit
+            return 1.0
+        distance = APTED(tree_pred, tree_true, CustomConfig()).compute_edit_distance()
+        return 1.0 - (float(distance) / n_nodes)
+
+    def _chunk_size(self, num):
+        # a few chunks per worker keep them balanced while amortizing the
+        # pickling of the samples and of self
+        return max(1, num // (self.n_jobs * 8))
 
     def batch_evaluate(self, pred_json, true_json):
         """Computes TEDS score between the prediction and the ground truth of
@@ -209,7 +249,12 @@ class TEDS(object):
                 for filename in samples
             ]
             scores = parallel_process(
-                inputs, self.evaluate, use_kwargs=True, n_jobs=self.n_jobs, front_num=1
+                inputs,
+                self.evaluate,
+                use_kwargs=True,
+                n_jobs=self.n_jobs,
+                front_num=1,
+                chunk_size=self._chunk_size(len(inputs)),
             )
         scores = dict(zip(samples, scores))
         return scores
@@ -230,7 +275,12 @@ class TEDS(object):
             ]
 
             scores = parallel_process(
-                inputs, self.evaluate, use_kwargs=True, n_jobs=self.n_jobs, front_num=1
+                inputs,
+                self.evaluate,
+                use_kwargs=True,
+                n_jobs=self.n_jobs,
+                front_num=1,
+                chunk_size=self._chunk_size(len(inputs)),
             )
         return scores
 
@@ -35,6 +35,12 @@ def init_args():
     parser.add_argument("--table_algorithm", type=str, default="TableAttn")
     parser.add_argument("--table_model_dir", type=str)
     parser.add_argument("--merge_no_span_structure", type=str2bool, default=True)
+    parser.add_argument(
+        "--table_reuse_ocr",
+        type=str2bool,
+        default=False,
+        help="Reuse the page OCR result in table regions instead of running OCR again.",
+    )
     parser.add_argument(
         "--table_char_dict_path",
         type=str,
@@ -48,7 +54,13 @@ def init_args():
         type=str,
         default="../ppocr/utils/dict/latex_ocr_tokenizer.json",
     )
-    parser.add_argument("--formula_batch_num", type=int, default=1)
+    parser.add_argument(
+        "--formula_batch_num",
+        type=int,
+        default=1,
+        help="The max number of equation regions of a page recognized in one "
+        "forward pass, only regions padded to the same shape are batched.",
+    )
     # params for layout
     parser.add_argument("--layout_model_dir", type=str)
     parser.add_argument(
@@ -62,11 +74,40 @@ def init_args():
     parser.add_argument(
         "--layout_nms_threshold", type=float, default=0.5, help="Threshold of nms."
     )
+    parser.add_argument(
+        "--page_workers",
+        type=int,
+        default=1,
+        help="The pages of a pdf are rendered and predicted by this many worker "
+        "processes, each with its own models and --cpu_threads threads.",
+    )
+    parser.add_argument(
+        "--layout_batch_num",
+        type=int,
+        default=4,
+        help="The pages of a pdf are run through the layout model in batches of it.",
+    )
+    parser.add_argument(
+        "--ocr_skip_labels",
+        type=str,
+        default="figure,chart",
+        help="Comma separated labels of the layout regions whose text boxes are "
+        "not recognized. Table regions, unless --table_reuse_ocr, and equation "
+        "regions, with --formula, are never recognized.",
+    )
     # params for kie
     parser.add_argument("--kie_algorithm", type=str, default="LayoutXLM")
     parser.add_argument("--ser_model_dir", type=str)
     parser.add_argument("--re_model_dir", type=str)
     parser.add_argument("--use_visual_backbone", type=str2bool, default=True)
+    parser.add_argument("--ser_batch_num", type=int, default=8)
+    parser.add_argument(
+        "--kie_ocr_result_path",
+        type=str,
+        default=None,
+        help="system_results.txt of tools/infer/predict_system.py, the ocr "
+        "results of the images are used instead of running the ocr again",
+    )
     parser.add_argument(
         "--ser_dict_path", type=str, default="../train_data/XFUND/class_list_xfun.txt"
     )
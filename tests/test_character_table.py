@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.rec_postprocess import (
+    AttnLabelDecode,
+    CTCLabelDecode,
+    NRTRLabelDecode,
+)
+from ppocr.utils.character_table import clear_character_table_cache
+
+
+@pytest.fixture
+def dict_path(tmp_path):
+    path = tmp_path / "dict.txt"
+    path.write_text("a\nb\nc\n", encoding="utf-8")
+    clear_character_table_cache()
+    yield str(path)
+    clear_character_table_cache()
+
+
+def test_decoders_share_table(dict_path):
+    first = CTCLabelDecode(dict_path, use_space_char=True)
+    second = CTCLabelDecode(dict_path, use_space_char=True)
+    assert first.character_table is second.character_table
+    assert first.character == ("blank", "a", "b", "c", " ")
+    assert first.dict["c"] == 3
+
+    other_tokens = AttnLabelDecode(dict_path, use_space_char=True)
+    no_space = CTCLabelDecode(dict_path, use_space_char=False)
+    assert other_tokens.character_table is not first.character_table
+    assert other_tokens.character == ("sos", "a", "b", "c", " ", "eos")
+    assert no_space.character == ("blank", "a", "b", "c")
+
+    with pytest.raises(TypeError):
+        first.dict["d"] = 5
+
+
+def test_table_reloads_when_dict_changes(dict_path):
+    first = NRTRLabelDecode(dict_path)
+    with open(dict_path, "w", encoding="utf-8") as f:
+        f.write("a\nb\nc\nd\n")
+    os.utime(dict_path, ns=(0, 0))
+    second = NRTRLabelDecode(dict_path)
+    assert second.character_table is not first.character_table
+    assert second.character[-2:] == ("d", " ")
+
+
+def test_ctc_decode_with_char_array(dict_path):
+    decoder = CTCLabelDecode(dict_path)
+    preds = np.zeros((1, 6, 4), dtype=np.float32)
+    for t, idx in enumerate([1, 1, 0, 2, 3, 3]):
+        preds[0, t, idx] = 1.0
+    assert decoder(preds) == [("abc", 1.0)]
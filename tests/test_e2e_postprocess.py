@@ -0,0 +1,377 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.sast_postprocess import SASTPostProcess
+from ppocr.utils.e2e_utils.extract_textpoint_fast import (
+    expand_poly_along_width,
+    group_pos_by_label,
+    restore_poly,
+    sort_and_expand_with_direction_v2,
+)
+
+# Reference implementations: the per-pixel loops these postprocesses used
+# before they were vectorized. Outputs must stay identical.
+
+
+def reference_sort_with_direction(pos_list, f_direction):
+    """
+    f_direction: h x w x 2
+    pos_list: [[y, x], [y, x], [y, x] ...]
+    """
+
+    def sort_part_with_direction(pos_list, point_direction):
+        pos_list = np.array(pos_list).reshape(-1, 2)
+        point_direction = np.array(point_direction).reshape(-1, 2)
+        average_direction = np.mean(point_direction, axis=0, keepdims=True)
+        pos_proj_leng = np.sum(pos_list * average_direction, axis=1)
+        sorted_list = pos_list[np.argsort(pos_proj_leng)].tolist()
+        sorted_direction = point_direction[np.argsort(pos_proj_leng)].tolist()
+        return sorted_list, sorted_direction
+
+    pos_list = np.array(pos_list).reshape(-1, 2)
+    point_direction = f_direction[pos_list[:, 0], pos_list[:, 1]]  # x, y
+    point_direction = point_direction[:, ::-1]  # x, y -> y, x
+    sorted_point, sorted_direction = sort_part_with_direction(pos_list, point_direction)
+
+    point_num = len(sorted_point)
+    if point_num >= 16:
+        middle_num = point_num // 2
+        first_part_point = sorted_point[:middle_num]
+        first_point_direction = sorted_direction[:middle_num]
+        sorted_fist_part_point, sorted_fist_part_direction = sort_part_with_direction(
+            first_part_point, first_point_direction
+        )
+
+        last_part_point = sorted_point[middle_num:]
+        last_point_direction = sorted_direction[middle_num:]
+        sorted_last_part_point, sorted_last_part_direction = sort_part_with_direction(
+            last_part_point, last_point_direction
+        )
+        sorted_point = sorted_fist_part_point + sorted_last_part_point
+        sorted_direction = sorted_fist_part_direction + sorted_last_part_direction
+
+    return sorted_point, np.array(sorted_direction)
+
+
+def reference_sort_and_expand(pos_list, f_direction, binary_tcl_map):
+    """
+    f_direction: h x w x 2
+    pos_list: [[y, x], [y, x], [y, x] ...]
+    binary_tcl_map: h x w
+    """
+    h, w, _ = f_direction.shape
+    sorted_list, point_direction = reference_sort_with_direction(pos_list, f_direction)
+
+    point_num = len(sorted_list)
+    sub_direction_len = max(point_num // 3, 2)
+    left_direction = point_direction[:sub_direction_len, :]
+    right_dirction = point_direction[point_num - sub_direction_len :, :]
+
+    left_average_direction = -np.mean(left_direction, axis=0, keepdims=True)
+    left_average_len = np.linalg.norm(left_average_direction)
+    left_start = np.array(sorted_list[0])
+    left_step = left_average_direction / (left_average_len + 1e-6)
+
+    right_average_direction = np.mean(right_dirction, axis=0, keepdims=True)
+    right_average_len = np.linalg.norm(right_average_direction)
+    right_step = right_average_direction / (right_average_len + 1e-6)
+    right_start = np.array(sorted_list[-1])
+
+    append_num = max(int((left_average_len + right_average_len) / 2.0 * 0.15), 1)
+    max_append_num = 2 * append_num
+
+    left_list = []
+    right_list = []
+    for i in range(max_append_num):
+        ly, lx = (
+            np.round(left_start + left_step * (i + 1))
+            .flatten()
+            .astype("int32")
+            .tolist()
+        )
+        if ly < h and lx < w and (ly, lx) not in left_list:
+            if binary_tcl_map[ly, lx] > 0.5:
+                left_list.append((ly, lx))
+            else:
+                break
+
+    for i in range(max_append_num):
+        ry, rx = (
+            np.round(right_start + right_step * (i + 1))
+            .flatten()
+            .astype("int32")
+            .tolist()
+        )
+        if ry < h and rx < w and (ry, rx) not in right_list:
+            if binary_tcl_map[ry, rx] > 0.5:
+                right_list.append((ry, rx))
+            else:
+                break
+
+    all_list = left_list[::-1] + sorted_list + right_list
+    return all_list
+
+
+def reference_point_pair2poly(point_pair_list):
+    """
+    Transfer vertical point_pairs into poly point in clockwise.
+    """
+    point_num = len(point_pair_list) * 2
+    point_list = [0] * point_num
+    for idx, point_pair in enumerate(point_pair_list):
+        point_list[idx] = point_pair[0]
+        point_list[point_num - 1 - idx] = point_pair[1]
+    return np.array(point_list).reshape(-1, 2)
+
+
+def reference_restore_poly(
+    instance_yxs_list, seq_strs, p_border, ratio_w, ratio_h, src_w, src_h, valid_set
+):
+    poly_list = []
+    keep_str_list = []
+    for yx_center_line, keep_str in zip(instance_yxs_list, seq_strs):
+        if len(keep_str) < 2:
+            print("--> too short, {}".format(keep_str))
+            continue
+
+        offset_expand = 1.0
+        if valid_set == "totaltext":
+            offset_expand = 1.2
+
+        point_pair_list = []
+        for y, x in yx_center_line:
+            offset = p_border[:, y, x].reshape(2, 2) * offset_expand
+            ori_yx = np.array([y, x], dtype=np.float32)
+            point_pair = (
+                (ori_yx + offset)[:, ::-1]
+                * 4.0
+                / np.array([ratio_w, ratio_h]).reshape(-1, 2)
+            )
+            point_pair_list.append(point_pair)
+
+        detected_poly = reference_point_pair2poly(point_pair_list)
+        detected_poly = expand_poly_along_width(
+            detected_poly, shrink_ratio_of_width=0.2
+        )
+        detected_poly[:, 0] = np.clip(detected_poly[:, 0], a_min=0, a_max=src_w)
+        detected_poly[:, 1] = np.clip(detected_poly[:, 1], a_min=0, a_max=src_h)
+
+        keep_str_list.append(keep_str)
+        if valid_set == "partvgg":
+            middle_point = len(detected_poly) // 2
+            detected_poly = detected_poly[[0, middle_point - 1, middle_point, -1], :]
+            poly_list.append(detected_poly)
+        elif valid_set == "totaltext":
+            poly_list.append(detected_poly)
+        else:
+            print("--> Not supported format.")
+            exit(-1)
+    return poly_list, keep_str_list
+
+
+class ReferenceSASTPostProcess(SASTPostProcess):
+    def detect_sast(
+        self,
+        tcl_map,
+        tvo_map,
+        tbo_map,
+        tco_map,
+        ratio_w,
+        ratio_h,
+        src_w,
+        src_h,
+        shrink_ratio_of_width=0.3,
+        tcl_map_thresh=0.5,
+        offset_expand=1.0,
+        out_strid=4.0,
+    ):
+        """
+        first resize the tcl_map, tvo_map and tbo_map to the input_size, then restore the polys
+        """
+        # restore quad
+        scores, quads, xy_text = self.restore_quad(tcl_map, tcl_map_thresh, tvo_map)
+        dets = np.hstack((quads, scores)).astype(np.float32, copy=False)
+        dets = self.nms(dets)
+        if dets.shape[0] == 0:
+            return []
+        quads = dets[:, :-1].reshape(-1, 4, 2)
+
+        # Compute quad area
+        quad_areas = []
+        for quad in quads:
+            edge = [
+                (quad[1][0] - quad[0][0]) * (quad[1][1] + quad[0][1]),
+                (quad[2][0] - quad[1][0]) * (quad[2][1] + quad[1][1]),
+                (quad[3][0] - quad[2][0]) * (quad[3][1] + quad[2][1]),
+                (quad[0][0] - quad[3][0]) * (quad[0][1] + quad[3][1]),
+            ]
+            quad_areas.append(-np.sum(edge) / 2.0)
+
+        # instance segmentation
+        # instance_count, instance_label_map = cv2.connectedComponents(tcl_map.astype(np.uint8), connectivity=8)
+        instance_count, instance_label_map = self.cluster_by_quads_tco(
+            tcl_map, tcl_map_thresh, quads, tco_map
+        )
+
+        # restore single poly with tcl instance.
+        poly_list = []
+        for instance_idx in range(1, instance_count):
+            xy_text = np.argwhere(instance_label_map == instance_idx)[:, ::-1]
+            quad = quads[instance_idx - 1]
+            q_area = quad_areas[instance_idx - 1]
+            if q_area < 5:
+                continue
+
+            #
+            len1 = float(np.linalg.norm(quad[0] - quad[1]))
+            len2 = float(np.linalg.norm(quad[1] - quad[2]))
+            min_len = min(len1, len2)
+            if min_len < 3:
+                continue
+
+            # filter small CC
+            if xy_text.shape[0] <= 0:
+                continue
+
+            # filter low confidence instance
+            xy_text_scores = tcl_map[xy_text[:, 1], xy_text[:, 0], 0]
+            if np.sum(xy_text_scores) / quad_areas[instance_idx - 1] < 0.1:
+                # if np.sum(xy_text_scores) / quad_areas[instance_idx - 1] < 0.05:
+                continue
+
+            # sort xy_text
+            left_center_pt = np.array(
+                [[(quad[0, 0] + quad[-1, 0]) / 2.0, (quad[0, 1] + quad[-1, 1]) / 2.0]]
+            )  # (1, 2)
+            right_center_pt = np.array(
+                [[(quad[1, 0] + quad[2, 0]) / 2.0, (quad[1, 1] + quad[2, 1]) / 2.0]]
+            )  # (1, 2)
+            proj_unit_vec = (right_center_pt - left_center_pt) / (
+                np.linalg.norm(right_center_pt - left_center_pt) + 1e-6
+            )
+            proj_value = np.sum(xy_text * proj_unit_vec, axis=1)
+            xy_text = xy_text[np.argsort(proj_value)]
+
+            # Sample pts in tcl map
+            if self.sample_pts_num == 0:
+                sample_pts_num = self.estimate_sample_pts_num(quad, xy_text)
+            else:
+                sample_pts_num = self.sample_pts_num
+            xy_center_line = xy_text[
+                np.linspace(
+                    0,
+                    xy_text.shape[0] - 1,
+                    sample_pts_num,
+                    endpoint=True,
+                    dtype=np.float32,
+                ).astype(np.int32)
+            ]
+
+            point_pair_list = []
+            for x, y in xy_center_line:
+                # get corresponding offset
+                offset = tbo_map[y, x, :].reshape(2, 2)
+                if offset_expand != 1.0:
+                    offset_length = np.linalg.norm(offset, axis=1, keepdims=True)
+                    expand_length = np.clip(
+                        offset_length * (offset_expand - 1), a_min=0.5, a_max=3.0
+                    )
+                    offset_detal = offset / offset_length * expand_length
+                    offset = offset + offset_detal
+                    # original point
+                ori_yx = np.array([y, x], dtype=np.float32)
+                point_pair = (
+                    (ori_yx + offset)[:, ::-1]
+                    * out_strid
+                    / np.array([ratio_w, ratio_h]).reshape(-1, 2)
+                )
+                point_pair_list.append(point_pair)
+
+            # ndarry: (x, 2), expand poly along width
+            detected_poly = reference_point_pair2poly(point_pair_list)
+            detected_poly = self.expand_poly_along_width(
+                detected_poly, shrink_ratio_of_width
+            )
+            detected_poly[:, 0] = np.clip(detected_poly[:, 0], a_min=0, a_max=src_w)
+            detected_poly[:, 1] = np.clip(detected_poly[:, 1], a_min=0, a_max=src_h)
+            poly_list.append(detected_poly)
+
+        return poly_list
+
+
+def pg_maps(seed, h=96, w=128):
+    rng = np.random.default_rng(seed)
+    tcl_map = np.zeros((h, w), np.float32)
+    for _ in range(5):
+        y, x = int(rng.integers(5, h - 20)), int(rng.integers(5, w - 60))
+        axes = (int(rng.integers(10, 30)), int(rng.integers(3, 7)))
+        angle = float(rng.uniform(-30, 30))
+        cv2.ellipse(tcl_map, (x + 25, y + 6), axes, angle, 0, 360, 1.0, -1)
+    direction = rng.normal(0, 1, (h, w, 2)).astype(np.float32)
+    direction[..., 0] += 2
+    border = rng.normal(0, 3, (4, h, w)).astype(np.float32)
+    return tcl_map, direction, border
+
+
+def sast_maps(seed, h=96, w=128):
+    rng = np.random.default_rng(seed)
+    tcl = np.zeros((h, w, 1), np.float32)
+    for _ in range(5):
+        y, x = rng.integers(5, h - 10), rng.integers(5, w - 40)
+        tcl[y : y + 4, x : x + 30, 0] = rng.uniform(0.6, 1, (4, 30))
+    tvo = np.zeros((h, w, 8), np.float32)
+    for i, (dx, dy) in enumerate([(15, 5), (-15, 5), (-15, -5), (15, -5)]):
+        tvo[..., 2 * i] = dx + rng.normal(0, 1, (h, w))
+        tvo[..., 2 * i + 1] = dy + rng.normal(0, 1, (h, w))
+    tbo = rng.normal(0, 3, (h, w, 4)).astype(np.float32)
+    tco = rng.normal(0, 1, (h, w, 2)).astype(np.float32)
+    return tcl, tvo, tbo, tco
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_pg_instance_sort_and_restore_match_reference(seed):
+    tcl_map, direction, border = pg_maps(seed)
+    count, label_map = cv2.connectedComponents(tcl_map.astype(np.uint8), 8)
+    groups = group_pos_by_label(label_map, count)
+    assert len(groups) == count - 1
+
+    yxs_list, ref_yxs_list = [], []
+    for instance_id, pos in enumerate(groups, 1):
+        ys, xs = np.where(label_map == instance_id)
+        np.testing.assert_array_equal(pos, np.stack([ys, xs], axis=1))
+        result = sort_and_expand_with_direction_v2(pos, direction, tcl_map)
+        expected = reference_sort_and_expand(list(zip(ys, xs)), direction, tcl_map)
+        assert [tuple(p) for p in result] == [tuple(p) for p in expected]
+        yxs_list.append(result[:: max(len(result) // 6, 1)])
+        ref_yxs_list.append(expected[:: max(len(expected) // 6, 1)])
+
+    strs = ["text"] * len(yxs_list)
+    for valid_set in ["partvgg", "totaltext"]:
+        polys, _ = restore_poly(yxs_list, strs, border, 0.5, 0.7, 300, 200, valid_set)
+        ref_polys, _ = reference_restore_poly(
+            ref_yxs_list, strs, border, 0.5, 0.7, 300, 200, valid_set
+        )
+        for poly, ref_poly in zip(polys, ref_polys):
+            np.testing.assert_array_equal(poly, ref_poly)
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("sample_pts_num, offset_expand", [(2, 1.0), (0, 1.3)])
+def test_detect_sast_matches_reference(seed, sample_pts_num, offset_expand):
+    maps = sast_maps(seed)
+    result = SASTPostProcess(sample_pts_num=sample_pts_num).detect_sast(
+        *maps, 0.5, 0.6, 300, 200, offset_expand=offset_expand
+    )
+    expected = ReferenceSASTPostProcess(sample_pts_num=sample_pts_num).detect_sast(
+        *maps, 0.5, 0.6, 300, 200, offset_expand=offset_expand
+    )
+    assert len(result) == len(expected) > 0
+    for poly, ref_poly in zip(result, expected):
+        np.testing.assert_array_equal(poly, ref_poly)
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+from numpy.fft import ifft
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.fce_postprocess import FCEPostProcess, fill_hole, fourier2poly
+from ppocr.utils.poly_nms import poly_nms
+
+
+def reference_fourier2poly(fourier_coeff, num_reconstr_points=50):
+    a = np.zeros((len(fourier_coeff), num_reconstr_points), dtype="complex")
+    k = (len(fourier_coeff[0]) - 1) // 2
+    a[:, 0 : k + 1] = fourier_coeff[:, k:]
+    a[:, -k:] = fourier_coeff[:, :k]
+    poly_complex = ifft(a) * num_reconstr_points
+    polygon = np.zeros((len(fourier_coeff), num_reconstr_points, 2))
+    polygon[:, :, 0] = poly_complex.real
+    polygon[:, :, 1] = poly_complex.imag
+    return polygon.astype("int32").reshape((len(fourier_coeff), -1))
+
+
+def reference_decode(preds, fourier_degree, num_reconstr_points, scale, score_thr):
+    cls_pred = preds[0][0]
+    reg_pred = preds[1][0].transpose([1, 2, 0])
+    x_pred = reg_pred[:, :, : 2 * fourier_degree + 1]
+    y_pred = reg_pred[:, :, 2 * fourier_degree + 1 :]
+    score_pred = cls_pred[1] * cls_pred[3]
+    tr_mask = fill_hole(score_pred > score_thr)
+    tr_contours, _ = cv2.findContours(
+        tr_mask.astype(np.uint8), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
+    )
+    mask = np.zeros_like(tr_mask)
+    boundaries = []
+    for cont in tr_contours:
+        deal_map = mask.copy().astype(np.int8)
+        cv2.drawContours(deal_map, [cont], -1, 1, -1)
+        score_map = score_pred * deal_map
+        score_mask = score_map > 0
+        xy_text = np.argwhere(score_mask)
+        dxy = xy_text[:, 1] + xy_text[:, 0] * 1j
+        c = x_pred[score_mask] + y_pred[score_mask] * 1j
+        c[:, fourier_degree] = c[:, fourier_degree] + dxy
+        c *= scale
+        polygons = reference_fourier2poly(c, num_reconstr_points)
+        score = score_map[score_mask].reshape(-1, 1)
+        boundaries = boundaries + poly_nms(np.hstack((polygons, score)).tolist(), 0.1)
+    return poly_nms(boundaries, 0.1)
+
+
+def synthetic_preds(rng, fourier_degree, size=64):
+    cls_pred = np.zeros((1, 4, size, size), dtype=np.float32)
+    for _ in range(4):
+        x, y = rng.integers(4, size - 12, 2)
+        w, h = rng.integers(4, 10, 2)
+        cls_pred[0, [1, 3], y : y + h, x : x + w] = rng.uniform(
+            0.6, 1.0, (2, h, w)
+        ).astype(np.float32)
+    num_coeff = 2 * fourier_degree + 1
+    reg_pred = rng.normal(0, 0.5, (1, 2 * num_coeff, size, size)).astype(np.float32)
+    # a first order ellipse around the pixel with small jitter
+    reg_pred[0, fourier_degree + 1] += 3.0
+    reg_pred[0, num_coeff + fourier_degree + 1] += 1.5
+    return [cls_pred, reg_pred]
+
+
+def test_fourier2poly_matches_ifft():
+    rng = np.random.default_rng(0)
+    coeff = rng.normal(0, 20, (300, 11)) + 1j * rng.normal(0, 20, (300, 11))
+    result = fourier2poly(coeff, 50)
+    expected = reference_fourier2poly(coeff, 50)
+    assert np.abs(result - expected).max() <= 1
+    assert np.mean(result == expected) > 0.999
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_fcenet_decode_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    preds = synthetic_preds(rng, fourier_degree=5)
+    post_process = FCEPostProcess(scales=[8])
+    result = post_process.fcenet_decode(
+        preds, 5, 50, 8, alpha=1.0, beta=1.0, score_thr=0.3, nms_thr=0.1
+    )
+    expected = reference_decode(preds, 5, 50, 8, score_thr=0.3)
+    assert len(result) == len(expected)
+    for res, exp in zip(result, expected):
+        assert res[-1] == exp[-1]
+        assert np.abs(np.array(res[:-1]) - np.array(exp[:-1])).max() <= 1
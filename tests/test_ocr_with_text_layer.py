@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from tools.infer.predict_system import boxes_in_regions, ocr_with_text_layer
+
+
+def quad(x1, y1, x2, y2):
+    return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+
+
+class FakeTextSystem(object):
+    """Finds the same two lines, in page coordinates, in every image."""
+
+    def __init__(self, page_boxes):
+        self.page_boxes = page_boxes
+        self.shapes = []
+
+    def __call__(self, img, cls=True, skip_regions=None):
+        self.shapes.append(img.shape[:2])
+        # the images are at the top left of the page in this test
+        boxes = [box for box in self.page_boxes]
+        skip = boxes_in_regions(boxes, skip_regions or [])
+        boxes = [box for box, s in zip(boxes, skip) if not s]
+        time_dict = {"det": 0.1, "rec": 0.1, "rec_skip": int(skip.sum())}
+        return boxes, [("ocr", 0.9)] * len(boxes), time_dict
+
+
+def test_ocr_with_text_layer():
+    img = np.zeros((200, 100, 3), dtype=np.uint8)
+    text_layer = (
+        [quad(10, 10, 90, 20)],
+        [("layer", 1.0)],
+        # the second image starts below the page
+        [[0, 0, 100, 100], [0, 250, 100, 300]],
+    )
+    text_sys = FakeTextSystem([quad(11, 10, 89, 21), quad(10, 50, 90, 60)])
+    dt_boxes, rec_res, time_dict = ocr_with_text_layer(text_sys, img, text_layer)
+    # the line of the layer drawn over the image is not read again
+    assert rec_res == [("layer", 1.0), ("ocr", 0.9)]
+    np.testing.assert_allclose(dt_boxes[1], quad(10, 50, 90, 60))
+    assert time_dict["rec_skip"] == 1
+    # no empty crop goes through the text system
+    assert text_sys.shapes == [(100, 100)]
@@ -0,0 +1,90 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.utils.orientation import is_upright_box, is_upright_page
+from tools.infer.predict_system import TextSystem
+
+DOC_IMAGE = os.path.join(current_dir, "test_files", "doc_with_formula.png")
+
+
+def quad(x1, y1, x2, y2):
+    return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+
+
+def test_is_upright_page():
+    img = cv2.imread(DOC_IMAGE)
+    assert is_upright_page(img)
+    for rotate_code in [
+        cv2.ROTATE_90_CLOCKWISE,
+        cv2.ROTATE_180,
+        cv2.ROTATE_90_COUNTERCLOCKWISE,
+    ]:
+        assert not is_upright_page(cv2.rotate(img, rotate_code))
+    assert not is_upright_page(np.full((800, 600, 3), 255, dtype=np.uint8))
+    # too few lines to decide
+    assert not is_upright_page(img[:60])
+
+
+def test_is_upright_box():
+    assert is_upright_box(quad(10, 10, 200, 40))
+    # vertical
+    assert not is_upright_box(quad(10, 10, 40, 200))
+    center = np.array([100, 25], dtype=np.float32)
+    angle = np.radians(30)
+    rotation = np.array(
+        [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]
+    )
+    skewed = (quad(10, 10, 190, 40) - center) @ rotation.T + center
+    assert not is_upright_box(skewed)
+
+
+class FakeDetector(object):
+    def __init__(self, dt_boxes):
+        self.dt_boxes = dt_boxes
+
+    def __call__(self, img):
+        return self.dt_boxes.copy(), 0.1
+
+
+class FakeClassifier(object):
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, img_list, sample=False):
+        self.calls.append(len(img_list))
+        return img_list, [["0", 1.0]] * len(img_list), 0.1
+
+
+def test_text_system_skips_cls_of_upright_boxes():
+    text_sys = TextSystem.__new__(TextSystem)
+    text_sys.args = SimpleNamespace(det_box_type="quad", save_crop_res=False)
+    text_sys.text_detector = FakeDetector(
+        np.stack([quad(10, 10, 200, 40), quad(10, 100, 40, 300)])
+    )
+    text_sys.text_recognizer = lambda img_list: ([("a", 0.9)] * len(img_list), 0.1)
+    text_sys.text_classifier = FakeClassifier()
+    text_sys.use_angle_cls = True
+    text_sys.drop_score = 0.5
+    text_sys.orientation_gate = True
+    img = np.zeros((400, 300, 3), dtype=np.uint8)
+
+    _, rec_res, time_dict = text_sys(img, upright=True)
+    assert len(rec_res) == 2
+    assert text_sys.text_classifier.calls == [1]
+    assert time_dict["cls_num"] == 1 and time_dict["cls_skip"] == 1
+
+    # a blank page is not known to be upright
+    _, _, time_dict = text_sys(img)
+    assert text_sys.text_classifier.calls == [1, 2]
+    assert time_dict["cls_num"] == 2 and time_dict["cls_skip"] == 0
+
+    text_sys.orientation_gate = False
+    text_sys(img, upright=True)
+    assert text_sys.text_classifier.calls == [1, 2, 2]
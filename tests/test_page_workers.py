@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+import ppstructure.predict_system as predict_system
+from ppocr.utils.utility import PdfPageSource
+
+PDF_PATH = os.path.join(
+    current_dir,
+    "..",
+    "pdf",
+    "Monthly update on IFC office leasing - as at 30 June 2025 - memo.pdf",
+)
+FONT_PATH = os.path.join(current_dir, "..", "doc", "fonts", "french.ttf")
+
+
+class StubStructureSystem(object):
+    """Returns a text region telling the page index and its pixels apart."""
+
+    def __init__(self, mode="structure"):
+        self.args = SimpleNamespace(
+            vis_font_path=FONT_PATH, use_pdf_text_layer=False, layout_batch_num=2
+        )
+        self.mode = mode
+        self.layout_predictor = None
+        self.image_orientation_predictor = None
+
+    def __call__(self, img, img_idx=0, **kwargs):
+        h, w = img.shape[:2]
+        text = "page {} mean {:.3f}".format(img_idx, img.mean())
+        res = [
+            dict(
+                type="text",
+                bbox=[10, 10, w - 10, 40],
+                img=img[10:40, 10 : w - 10],
+                res=[
+                    dict(
+                        text=text,
+                        confidence=0.9,
+                        text_region=[[10, 10], [60, 10], [60, 30], [10, 30]],
+                    )
+                ],
+                img_idx=img_idx,
+            )
+        ]
+        time_dict = dict(
+            all=0.01, image_orientation_skip=0, cls_num=1, cls_skip=0, rec_skip=0
+        )
+        return res, time_dict
+
+
+def init_stub_page_worker():
+    predict_system._page_worker["structure_sys"] = StubStructureSystem()
+    predict_system._page_worker["pdf_path"] = None
+
+
+def read_results(save_folder, img_name, pages):
+    results = []
+    for index in pages:
+        path = os.path.join(save_folder, img_name, "res_{}.txt".format(index))
+        with open(path, encoding="utf8") as f:
+            results.append(f.read())
+    return results
+
+
+def test_page_workers_match_sequential_pages(tmp_path):
+    pytest.importorskip("fitz")
+    img_name = "memo"
+    page_ids = PdfPageSource(PDF_PATH, page_range="3,1-2").pages
+    assert page_ids == [2, 0, 1]
+
+    save_folder = str(tmp_path / "sequential")
+    pages = PdfPageSource(PDF_PATH, page_range="3,1-2", prefetch=0)
+    expected = list(
+        predict_system.predict_pages(
+            StubStructureSystem(),
+            pages.iter_pages(),
+            PDF_PATH,
+            save_folder,
+            img_name,
+        )
+    )
+    assert [index for index, _, _, _ in expected] == page_ids
+
+    pool_folder = str(tmp_path / "pool")
+    with multiprocessing.get_context("spawn").Pool(
+        2, initializer=init_stub_page_worker
+    ) as pool:
+        results = list(
+            pool.imap(
+                predict_system.predict_pdf_page,
+                [(PDF_PATH, index, pool_folder, img_name) for index in page_ids],
+            )
+        )
+
+    assert [index for index, _, _, _ in results] == page_ids
+    for (index, res, time_dict, w), (_, exp_res, exp_time_dict, exp_w) in zip(
+        results, expected
+    ):
+        assert w == exp_w
+        assert time_dict == exp_time_dict
+        # the region images are not sent back by the workers
+        assert all("img" not in region for region in res)
+        for region, exp_region in zip(res, exp_res):
+            assert region == {k: v for k, v in exp_region.items() if k != "img"}
+    assert read_results(pool_folder, img_name, page_ids) == read_results(
+        save_folder, img_name, page_ids
+    )
+    for index in page_ids:
+        assert os.path.exists(
+            os.path.join(pool_folder, img_name, "show_{}.jpg".format(index))
+        )
+
+
+def test_predict_pdf_page_keeps_kie_results(monkeypatch):
+    pytest.importorskip("fitz")
+    re_res = [({"text": "name"}, {"text": "value"})]
+    monkeypatch.setattr(
+        predict_system, "process_page", lambda *args, **kwargs: (re_res, {"all": 0})
+    )
+    monkeypatch.setitem(
+        predict_system._page_worker, "structure_sys", StubStructureSystem("kie")
+    )
+    monkeypatch.setitem(predict_system._page_worker, "pdf_path", None)
+
+    index, res, _, w = predict_system.predict_pdf_page((PDF_PATH, 1, "", "memo"))
+    predict_system._page_worker["pdf"].close()
+    assert index == 1 and res == re_res and w > 0
@@ -0,0 +1,97 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.utils.utility import PdfPageSource, parse_page_range
+
+PDF_PATH = os.path.join(
+    current_dir,
+    "..",
+    "pdf",
+    "Monthly update on IFC office leasing - as at 30 June 2025 - memo.pdf",
+)
+
+
+def test_parse_page_range():
+    assert parse_page_range("1-3,7", 10) == [0, 1, 2, 6]
+    assert parse_page_range("8-, 2", 10) == [7, 8, 9, 1]
+    assert parse_page_range("-2,12,0-1", 10) == [0, 1, 0]
+
+
+def test_pdf_page_source():
+    pytest.importorskip("fitz")
+    pages = PdfPageSource(PDF_PATH, prefetch=0)
+    assert len(pages) == 3
+    imgs = list(pages)
+    assert [img.shape for img in imgs] == [(1584, 1224, 3)] * 3
+
+    prefetched = list(PdfPageSource(PDF_PATH, prefetch=1))
+    assert all(np.array_equal(a, b) for a, b in zip(imgs, prefetched))
+
+    pages = PdfPageSource(PDF_PATH, page_num=1, page_range="2-")
+    assert pages.pages == [1, 2]
+    assert np.array_equal(next(iter(pages)), imgs[1])
+    assert PdfPageSource(PDF_PATH, page_num=1).pages == [0]
+
+    # the 792 pt high pages are fit in max_side pixels instead of 2x
+    assert list(PdfPageSource(PDF_PATH, max_side=1000))[0].shape[0] == 1000
+
+
+def test_pdf_page_text_layer():
+    pytest.importorskip("fitz")
+    pages = PdfPageSource(PDF_PATH, page_range="1", text_layer=True)
+    page_idx, img, (dt_boxes, rec_res, image_boxes) = next(pages.iter_pages())
+    assert page_idx == 0
+    assert len(dt_boxes) == len(rec_res) > 0
+    texts = [text for text, _ in rec_res]
+    assert "Memorandum" in texts
+    # the line of a table row is split at the gaps between its cells
+    assert "To :" in texts and "Ms. Kristine Li – HLD" in texts
+    for box in dt_boxes:
+        assert box.shape == (4, 2)
+        assert 0 <= box[:, 0].min() <= box[:, 0].max() <= img.shape[1]
+        assert 0 <= box[:, 1].min() <= box[:, 1].max() <= img.shape[0]
+    # the logos are images, their text can only be found by ocr
+    assert len(image_boxes) == 2
+
+    # a scanned pdf has no text layer
+    scanned_path = os.path.join(current_dir, "..", "pdf", "Gross Receipts Report.pdf")
+    pages = PdfPageSource(scanned_path, text_layer=True)
+    assert [text_layer for _, _, text_layer in pages.iter_pages()] == [None, None]
+
+
+def test_pdf_page_text_layer_of_searchable_scan(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    scan = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 260), 0)
+    scan.clear_with(200)
+    page.insert_image(page.rect, pixmap=scan)
+    # the invisible ocr text of the scan
+    page.insert_text((72, 100), "Hello world", fontsize=14, render_mode=3)
+    pdf_path = str(tmp_path / "searchable.pdf")
+    doc.save(pdf_path)
+
+    pages = PdfPageSource(pdf_path, text_layer=True)
+    _, img, (dt_boxes, rec_res, image_boxes) = next(pages.iter_pages())
+    assert rec_res == [("Hello world", 1.0)]
+    # the scan is not read again
+    assert image_boxes == []
+
+    # a picture partly off the page is clamped to it
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    page.insert_text((72, 100), "Hello world", fontsize=14)
+    page.insert_image(fitz.Rect(500, 700, 700, 900), pixmap=scan)
+    pdf_path = str(tmp_path / "picture.pdf")
+    doc.save(pdf_path)
+    pages = PdfPageSource(pdf_path, text_layer=True)
+    _, img, (_, _, image_boxes) = next(pages.iter_pages())
+    assert len(image_boxes) == 1
+    x1, y1, x2, y2 = image_boxes[0]
+    assert x1 < x2 <= img.shape[1] and y1 < y2 <= img.shape[0]
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.picodet_postprocess import (
+    hard_nms,
+    iou_matrix,
+    iou_of,
+    multiclass_nms,
+)
+
+
+def reference_multiclass_nms(bboxes, confidences, score_threshold, top_k):
+    picked_box_probs, picked_labels = [], []
+    for class_index in range(confidences.shape[1]):
+        probs = confidences[:, class_index]
+        mask = probs > score_threshold
+        if not mask.any():
+            continue
+        box_probs = np.concatenate([bboxes[mask], probs[mask, None]], axis=1)
+        box_probs = hard_nms(box_probs, iou_threshold=0.5, top_k=top_k)
+        picked_box_probs.append(box_probs)
+        picked_labels.extend([class_index] * box_probs.shape[0])
+    if not picked_box_probs:
+        return np.empty((0, 5)), np.array(picked_labels)
+    return np.concatenate(picked_box_probs), np.array(picked_labels)
+
+
+def test_iou_matrix():
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 100, (30, 2))
+    boxes = np.hstack([xy, xy + rng.uniform(-5, 40, (30, 2))])
+    iou = iou_matrix(boxes)
+    for i in range(len(boxes)):
+        assert np.array_equal(iou[i], iou_of(boxes, boxes[i : i + 1]))
+
+
+@pytest.mark.parametrize("top_k", [-1, 3])
+def test_multiclass_nms_matches_hard_nms(top_k):
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        num_boxes, num_classes = rng.integers(0, 400), rng.integers(1, 6)
+        # boxes clustered around a few regions, like the anchors of a page
+        centers = rng.uniform(0, 600, (5, 2))
+        xy = centers[rng.integers(0, 5, num_boxes)]
+        xy = xy + rng.normal(0, 10, (num_boxes, 2))
+        bboxes = np.hstack([xy, xy + rng.uniform(20, 80, (num_boxes, 2))])
+        confidences = rng.uniform(0, 1, (num_boxes, num_classes)).astype("float32")
+
+        box_probs, labels = multiclass_nms(bboxes, confidences, 0.5, 0.5, top_k)
+        expected_box_probs, expected_labels = reference_multiclass_nms(
+            bboxes, confidences, 0.5, top_k
+        )
+        assert np.array_equal(box_probs, expected_box_probs)
+        assert np.array_equal(labels, expected_labels)
@@ -0,0 +1,117 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.locality_aware_nms import intersection, standard_nms
+from ppocr.utils.poly_nms import (
+    PolygonSet,
+    boundary_iou,
+    convex_clip_areas,
+    poly_nms,
+    polygon_convex_mask,
+    polygon_simple_mask,
+)
+
+
+def reference_poly_nms(polygons, threshold):
+    polygons = np.array(sorted(polygons, key=lambda x: x[-1]))
+    keep_poly = []
+    index = [i for i in range(polygons.shape[0])]
+    while len(index) > 0:
+        keep_poly.append(polygons[index[-1]].tolist())
+        A = polygons[index[-1]][:-1]
+        index = np.delete(index, -1)
+        iou_list = np.array([boundary_iou(A, polygons[j][:-1]) for j in index])
+        index = np.delete(index, np.where(iou_list > threshold))
+    return keep_poly
+
+
+def reference_standard_nms(S, thres):
+    order = np.argsort(S[:, 8])[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
+        order = order[np.where(ovr <= thres)[0] + 1]
+    return S[keep]
+
+
+def random_quads(rng, num, size=400):
+    centers = rng.uniform(0, size, (num, 1, 2))
+    half = rng.uniform(5, 40, (num, 1, 2))
+    corners = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=np.float64)
+    angle = rng.uniform(-np.pi, np.pi, (num, 1, 1))
+    rot = np.concatenate(
+        [
+            np.concatenate([np.cos(angle), -np.sin(angle)], axis=2),
+            np.concatenate([np.sin(angle), np.cos(angle)], axis=2),
+        ],
+        axis=1,
+    )
+    quads = np.einsum("nij,nkj->nki", rot, corners[None] * half) + centers
+    quads += rng.normal(0, 3, quads.shape)
+    return quads
+
+
+def random_curved_polys(rng, num, num_points=20, size=300):
+    theta = np.linspace(0, 2 * np.pi, num_points, endpoint=False)
+    centers = rng.uniform(0, size, (num, 1, 2))
+    radius = rng.uniform(10, 40, (num, 1)) * (
+        1 + 0.4 * np.sin(3 * theta[None] + rng.uniform(0, np.pi, (num, 1)))
+    )
+    return centers + np.stack(
+        [radius * np.cos(theta), 0.5 * radius * np.sin(theta)], axis=2
+    )
+
+
+def test_convex_and_simple_masks():
+    polys = np.array(
+        [
+            [[0, 0], [4, 0], [4, 4], [0, 4]],
+            [[0, 0], [0, 4], [4, 4], [4, 0]],
+            [[0, 0], [4, 0], [1, 1], [0, 4]],
+            [[0, 0], [4, 4], [4, 0], [0, 4]],
+        ],
+        dtype=np.float64,
+    )
+    assert polygon_convex_mask(polys).tolist() == [True, True, False, False]
+    assert polygon_simple_mask(polys).tolist() == [True, True, True, False]
+
+
+def test_convex_clip_areas_matches_shapely():
+    rng = np.random.default_rng(0)
+    subject = random_curved_polys(rng, 64)
+    clip = random_quads(rng, 64, size=300)
+    poly_set = PolygonSet(clip, None)
+    keep = poly_set.convex & polygon_simple_mask(subject)
+    areas = convex_clip_areas(subject[keep], poly_set.ccw[keep])
+    expected = [
+        Polygon(s).intersection(Polygon(c)).area
+        for s, c in zip(subject[keep], clip[keep])
+    ]
+    np.testing.assert_allclose(areas, expected, rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize("num", [0, 1, 200])
+def test_standard_nms_matches_reference(num):
+    rng = np.random.default_rng(num)
+    quads = random_quads(rng, num).reshape((num, 8))
+    S = np.hstack([quads, rng.uniform(0, 1, (num, 1))])
+    np.testing.assert_allclose(standard_nms(S, 0.2), reference_standard_nms(S, 0.2))
+
+
+def test_poly_nms_matches_reference():
+    rng = np.random.default_rng(1)
+    polys = random_curved_polys(rng, 150).reshape((150, -1))
+    polygons = np.hstack([polys, rng.uniform(0, 1, (150, 1))]).tolist()
+    result = poly_nms(polygons, 0.1)
+    expected = reference_poly_nms(polygons, 0.1)
+    np.testing.assert_allclose(result, expected)
+    assert poly_nms([], 0.1) == []
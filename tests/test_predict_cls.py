@@ -0,0 +1,84 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.cls_postprocess import ClsPostProcess
+from tools.infer.predict_cls import TextClassifier
+
+
+class FakePredictor(object):
+    """Takes crops brighter at the bottom for upside down."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def run(self, output_tensors, input_dict):
+        batch = input_dict["x"]
+        self.batch_sizes.append(len(batch))
+        h = batch.shape[2]
+        top = batch[:, :, : h // 2].mean(axis=(1, 2, 3))
+        bottom = batch[:, :, h // 2 :].mean(axis=(1, 2, 3))
+        upside_down = (bottom > top).astype(np.float32)
+        return [np.stack([1 - upside_down, upside_down], axis=1)]
+
+
+def build_classifier(cls_sample_num):
+    text_classifier = TextClassifier.__new__(TextClassifier)
+    text_classifier.cls_image_shape = [3, 48, 192]
+    text_classifier.cls_batch_num = 6
+    text_classifier.cls_thresh = 0.9
+    text_classifier.cls_sample_num = cls_sample_num
+    text_classifier.postprocess_op = ClsPostProcess(label_list=["0", "180"])
+    text_classifier.predictor = FakePredictor()
+    text_classifier.input_tensor = SimpleNamespace(name="x")
+    text_classifier.output_tensors = None
+    text_classifier.use_onnx = True
+    return text_classifier
+
+
+def crop(upside_down, width=100):
+    img = np.zeros((20, width, 3), dtype=np.uint8)
+    img[10:] = 255
+    return img if upside_down else img[::-1].copy()
+
+
+def test_classify_all():
+    text_classifier = build_classifier(0)
+    img_list = [crop(i % 3 == 0, 40 + 10 * i) for i in range(8)]
+    out_list, cls_res, _ = text_classifier(img_list, sample=True)
+    assert [label for label, _ in cls_res] == [
+        "180" if i % 3 == 0 else "0" for i in range(8)
+    ]
+    for img, out in zip(img_list, out_list):
+        assert out[0, 0, 0] == 255
+    # the crops of the caller are not changed
+    assert img_list[0][0, 0, 0] == 0
+    assert text_classifier.predictor.batch_sizes == [6, 2]
+
+
+def test_sample_agreement():
+    text_classifier = build_classifier(3)
+    img_list = [crop(True) for _ in range(20)]
+    out_list, cls_res, _ = text_classifier(img_list, sample=True)
+    assert text_classifier.predictor.batch_sizes == [3]
+    assert all(label == "180" for label, _ in cls_res)
+    assert all(out[0, 0, 0] == 255 for out in out_list)
+
+    # without sample, e.g. for unrelated images, all crops are classified
+    text_classifier(img_list)
+    assert text_classifier.predictor.batch_sizes == [3, 6, 6, 6, 2]
+
+
+def test_sample_disagreement():
+    text_classifier = build_classifier(3)
+    # the first and last crops are sampled
+    img_list = [crop(i == 19) for i in range(20)]
+    out_list, cls_res, _ = text_classifier(img_list, sample=True)
+    assert sum(text_classifier.predictor.batch_sizes) == 20
+    assert [label for label, _ in cls_res] == ["0"] * 19 + ["180"]
+    assert all(out[0, 0, 0] == 255 for out in out_list)
@@ -0,0 +1,113 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.rec_postprocess import LaTeXOCRDecode
+from ppstructure.predict_system import StructureSystem
+from tools.infer.predict_rec import TextRecognizer
+
+VOCAB = ["[PAD]", "[BOS]", "[EOS]", "x", "^", "2", "y", "+", "1"]
+FORMULAS = [["x", "^", "2"], ["y", "+", "1"], ["x", "+", "y"]]
+
+
+class FakeTokenizer(object):
+    def decode(self, ids):
+        return " ".join(VOCAB[i] for i in ids)
+
+
+class FakeLaTeXOCRPredictor(object):
+    """Returns the token ids of FORMULAS[k] for the images of gray level
+    60 * k, padded like the exported model to one length per batch."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def run(self, output_tensors, input_dict):
+        batch = input_dict["x"]
+        self.batch_sizes.append(len(batch))
+        # undo the normalization of norm_img_latexocr
+        gray = (batch[:, 0, 0, 0] * 0.1738 + 0.7931) * 255
+        token_ids = np.zeros((len(batch), 6), dtype=np.int64)
+        for row, level in enumerate(gray):
+            formula = FORMULAS[int(round(level / 60))]
+            ids = [1] + [VOCAB.index(token) for token in formula] + [2]
+            token_ids[row, : len(ids)] = ids
+        return [token_ids]
+
+
+def build_formula_recognizer(rec_batch_num):
+    postprocess_op = LaTeXOCRDecode.__new__(LaTeXOCRDecode)
+    postprocess_op.tokenizer = FakeTokenizer()
+    text_recognizer = TextRecognizer.__new__(TextRecognizer)
+    text_recognizer.rec_algorithm = "LaTeXOCR"
+    text_recognizer.rec_batch_num = rec_batch_num
+    text_recognizer.rec_image_shape = [1, 192, 672]
+    text_recognizer.benchmark = False
+    text_recognizer.use_onnx = True
+    text_recognizer.predictor = FakeLaTeXOCRPredictor()
+    text_recognizer.input_tensor = SimpleNamespace(name="x")
+    text_recognizer.output_tensors = None
+    text_recognizer.postprocess_params = {"name": "LaTeXOCRDecode"}
+    text_recognizer.postprocess_op = postprocess_op
+    text_recognizer.return_word_box = False
+    return text_recognizer
+
+
+@pytest.mark.parametrize(
+    "rec_batch_num, batch_sizes", [(1, [1, 1, 1, 1, 1]), (3, [1, 1, 3]), (8, [1, 4])]
+)
+def test_latexocr_batch_decodes_every_image(rec_batch_num, batch_sizes):
+    text_recognizer = build_formula_recognizer(rec_batch_num)
+    # four images of one shape, and one of another shape
+    img_list = [np.full((40, 100, 3), 60 * k, dtype=np.uint8) for k in [0, 1, 2, 1]]
+    img_list.append(np.full((60, 100, 3), 120, dtype=np.uint8))
+
+    rec_res, _ = text_recognizer(img_list)
+    assert rec_res == ["x^2", "y+1", "x+y", "y+1", "x+y"]
+    assert sorted(text_recognizer.predictor.batch_sizes) == batch_sizes
+
+
+class FakeFormulaSystem(object):
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, img_list):
+        self.calls.append(len(img_list))
+        return ["x^{%d}" % i for i in range(len(img_list))], 0.6
+
+
+class FakeTextSystem(object):
+    def __call__(self, img, upright=None, skip_regions=None):
+        time_dict = dict(det=0.1, rec=0.1, cls_num=0, cls_skip=0, rec_skip=0)
+        return [], [], time_dict
+
+
+def test_structure_system_recognizes_the_formulas_of_a_page_at_once():
+    structure_sys = StructureSystem.__new__(StructureSystem)
+    structure_sys.mode = "structure"
+    structure_sys.image_orientation_predictor = None
+    structure_sys.layout_predictor = None
+    structure_sys.text_system = FakeTextSystem()
+    structure_sys.table_system = None
+    structure_sys.formula_system = FakeFormulaSystem()
+    structure_sys.table_reuse_ocr = False
+    structure_sys.return_word_box = False
+    structure_sys.ocr_skip_labels = {"equation"}
+    layout_res = [
+        dict(bbox=[0, 0, 100, 20], label="equation", score=0.9),
+        dict(bbox=[0, 30, 100, 50], label="text", score=0.9),
+        dict(bbox=[0, 60, 100, 100], label="equation", score=0.9),
+    ]
+    img = np.zeros((120, 100, 3), dtype=np.uint8)
+
+    res, time_dict = structure_sys(img, layout_res=layout_res)
+    assert structure_sys.formula_system.calls == [2]
+    assert res[0]["res"] == {"latex": "x^{0}"}
+    assert res[2]["res"] == {"latex": "x^{1}"}
+    assert time_dict["formula"] == pytest.approx(0.6)
@@ -0,0 +1,301 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.data import create_operators, transform
+from ppocr.data.imaug.label_ops import VQATokenLabelEncode
+from ppocr.postprocess import build_post_process
+from ppocr.utils.utility import load_vqa_bio_label_maps
+from ppstructure.kie.predict_kie_token_ser import SerPredictor, load_ocr_results
+from tools.infer.predict_system import TextSystem
+
+CLASS_PATH = os.path.join(
+    current_dir, "..", "ppocr", "utils", "dict", "kie_dict", "xfund_class_list.txt"
+)
+NUM_CLASSES = len(load_vqa_bio_label_maps(CLASS_PATH)[0])
+
+
+class StubTokenizer(object):
+    """One token per word, its id is taken from the characters of the word."""
+
+    padding_side = "right"
+    pad_token_type_id = 0
+    pad_token_id = 1
+
+    def encode(self, text, **kwargs):
+        input_ids = [0] + [3 + sum(map(ord, w)) % 997 for w in text.split()] + [2]
+        return {
+            "input_ids": input_ids,
+            "token_type_ids": [0] * len(input_ids),
+            "attention_mask": [1] * len(input_ids),
+        }
+
+    def batch_encode(self, texts, return_dict=True, **kwargs):
+        return [self.encode(text) for text in texts]
+
+
+class StubPredictor(object):
+    """Predicts the class of a token from its id and its box, the same in
+    any chunk or batch."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def run(self, output_names, input_dict):
+        input_ids, bbox = input_dict["input_ids"], input_dict["bbox"]
+        self.batch_sizes.append(len(input_ids))
+        assert input_ids.shape[1] == 512 and bbox.shape[1:] == (512, 4)
+        assert input_dict["image"].shape[1:] == (3, 224, 224)
+        return [token_logits(input_ids, bbox)]
+
+
+def token_logits(input_ids, bbox):
+    classes = (input_ids + bbox[..., 1]) % NUM_CLASSES
+    return np.eye(NUM_CLASSES, dtype="float32")[classes]
+
+
+def build_label_encode():
+    label_encode = VQATokenLabelEncode.__new__(VQATokenLabelEncode)
+    label_encode.tokenizer = StubTokenizer()
+    label_encode.contains_re = False
+    label_encode.label2id_map, _ = load_vqa_bio_label_maps(CLASS_PATH)
+    label_encode.add_special_ids = False
+    label_encode.infer_mode = True
+    label_encode.ocr_engine = None
+    label_encode.use_textline_bbox_info = True
+    label_encode.order_method = None
+    return label_encode
+
+
+IMAGE_OPS = [
+    {"Resize": {"size": [224, 224]}},
+    {
+        "NormalizeImage": {
+            "std": [58.395, 57.12, 57.375],
+            "mean": [123.675, 116.28, 103.53],
+            "scale": "1",
+            "order": "hwc",
+        }
+    },
+    {"ToCHWImage": None},
+]
+KEEP_KEYS = [
+    "input_ids",
+    "bbox",
+    "attention_mask",
+    "token_type_ids",
+    "image",
+    "labels",
+    "segment_offset_id",
+    "ocr_info",
+    "entities",
+]
+
+
+def build_ser_predictor(ser_batch_num):
+    ser_predictor = SerPredictor.__new__(SerPredictor)
+    ser_predictor.args = SimpleNamespace(use_onnx=True)
+    ser_predictor.ocr_engine = None
+    ser_predictor.max_seq_len = 512
+    ser_predictor.ser_batch_num = ser_batch_num
+    ser_predictor.preprocess_op = [build_label_encode()] + create_operators(
+        IMAGE_OPS + [{"KeepKeys": {"keep_keys": KEEP_KEYS + ["tokenizer_params"]}}],
+        {"infer_mode": True},
+    )
+    ser_predictor.postprocess_op = build_post_process(
+        {"name": "VQASerTokenLayoutLMPostProcess", "class_path": CLASS_PATH}
+    )
+    ser_predictor.predictor = StubPredictor()
+    ser_predictor.input_tensor = KEEP_KEYS[:5]
+    ser_predictor.output_tensors = None
+    return ser_predictor
+
+
+def old_chunks(label_encode, img, ocr_result):
+    """The chunks of the old pre process, VQATokenPad and VQASerTokenChunk
+    run on every 512 tokens of the encoded page."""
+    data = label_encode({"image": img, "ocr_result": ocr_result})
+    ops = create_operators(
+        [
+            {"VQATokenPad": {"max_seq_len": 512, "return_attention_mask": True}},
+            {"VQASerTokenChunk": {"max_seq_len": 512}},
+        ]
+        + IMAGE_OPS
+        + [{"KeepKeys": {"keep_keys": KEEP_KEYS}}],
+        {"infer_mode": True},
+    )
+    chunks = []
+    # a page without text is padded to one chunk
+    for start in range(0, max(len(data["input_ids"]), 1), 512):
+        chunk_data = dict(data, image=img.copy())
+        for key in ["input_ids", "bbox", "token_type_ids"]:
+            chunk_data[key] = data[key][start : start + 512]
+        chunks.append(transform(chunk_data, ops)[:5])
+    return chunks, data
+
+
+def make_page(num_lines, words_per_line, seed):
+    rng = np.random.RandomState(seed)
+    img = rng.randint(0, 255, (400, 300, 3)).astype(np.uint8)
+    ocr_result = []
+    for k in range(num_lines):
+        y = 10 + (k % 38) * 10
+        words = ["w{}".format(rng.randint(50)) for _ in range(words_per_line)]
+        ocr_result.append(
+            {
+                "transcription": " ".join(words),
+                "points": [[10, y], [290, y], [290, y + 8], [10, y + 8]],
+            }
+        )
+    return img, ocr_result
+
+
+def expected_result(ser_predictor, img, ocr_result):
+    """The post process of the predictions of all tokens of the page."""
+    chunks, data = old_chunks(build_label_encode(), img, ocr_result)
+    input_ids = np.array(data["input_ids"], dtype="int64").reshape([1, -1])
+    bbox = np.array(data["bbox"], dtype="int64").reshape([1, -1, 4])
+    return (
+        chunks,
+        ser_predictor.postprocess_op(
+            token_logits(input_ids, bbox),
+            segment_offset_ids=[data["segment_offset_id"]],
+            ocr_infos=[data["ocr_info"]],
+        )[0],
+    )
+
+
+def test_page_of_more_than_512_tokens():
+    ser_predictor = build_ser_predictor(8)
+    # 150 lines of 5 words, 750 tokens
+    img, ocr_result = make_page(150, 5, 0)
+    data = transform(
+        {"image": img.copy(), "ocr_result": ocr_result}, ser_predictor.preprocess_op
+    )
+    assert len(data[0]) == 750
+
+    chunks, token_slices = ser_predictor.make_chunks(data)
+    exp_chunks, _ = old_chunks(build_label_encode(), img, ocr_result)
+    assert len(chunks) == len(exp_chunks) == 2
+    assert token_slices == [slice(0, 512), slice(0, 238)]
+    for chunk, exp_chunk in zip(chunks, exp_chunks):
+        for field, exp_field in zip(chunk, exp_chunk):
+            np.testing.assert_array_equal(field, exp_field)
+
+    post_results, _, _ = ser_predictor.predict_batch([img], [ocr_result])
+    _, expected = expected_result(ser_predictor, img, ocr_result)
+    assert post_results[0] == expected
+    assert ser_predictor.predictor.batch_sizes == [2]
+
+
+def test_pages_share_batches():
+    pages = [make_page(20, 3, 1), make_page(120, 5, 2), make_page(3, 2, 3)]
+    pages.append((pages[0][0], []))
+    ser_predictor = build_ser_predictor(2)
+    post_results, inputs, _ = ser_predictor.predict_batch(
+        [img for img, _ in pages], [ocr_result for _, ocr_result in pages]
+    )
+    # 1 + 2 + 1 + 1 chunks, the page without text is a chunk of padding
+    assert ser_predictor.predictor.batch_sizes == [2, 2, 1]
+    for (img, ocr_result), post_result, page_inputs in zip(pages, post_results, inputs):
+        exp_chunks, expected = expected_result(ser_predictor, img, ocr_result)
+        assert post_result == expected
+        # the inputs of the first chunk are kept for the re predictor
+        for field, exp_field in zip(page_inputs[:5], exp_chunks[0]):
+            np.testing.assert_array_equal(field[0], exp_field)
+
+
+class FailingOcrEngine(object):
+    def ocr(self, img, cls=True):
+        raise AssertionError("the ocr result was given")
+
+    def __call__(self, img, cls=True):
+        raise AssertionError("the ocr result was given")
+
+
+class FakePaddleOCR(object):
+    def __init__(self, ocr_result):
+        self.ocr_result = ocr_result
+        self.calls = 0
+
+    def ocr(self, img, cls=True):
+        self.calls += 1
+        return [
+            [[res["points"], (res["transcription"], 0.9)] for res in self.ocr_result]
+        ]
+
+
+class FakeTextSystem(TextSystem):
+    def __init__(self, dt_boxes, rec_res):
+        self.dt_boxes = dt_boxes
+        self.rec_res = rec_res
+
+    def __call__(self, img, cls=True):
+        return self.dt_boxes, self.rec_res, {}
+
+
+def test_given_ocr_result_skips_the_engine():
+    img, ocr_result = make_page(10, 3, 4)
+    ser_predictor = build_ser_predictor(8)
+    ser_predictor.ocr_engine = FailingOcrEngine()
+    ser_predictor.preprocess_op[0].ocr_engine = FailingOcrEngine()
+    post_results, _, _ = ser_predictor.predict_batch([img], [ocr_result])
+    _, expected = expected_result(ser_predictor, img, ocr_result)
+    assert post_results[0] == expected
+
+    # the pages without an ocr result are recognized by the engine
+    ser_predictor.ocr_engine = FakePaddleOCR(ocr_result)
+    post_results, _, _ = ser_predictor.predict_batch([img, img], [ocr_result, None])
+    assert ser_predictor.ocr_engine.calls == 1
+    assert post_results[1] == expected
+
+
+def test_get_ocr_result_of_text_system():
+    dt_boxes = np.array(
+        [
+            [[10, 10], [90, 10], [90, 20], [10, 20]],
+            [[10, 30], [60, 30], [60, 40], [10, 40]],
+        ],
+        dtype=np.float32,
+    )
+    ser_predictor = build_ser_predictor(8)
+    ser_predictor.ocr_engine = FakeTextSystem(dt_boxes, [("name", 0.9), ("值", 0.8)])
+    ocr_result = ser_predictor.get_ocr_result(np.zeros((50, 100, 3), np.uint8))
+    assert ocr_result == [
+        {"transcription": "name", "points": [[10, 10], [90, 10], [90, 20], [10, 20]]},
+        {"transcription": "值", "points": [[10, 30], [60, 30], [60, 40], [10, 40]]},
+    ]
+    assert all(
+        isinstance(res["points"], list) and isinstance(res["points"][0], list)
+        for res in ocr_result
+    )
+    ser_predictor.ocr_engine = FakeTextSystem(None, None)
+    assert ser_predictor.get_ocr_result(np.zeros((50, 100, 3), np.uint8)) == []
+
+
+def test_load_ocr_results(tmp_path):
+    results = {
+        "page.jpg": [
+            {
+                "transcription": "姓名: 张三",
+                "points": [[1, 2], [30, 2], [30, 12], [1, 12]],
+            }
+        ],
+        "doc.pdf_0": [],
+        "doc.pdf_1": [
+            {"transcription": "a\tb", "points": [[0, 0], [9, 0], [9, 5], [0, 5]]}
+        ],
+    }
+    ocr_result_path = tmp_path / "system_results.txt"
+    # written like tools/infer/predict_system.py
+    with open(ocr_result_path, "w", encoding="utf-8") as f:
+        for image_name, res in results.items():
+            f.write(image_name + "\t" + json.dumps(res, ensure_ascii=False) + "\n")
+        f.write("\n")
+    assert load_ocr_results(str(ocr_result_path)) == results
@@ -0,0 +1,67 @@
+import os
+import sys
+from collections import deque
+
+import cv2
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.postprocess.pse_postprocess.pse import pse, pse_numpy
+
+
+def reference_pse(kernels, min_area):
+    # straight port of the FIFO expansion in pse.pyx
+    label_num, label = cv2.connectedComponents(kernels[-1], connectivity=4)
+    for label_idx in range(1, label_num):
+        if np.sum(label == label_idx) < min_area:
+            label[label == label_idx] = 0
+    pred = np.zeros(label.shape, dtype=np.int32)
+    que = deque()
+    for x, y in zip(*np.where(label > 0)):
+        que.append((x, y))
+        pred[x, y] = label[x, y]
+    for kernel_idx in range(kernels.shape[0] - 2, -1, -1):
+        nxt_que = deque()
+        while que:
+            x, y = que.popleft()
+            is_edge = True
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                tx, ty = x + dx, y + dy
+                if tx < 0 or tx >= label.shape[0] or ty < 0 or ty >= label.shape[1]:
+                    continue
+                if kernels[kernel_idx, tx, ty] == 0 or pred[tx, ty] > 0:
+                    continue
+                que.append((tx, ty))
+                pred[tx, ty] = pred[x, y]
+                is_edge = False
+            if is_edge:
+                nxt_que.append((x, y))
+        que = nxt_que
+    return pred
+
+
+def random_kernels(rng, kernel_num):
+    height, width = rng.integers(16, 96, 2)
+    field = cv2.GaussianBlur(
+        rng.uniform(0, 1, (height, width)).astype(np.float32), (0, 0), 2
+    )
+    field = (field - field.min()) / (np.ptp(field) + 1e-6)
+    thresholds = np.linspace(0.4, 0.8, kernel_num)
+    return np.stack([(field > t).astype(np.uint8) for t in thresholds])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("kernel_num", [1, 3, 7])
+def test_pse_numpy_matches_fifo_reference(seed, kernel_num):
+    kernels = random_kernels(np.random.default_rng(seed), kernel_num)
+    np.testing.assert_array_equal(
+        pse_numpy(kernels.copy(), 5), reference_pse(kernels.copy(), 5)
+    )
+
+
+def test_pse_is_importable_without_compiling():
+    kernels = np.zeros((3, 8, 8), dtype=np.uint8)
+    assert pse(kernels, 1).max() == 0
@@ -0,0 +1,98 @@
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppstructure.recovery import reading_order
+from ppstructure.recovery.reading_order import sorted_layout_boxes, xycut_order
+
+PAGE = {
+    "title": [50, 20, 950, 60],
+    "a1": [50, 80, 330, 200],
+    "b1": [360, 80, 640, 200],
+    "c1": [670, 80, 950, 200],
+    "a2": [50, 210, 330, 400],
+    "b2": [360, 210, 640, 400],
+    "c2": [670, 210, 950, 300],
+    "figure": [100, 420, 900, 600],
+    # the right column slightly overlaps the gutter
+    "l1": [50, 620, 490, 700],
+    "r1": [480, 620, 950, 700],
+    "l2": [50, 710, 480, 800],
+    "r2": [520, 705, 950, 800],
+}
+
+
+def test_xycut_order_columns():
+    names = list(PAGE)
+    order, columns = xycut_order([PAGE[name] for name in reversed(names)])
+    names = names[::-1]
+    assert [(names[i], columns[i]) for i in order] == [
+        ("title", 1),
+        ("a1", 3),
+        ("a2", 3),
+        ("b1", 3),
+        ("b2", 3),
+        ("c1", 3),
+        ("c2", 3),
+        ("figure", 1),
+        ("l1", 2),
+        ("l2", 2),
+        ("r1", 2),
+        ("r2", 2),
+    ]
+
+
+def test_xycut_order_single_column():
+    bboxes = [[50, 300, 900, 400], [300, 200, 600, 280], [50, 100, 900, 180]]
+    assert xycut_order(bboxes) == ([2, 1, 0], [1, 1, 1])
+    # boxes that cannot be cut are read by their top left corner
+    assert xycut_order([[0, 10, 50, 50], [10, 0, 60, 40]]) == ([1, 0], [1, 1])
+    assert xycut_order([]) == ([], [])
+
+
+def test_sorted_layout_boxes():
+    res = [{"bbox": PAGE[name], "name": name} for name in ["r1", "title", "l1"]]
+    res = sorted_layout_boxes(res, 1000)
+    assert [region["name"] for region in res] == ["title", "l1", "r1"]
+    assert [region["columns"] for region in res] == [1, 2, 2]
+    assert [region["layout"] for region in res] == ["single", "double", "double"]
+
+
+def count_lines(bboxes):
+    """Number of lines of reading_order executed by xycut_order, a measure
+    of its work that does not depend on the load of the machine."""
+    lines = [0]
+
+    def trace(frame, event, arg):
+        if frame.f_code.co_filename != reading_order.__file__:
+            return None
+        if event == "line":
+            lines[0] += 1
+        return trace
+
+    sys.settrace(trace)
+    try:
+        xycut_order(bboxes)
+    finally:
+        sys.settrace(None)
+    return lines[0]
+
+
+def test_xycut_order_scaling():
+    # many narrow columns and many bands, the worst cases of a node with
+    # many children
+    def columns(n):
+        return [[i * 10, 0, i * 10 + 8, 20] for i in range(n)]
+
+    def bands(n):
+        return [[0, i * 30, 90, i * 30 + 20] for i in range(n)]
+
+    for layout in [columns, bands]:
+        order, _ = xycut_order(layout(100))
+        assert order == list(range(100))
+        small = count_lines(layout(500))
+        large = count_lines(layout(2000))
+        # 4 times the boxes, about 4 times the work, 16 if it was quadratic
+        assert large < 5 * small
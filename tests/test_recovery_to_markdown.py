@@ -0,0 +1,52 @@
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppstructure.recovery.recovery_to_markdown import (
+    MarkdownRecoveryWriter,
+    convert_info_markdown,
+)
+
+
+def region(type, res):
+    return {"type": type, "res": res, "bbox": [0, 0, 10, 10], "img_idx": 0}
+
+
+PAGES = [
+    [
+        region("title", [{"text": "Title"}, {"text": "cont"}]),
+        region("table", {"html": "<table></table>\n\n"}),
+    ],
+    [
+        region("header", [{"text": "skipped"}]),
+        region("list", [{"text": "\n"}, {"text": "item"}]),
+        region("equation", {"latex": "x^2"}),
+        region("figure", []),
+        region("list", []),
+        region("list", [{"text": "\n\n\n"}]),
+    ],
+]
+
+
+def test_writer_matches_convert_info_markdown(tmp_path):
+    (tmp_path / "whole").mkdir()
+    (tmp_path / "paged").mkdir()
+    convert_info_markdown(PAGES[0] + PAGES[1], str(tmp_path / "whole"), "doc")
+    writer = MarkdownRecoveryWriter(str(tmp_path / "paged"), "doc")
+    for page in PAGES:
+        writer.add_page(page)
+    writer.close()
+
+    expected = (tmp_path / "whole" / "doc_ocr.md").read_text(encoding="utf-8")
+    assert "\n\n\n" not in expected
+    assert os.listdir(tmp_path / "paged") == ["doc_ocr.md"]
+    assert (tmp_path / "paged" / "doc_ocr.md").read_text(encoding="utf-8") == expected
+
+
+def test_writer_abort(tmp_path):
+    writer = MarkdownRecoveryWriter(str(tmp_path), "doc")
+    writer.add_page(PAGES[0])
+    writer.abort()
+    assert os.listdir(tmp_path) == []
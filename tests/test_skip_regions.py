@@ -0,0 +1,92 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppstructure.predict_system import StructureSystem
+from tools.infer.predict_system import TextSystem, boxes_in_regions
+
+
+def quad(x1, y1, x2, y2):
+    return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+
+
+def test_boxes_in_regions():
+    dt_boxes = [quad(10, 10, 50, 20), quad(40, 10, 100, 20), quad(200, 200, 210, 210)]
+    regions = [[0, 0, 60, 60], [190, 190, 300, 300]]
+    np.testing.assert_array_equal(
+        boxes_in_regions(dt_boxes, regions), [True, False, True]
+    )
+    np.testing.assert_array_equal(
+        boxes_in_regions(dt_boxes, regions, min_overlap=0.3), [True, True, True]
+    )
+    assert boxes_in_regions(dt_boxes, []).tolist() == [False] * 3
+    assert boxes_in_regions([], regions).tolist() == []
+
+
+class FakeRecognizer(object):
+    def __init__(self):
+        self.crop_nums = []
+
+    def __call__(self, img_list):
+        self.crop_nums.append(len(img_list))
+        return [("a", 0.9)] * len(img_list), 0.1
+
+
+def test_text_system_drops_boxes_in_skip_regions():
+    text_sys = TextSystem.__new__(TextSystem)
+    text_sys.args = SimpleNamespace(det_box_type="quad", save_crop_res=False)
+    dt_boxes = np.stack([quad(10, 10, 90, 20), quad(10, 50, 90, 60)])
+    text_sys.text_detector = lambda img: (dt_boxes.copy(), 0.1)
+    text_sys.text_recognizer = FakeRecognizer()
+    text_sys.use_angle_cls = False
+    text_sys.drop_score = 0.5
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    boxes, _, time_dict = text_sys(img, skip_regions=[[0, 40, 100, 100]])
+    assert len(boxes) == 1 and time_dict["rec_skip"] == 1
+    np.testing.assert_allclose(boxes[0], dt_boxes[0])
+    boxes, _, time_dict = text_sys(img)
+    assert len(boxes) == 2 and time_dict["rec_skip"] == 0
+    assert text_sys.text_recognizer.crop_nums == [1, 2]
+
+
+class FakeTextSystem(object):
+    def __init__(self):
+        self.skip_regions = None
+
+    def __call__(self, img, upright=None, skip_regions=None):
+        self.skip_regions = skip_regions
+        time_dict = dict(det=0.1, rec=0.1, cls_num=0, cls_skip=0, rec_skip=2)
+        return [quad(10, 10, 90, 20)], [("text", 0.9)], time_dict
+
+
+def test_structure_system_skips_non_text_regions():
+    structure_sys = StructureSystem.__new__(StructureSystem)
+    structure_sys.mode = "structure"
+    structure_sys.image_orientation_predictor = None
+    structure_sys.layout_predictor = None
+    structure_sys.text_system = FakeTextSystem()
+    structure_sys.table_system = None
+    structure_sys.formula_system = None
+    structure_sys.table_reuse_ocr = False
+    structure_sys.return_word_box = False
+    structure_sys.ocr_skip_labels = {"figure", "table"}
+    layout_res = [
+        dict(bbox=[0, 0, 100, 30], label="text", score=0.9),
+        dict(bbox=[0, 40, 100, 90], label="figure", score=0.9),
+        dict(bbox=[0, 100, 100, 190], label="table", score=0.9),
+    ]
+    img = np.zeros((200, 100, 3), dtype=np.uint8)
+
+    res, time_dict = structure_sys(img, layout_res=layout_res)
+    assert structure_sys.text_system.skip_regions == [
+        [0, 40, 100, 90],
+        [0, 100, 100, 190],
+    ]
+    assert time_dict["rec_skip"] == 2
+    assert res[0]["res"][0]["text"] == "text"
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppstructure.spatial_index import BoxIndex
+
+
+def reference_assign(boxes, regions, min_overlap, exclusive):
+    inter_w = np.minimum(boxes[None, :, 2], regions[:, None, 2]) - np.maximum(
+        boxes[None, :, 0], regions[:, None, 0]
+    )
+    inter_h = np.minimum(boxes[None, :, 3], regions[:, None, 3]) - np.maximum(
+        boxes[None, :, 1], regions[:, None, 1]
+    )
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    ratio = (
+        np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None) / np.maximum(area, 1e-6)
+    )
+    if min_overlap > 0:
+        hit = ratio >= min_overlap
+    else:
+        hit = (inter_w >= 0) & (inter_h >= 0)
+    if exclusive and len(regions) > 0:
+        best = np.where(hit, ratio, -1).argmax(axis=0)
+        hit &= np.arange(len(regions))[:, None] == best[None]
+    return [np.nonzero(h)[0].tolist() for h in hit]
+
+
+@pytest.mark.parametrize("min_overlap", [0.0, 0.5])
+@pytest.mark.parametrize("exclusive", [False, True])
+def test_assign_matches_reference(min_overlap, exclusive):
+    rng = np.random.default_rng(0)
+    for num_boxes, num_regions in [(0, 3), (5, 0), (1, 1), (400, 30)]:
+        xy = rng.uniform(0, 1000, (num_boxes, 2))
+        # include degenerate boxes and boxes touching a region edge
+        wh = rng.uniform(0, 80, (num_boxes, 2)) * rng.integers(0, 2, (num_boxes, 1))
+        boxes = np.hstack([xy, xy + wh]).round()
+        xy = rng.uniform(-50, 1000, (num_regions, 2))
+        regions = np.hstack([xy, xy + rng.uniform(0, 400, (num_regions, 2))]).round()
+
+        result = BoxIndex(boxes).assign(regions, min_overlap, exclusive)
+        expected = reference_assign(boxes, regions, min_overlap, exclusive)
+        assert [r.tolist() for r in result] == expected
+
+
+def test_query():
+    index = BoxIndex([[0, 0, 10, 10], [20, 0, 30, 10], [8, 0, 12, 10]])
+    assert index.query([10, 0, 20, 10]).tolist() == [0, 1, 2]
+    assert index.query([10, 0, 20, 10], min_overlap=0.5).tolist() == [2]
+    assert index.query([100, 100, 120, 120]).tolist() == []
@@ -0,0 +1,200 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppstructure.table.table_master_match import (
+    cal_iou,
+    cal_iou_matrix,
+    center_rule_match,
+    convert_coord,
+    distance_rule_match,
+    get_bboxes_list,
+    is_abs_lower_than_threshold,
+    is_inside,
+    iou_rule_match,
+    sort_bbox,
+    sort_line_bbox,
+)
+
+
+def reference_center_rule_match(end2end_xywh_bboxes, master_xyxy_bboxes):
+    return [
+        [i, j]
+        for i, e in enumerate(end2end_xywh_bboxes)
+        for j, m in enumerate(master_xyxy_bboxes)
+        if is_inside((e[0], e[1]), ((m[0], m[1]), (m[2], m[3])))
+    ]
+
+
+def reference_iou_rule_match(end2end_xyxy_bboxes, indexes, master_xyxy_bboxes):
+    match_pair_list = []
+    for index, end2end_xyxy in zip(indexes, end2end_xyxy_bboxes):
+        max_iou, max_match = 0, None
+        for j, master_xyxy in enumerate(master_xyxy_bboxes):
+            iou = cal_iou(convert_coord(end2end_xyxy), convert_coord(master_xyxy))
+            if iou > max_iou:
+                max_match, max_iou = [index, j], iou
+        if max_match is not None:
+            match_pair_list.append(max_match)
+    return match_pair_list
+
+
+def reference_distance_rule_match(
+    end2end_indexes, end2end_bboxes, master_indexes, master_bboxes
+):
+    min_match_list = []
+    for j, master_bbox in zip(master_indexes, master_bboxes):
+        min_distance, min_match = np.inf, [0, 0]
+        for i, end2end_bbox in zip(end2end_indexes, end2end_bboxes):
+            dist = math.sqrt(
+                (master_bbox[0] - end2end_bbox[0]) ** 2
+                + (master_bbox[1] - end2end_bbox[1]) ** 2
+            )
+            if dist < min_distance:
+                min_match, min_distance = [i, j], dist
+        min_match_list.append(min_match)
+    return min_match_list
+
+
+def reference_sort_bbox(end2end_xywh_bboxes, no_match_end2end_indexes):
+    """sort_bbox before the vectorization, returns its sorted groups."""
+    groups = []
+    bbox_groups = []
+    for index, end2end_xywh_bbox in zip(no_match_end2end_indexes, end2end_xywh_bboxes):
+        this_bbox = end2end_xywh_bbox
+        if len(groups) == 0:
+            groups.append([index])
+            bbox_groups.append([this_bbox])
+        else:
+            flag = False
+            for g, bg in zip(groups, bbox_groups):
+                # this_bbox is belong to bg's row or not
+                if is_abs_lower_than_threshold(this_bbox, bg[0]):
+                    g.append(index)
+                    bg.append(this_bbox)
+                    flag = True
+                    break
+            if not flag:
+                # this_bbox is not belong to bg's row, create a row.
+                groups.append([index])
+                bbox_groups.append([this_bbox])
+
+    # sorted bboxes in a group
+    tmp_groups, tmp_bbox_groups = [], []
+    for g, bg in zip(groups, bbox_groups):
+        g_sorted, bg_sorted = sort_line_bbox(g, bg)
+        tmp_groups.append(g_sorted)
+        tmp_bbox_groups.append(bg_sorted)
+
+    # sorted groups, sort by coord y's value.
+    sorted_groups = [None] * len(tmp_groups)
+    ys = [bg[0][1] for bg in tmp_bbox_groups]
+    sorted_ys = sorted(ys)
+    for g, bg in zip(tmp_groups, tmp_bbox_groups):
+        idx = sorted_ys.index(bg[0][1])
+        sorted_groups[idx] = g
+    return sorted_groups
+
+
+def has_ties(groups):
+    """The old sort_bbox loses bboxes of equal x in a row, or rows of equal y
+    of their leftmost bbox, they are left as None."""
+    return any(g is None or None in g for g in groups)
+
+
+def pubtabnet_like_sample(rng, rows, cols, round_coords):
+    """Grid cells with missing cells, and text boxes around the cells."""
+    xs = np.cumsum(rng.integers(30, 120, cols + 1))
+    ys = np.cumsum(rng.integers(15, 40, rows + 1))
+    cells = np.array(
+        [
+            [xs[c], ys[r], xs[c + 1], ys[r + 1]]
+            for r in range(rows)
+            for c in range(cols)
+        ],
+        dtype=np.float32,
+    )
+    cells = cells[rng.uniform(0, 1, len(cells)) < 0.85]
+    boxes = []
+    for x1, y1, x2, y2 in cells[rng.uniform(0, 1, len(cells)) < 0.8]:
+        x = x1 + rng.uniform(-0.3, 0.4) * (x2 - x1)
+        y = y1 + rng.uniform(-0.4, 0.4) * (y2 - y1)
+        w = rng.uniform(0.2, 1.0) * (x2 - x1)
+        h = rng.uniform(0.3, 0.9) * (y2 - y1)
+        boxes.append([x, y, x + w, y + h])
+    # text below the predicted structure, e.g. cut by the max length
+    for _ in range(rng.integers(1, 8)):
+        x, y = rng.uniform(0, xs[-1]), rng.uniform(ys[-1], ys[-1] + 200)
+        boxes.append([x, y, x + rng.uniform(10, 60), y + rng.uniform(8, 20)])
+    boxes = np.array(boxes, dtype=np.float32)
+    if round_coords:
+        boxes = boxes.round()
+    end2end_result = [dict(bbox=box) for box in boxes]
+    return get_bboxes_list(end2end_result, dict(bbox=cells))
+
+
+def test_cal_iou_matrix_matches_cal_iou():
+    rng = np.random.default_rng(0)
+    bboxes1 = rng.uniform(0, 50, (40, 2))
+    bboxes1 = np.hstack([bboxes1, bboxes1 + rng.uniform(0, 30, (40, 2))])
+    bboxes2 = rng.uniform(0, 50, (30, 2)).round()
+    bboxes2 = np.hstack([bboxes2, bboxes2 + rng.integers(0, 30, (30, 2))])
+    expected = [
+        [cal_iou(convert_coord(b1), convert_coord(b2)) for b2 in bboxes2]
+        for b1 in bboxes1
+    ]
+    np.testing.assert_allclose(
+        cal_iou_matrix(bboxes1, bboxes2), expected, rtol=1e-12, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("round_coords", [True, False])
+def test_rules_match_reference(round_coords):
+    rng = np.random.default_rng(int(round_coords))
+    num_sorted = 0
+    for _ in range(30):
+        (
+            end2end_xyxy,
+            end2end_xywh,
+            master_xywh,
+            master_xyxy,
+        ) = pubtabnet_like_sample(
+            rng, rng.integers(1, 15), rng.integers(1, 8), round_coords
+        )
+        indexes = list(range(len(end2end_xyxy)))
+        master_indexes = list(range(len(master_xywh)))
+
+        assert center_rule_match(
+            end2end_xywh, master_xyxy
+        ) == reference_center_rule_match(end2end_xywh, master_xyxy)
+        assert iou_rule_match(
+            end2end_xyxy, indexes, master_xyxy
+        ) == reference_iou_rule_match(end2end_xyxy, indexes, master_xyxy)
+        assert distance_rule_match(
+            indexes, end2end_xywh, master_indexes, master_xywh
+        ) == reference_distance_rule_match(
+            indexes, end2end_xywh, master_indexes, master_xywh
+        )
+        expected_groups = reference_sort_bbox(end2end_xywh, indexes)
+        if not has_ties(expected_groups):
+            assert sort_bbox(end2end_xywh, indexes)[2] == expected_groups
+            num_sorted += 1
+    assert num_sorted > 20
+
+
+def test_sort_bbox_rows():
+    bboxes = np.array(
+        [[50, 10, 4, 4], [10, 11, 4, 4], [30, 30, 4, 4], [20, 12.5, 4, 4]]
+    )
+    idx_list, bbox_list, groups, bbox_groups = sort_bbox(bboxes, [7, 8, 9, 10])
+    # 12.5 is close to the row head at 10, not to the last bbox of the row
+    assert groups == [[8, 10, 7], [9]]
+    assert idx_list == [8, 10, 7, 9]
+    np.testing.assert_allclose(bbox_list[0], bboxes[1])
+    assert sort_bbox(bboxes[:0], []) == ([], [], [], [])
@@ -0,0 +1,94 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppstructure.table.matcher import TableMatch, compute_iou, distance
+
+
+def reference_match_result(dt_boxes, pred_bboxes):
+    matched = {}
+    for i, gt_box in enumerate(dt_boxes):
+        distances = []
+        for pred_box in pred_bboxes:
+            if len(pred_box) == 8:
+                pred_box = [
+                    np.min(pred_box[0::2]),
+                    np.min(pred_box[1::2]),
+                    np.max(pred_box[0::2]),
+                    np.max(pred_box[1::2]),
+                ]
+            distances.append(
+                (distance(gt_box, pred_box), 1.0 - compute_iou(gt_box, pred_box))
+            )
+        sorted_distances = sorted(distances, key=lambda item: (item[1], item[0]))
+        matched.setdefault(distances.index(sorted_distances[0]), []).append(i)
+    return matched
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64, np.int64])
+@pytest.mark.parametrize("quad_cells", [False, True])
+def test_match_result_matches_reference(dtype, quad_cells):
+    rng = np.random.default_rng(0)
+    table_match = TableMatch()
+    for _ in range(50):
+        # small integer grids produce many ties
+        num_boxes, num_cells = rng.integers(1, 30), rng.integers(1, 20)
+        xy = rng.integers(0, 50, (num_boxes, 2))
+        dt_boxes = np.hstack([xy, xy + rng.integers(0, 20, (num_boxes, 2))])
+        xy = rng.integers(0, 50, (num_cells, 2))
+        pred_bboxes = np.hstack([xy, xy + rng.integers(0, 20, (num_cells, 2))])
+        dt_boxes, pred_bboxes = dt_boxes.astype(dtype), pred_bboxes.astype(dtype)
+        if quad_cells:
+            pred_bboxes = pred_bboxes[:, [0, 1, 2, 1, 2, 3, 0, 3]]
+
+        result = table_match.match_result(dt_boxes, pred_bboxes)
+        expected = reference_match_result(dt_boxes, pred_bboxes)
+        assert list(result.items()) == list(expected.items())
+    assert table_match.match_result([], pred_bboxes) == {}
+
+
+PRED_STRUCTURES = (
+    ["<table>", "<thead>", "<tr>", "<td></td>", "<td", ' colspan="2"', ">", "</td>"]
+    + ["</tr>", "<tr>", "<td></td>", ' rowspan="2"', "></b></td>", "<eb></eb>"]
+    + ["<td></td>", "</tr>", "</thead>", "<tbody>", "<tr>", "<td></td>"]
+    + ["<eb1></eb1>", "<td></td>", "</tr>", "</tbody>", "</table>"]
+)
+MATCHED_INDEX = {0: [0, 1], 1: [2], 3: [3], 4: [4, 5], 5: [6]}
+OCR_CONTENTS = [
+    ("<b>Name</b>", 0.9),
+    (" Value", 0.9),
+    ("<b>Total</b>", 0.9),
+    ("a<b", 0.9),
+    ("<b>", 0.9),
+    ("x & y", 0.9),
+    ("1", 0.9),
+]
+
+
+def test_get_pred_html():
+    pred_html, _ = TableMatch().get_pred_html(
+        PRED_STRUCTURES, MATCHED_INDEX, OCR_CONTENTS
+    )
+    assert pred_html == (
+        '<table><thead><tr><td>Name Value</td><td colspan="2">&lt;b&gt;Total'
+        '&lt;/b&gt;</td></tr><tr><td></td> rowspan="2"a&lt;b></b></td><eb></eb>'
+        "<td><b>x &amp; y</b></td></tr></thead><tbody><tr><td>1</td><eb1></eb1>"
+        "<td></td></tr></tbody></table>"
+    )
+
+
+def test_get_pred_html_master():
+    pred_html, _ = TableMatch().get_pred_html_master(
+        PRED_STRUCTURES, MATCHED_INDEX, OCR_CONTENTS
+    )
+    assert pred_html == (
+        '<table><thead><tr><td><b>Name Value</b></td><td colspan="2"><b>Total'
+        '</b></td></tr><tr><td></td> rowspan="2"a<b</b></td><td></td><td><b>x &'
+        " y</b></td></tr></thead><tbody><tr><td>1</td><td> </td><td></td></tr>"
+        "</tbody></table>"
+    )
@@ -0,0 +1,80 @@
+import os
+import pickle
+import sys
+
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+pytest.importorskip("apted")
+pytest.importorskip("lxml")
+
+from ppstructure.table.table_metric.parallel import parallel_process
+from ppstructure.table.table_metric import table_metric
+from ppstructure.table.table_metric.table_metric import TEDS
+
+TRUE_HTML = (
+    "<html><body><table><thead><tr><td>Name</td><td>Value</td></tr></thead>"
+    '<tbody><tr><td>a</td><td>1</td></tr><tr><td colspan="2">b</td></tr>'
+    "</tbody></table></body></html>"
+)
+
+
+def inverse(x):
+    return 1.0 / x
+
+
+def test_teds_evaluate():
+    teds = TEDS()
+    assert teds.evaluate(TRUE_HTML, TRUE_HTML) == 1.0
+    assert teds.evaluate("", TRUE_HTML) == 0.0
+    assert teds.evaluate("<html><body></body></html>", TRUE_HTML) == 0.0
+
+    pred_html = TRUE_HTML.replace("<td>1</td>", "<td>7</td>")
+    score = teds.evaluate(pred_html, TRUE_HTML)
+    assert 0.0 < score < 1.0
+    # the ground truth tree is cached and not changed by the evaluation
+    assert (False, (), TRUE_HTML) in table_metric._TREE_CACHE
+    assert teds.evaluate(pred_html, TRUE_HTML) == score
+    assert TEDS(cache_size=0).evaluate(pred_html, TRUE_HTML) == score
+
+    structure_teds = TEDS(structure_only=True)
+    assert structure_teds.evaluate(pred_html, TRUE_HTML) == 1.0
+
+
+def count_parses(teds):
+    parse_table = teds.parse_table
+    calls = []
+
+    def counted(html_str):
+        calls.append(html_str)
+        return parse_table(html_str)
+
+    teds.parse_table = counted
+    return calls
+
+
+def test_teds_cache_survives_pickling():
+    table_metric._TREE_CACHE.clear()
+    pred_html = TRUE_HTML.replace("<td>1</td>", "<td>7</td>")
+    TEDS().evaluate(pred_html, TRUE_HTML)
+    # the copy of the instance a worker gets with every chunk uses the cache
+    # of the worker process
+    teds = pickle.loads(pickle.dumps(TEDS()))
+    calls = count_parses(teds)
+    teds.evaluate(pred_html, TRUE_HTML)
+    assert calls == [pred_html]
+
+    structure_teds = TEDS(structure_only=True)
+    calls = count_parses(structure_teds)
+    structure_teds.evaluate(pred_html, TRUE_HTML)
+    assert calls == [pred_html, TRUE_HTML]
+
+
+def test_parallel_process_chunks():
+    array = [2, 4, 0, 5, 8, 10, 1]
+    out = parallel_process(array, inverse, n_jobs=2, front_num=1, chunk_size=3)
+    assert out[:2] == [0.5, 0.25]
+    assert isinstance(out[2], ZeroDivisionError)
+    assert out[3:] == [0.2, 0.125, 0.1, 1.0]
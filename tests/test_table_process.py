@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+docx = pytest.importorskip("docx")
+pytest.importorskip("bs4")
+from lxml import etree
+
+from ppstructure.recovery.table_process import HtmlToDocx
+
+TABLES = [
+    '<html><body><table><thead><tr><td rowspan="2"><b>Item</b></td>'
+    '<td colspan="2">Values</td></tr><tr><td>a <b>x</b>c</td><td></td></tr>'
+    "</thead><tbody><tr><th>total</th><td>x &amp; y</td><td>\n 1.5 \n</td></tr>"
+    "</tbody></table></body></html>",
+    '<table><tr><td rowspan="3" colspan="2">A</td><td>b</td></tr><tr><td>c'
+    "<br>d</td></tr><tr><td><b>trail </b><i>e</i></td></tr></table>",
+]
+
+
+@pytest.mark.parametrize("html", TABLES)
+def test_handle_table_matches_by_cells(html):
+    doc, expected_doc = docx.Document(), docx.Document()
+    table = HtmlToDocx().handle_table(html, doc)
+    HtmlToDocx().handle_table_by_cells(html, expected_doc)
+    assert etree.tostring(doc.element.body) == etree.tostring(expected_doc.element.body)
+    assert table.style.name == "Table Grid"
+
+
+def test_handle_table_clips_spans():
+    doc = docx.Document()
+    html = (
+        '<table><tr><td>a</td><td rowspan="5">b</td></tr><tr><td colspan="3">c'
+        "</td><td>dropped</td></tr></table>"
+    )
+    table = HtmlToDocx().handle_table(html, doc)
+    assert [[cell.text for cell in row.cells] for row in table.rows] == [
+        ["a", "b"],
+        ["c", "b"],
+    ]
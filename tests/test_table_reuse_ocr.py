@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppstructure.table.predict_table import TableSystem, crop_ocr_result
+
+
+def quad(x1, y1, x2, y2):
+    return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32)
+
+
+class FakeRecognizer(object):
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, img_list):
+        self.calls.append([img.shape[:2] for img in img_list])
+        return [("piece{}".format(i), 0.9) for i in range(len(img_list))], 0.5
+
+
+def test_crop_ocr_result():
+    dt_boxes = [quad(10, 10, 50, 20), quad(90, 10, 130, 20), quad(300, 300, 320, 310)]
+    rec_res = [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+    boxes, recs = crop_ocr_result(dt_boxes, rec_res, [0, 0, 100, 100])
+    # the second box is only a quarter inside
+    assert recs == [("a", 0.9)]
+    np.testing.assert_allclose(boxes[0], quad(10, 10, 50, 20))
+
+    boxes, recs = crop_ocr_result(dt_boxes, rec_res, [80, 5, 200, 50])
+    assert recs == [("b", 0.8)]
+    np.testing.assert_allclose(boxes[0], quad(10, 5, 50, 15))
+    assert crop_ocr_result([], [], [0, 0, 10, 10]) == ([], [])
+
+
+def test_reuse_ocr_splits_boxes_over_cells():
+    table_sys = TableSystem.__new__(TableSystem)
+    table_sys.text_recognizer = FakeRecognizer()
+    img = np.zeros((100, 200, 3), dtype=np.uint8)
+    cells = [[0, 0, 100, 50], [100, 0, 200, 50], [0, 50, 200, 100]]
+    dt_boxes = [quad(10, 10, 190, 30), quad(20, 60, 80, 80)]
+    rec_res = [("ab", 0.9), ("c", 0.8)]
+
+    boxes, recs, rec_elapse = table_sys._reuse_ocr(img, cells, dt_boxes, rec_res)
+    assert recs == [("piece0", 0.9), ("piece1", 0.9), ("c", 0.8)]
+    np.testing.assert_allclose(
+        boxes, [[9, 9, 100, 31], [100, 9, 191, 31], [19, 59, 81, 81]]
+    )
+    assert rec_elapse == 0.5
+    assert len(table_sys.text_recognizer.calls) == 1
+
+    boxes, recs, rec_elapse = table_sys._reuse_ocr(
+        img, cells, dt_boxes[1:], rec_res[1:]
+    )
+    assert recs == [("c", 0.8)] and rec_elapse == 0
+    assert len(table_sys.text_recognizer.calls) == 1
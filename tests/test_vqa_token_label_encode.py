@@ -0,0 +1,210 @@
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(current_dir, "..")))
+
+from ppocr.data.imaug.label_ops import VQATokenLabelEncode
+
+LINES = [
+    # multi-word line
+    ("Invoice number INV-20240731", [[10, 10], [400, 10], [400, 40], [10, 40]]),
+    # leading and repeated spaces
+    ("  Total  due", [[10, 60], [200, 60], [200, 90], [10, 90]]),
+    # numbers get a standalone "▁" token without characters
+    ("Amount 1234567 EUR", [[10, 110], [300, 110], [300, 140], [10, 140]]),
+    ("", [[10, 160], [50, 160], [50, 190], [10, 190]]),
+    ("x", [[10, 210], [20, 210], [20, 240], [10, 240]]),
+]
+
+
+class StubTokenizer(object):
+    """A sentencepiece like tokenizer: words are split into pieces of at most
+    3 characters, the first piece of a word starts with "▁"."""
+
+    padding_side = "right"
+    pad_token_type_id = 0
+    pad_token_id = 1
+
+    def __init__(self):
+        self.vocab = {}
+        self.batch_calls = 0
+
+    def _pieces(self, text):
+        pieces = []
+        for match in re.finditer(r"\S+", text):
+            word, start = match.group(), match.start()
+            prefix = "▁"
+            if word[0].isdigit():
+                pieces.append(("▁", start, start))
+                prefix = ""
+            for k in range(0, len(word), 3):
+                piece = word[k : k + 3]
+                token = prefix + piece if k == 0 else piece
+                pieces.append((token, start + k, start + k + len(piece)))
+        return pieces
+
+    def tokenize(self, text):
+        return [token for token, _, _ in self._pieces(text)]
+
+    def encode(self, text, return_offsets_mapping=False, **kwargs):
+        pieces = self._pieces(text)
+        input_ids = [0]
+        input_ids += [
+            self.vocab.setdefault(t, len(self.vocab) + 3) for t, _, _ in pieces
+        ]
+        input_ids += [2]
+        encode_res = {
+            "input_ids": input_ids,
+            "token_type_ids": [0] * len(input_ids),
+            "attention_mask": [1] * len(input_ids),
+        }
+        if return_offsets_mapping:
+            encode_res["offset_mapping"] = (
+                [(0, 0)] + [(start, end) for _, start, end in pieces] + [(0, 0)]
+            )
+        return encode_res
+
+    def batch_encode(self, texts, return_dict=True, **kwargs):
+        assert not return_dict
+        self.batch_calls += 1
+        return [self.encode(text, **kwargs) for text in texts]
+
+
+def reference_split_bbox(bbox, text, tokenizer):
+    """split_bbox before the offset mappings, tokenizing every word again."""
+    words = text.split()
+    token_bboxes = []
+    x1, y1, x2, y2 = bbox
+    unit_w = (x2 - x1) / len(text)
+    for word in words:
+        curr_w = len(word) * unit_w
+        word_bbox = [x1, y1, x1 + curr_w, y2]
+        token_bboxes.extend([word_bbox] * len(tokenizer.tokenize(word)))
+        x1 += (len(word) + 1) * unit_w
+    return token_bboxes
+
+
+def reference_encode(encoder, data, lines=LINES):
+    """The per line encode of the lines of a page."""
+    height, width, _ = data["image"].shape
+    input_ids, bboxes, segment_offset_id = [], [], []
+    for text, points in lines:
+        if len(text) == 0:
+            continue
+        encode_res = encoder.tokenizer.encode(
+            text,
+            pad_to_max_seq_len=False,
+            return_attention_mask=True,
+            return_token_type_ids=True,
+        )
+        if not encoder.add_special_ids:
+            encode_res["input_ids"] = encode_res["input_ids"][1:-1]
+        bbox = encoder.trans_poly_to_bbox(points)
+        if encoder.use_textline_bbox_info:
+            bbox = [bbox] * len(encode_res["input_ids"])
+        else:
+            bbox = reference_split_bbox(bbox, text, encoder.tokenizer)
+        if len(bbox) <= 0:
+            continue
+        bbox = encoder._smooth_box(bbox, height, width)
+        if encoder.add_special_ids:
+            bbox.insert(0, [0, 0, 0, 0])
+            bbox.append([0, 0, 0, 0])
+        input_ids.extend(encode_res["input_ids"])
+        bboxes.extend(bbox)
+        segment_offset_id.append(len(input_ids))
+    return input_ids, bboxes, segment_offset_id
+
+
+def build_encoder(use_textline_bbox_info, add_special_ids, infer_mode):
+    encoder = VQATokenLabelEncode.__new__(VQATokenLabelEncode)
+    encoder.tokenizer = StubTokenizer()
+    encoder.contains_re = False
+    encoder.label2id_map = {"O": 0, "B-QUESTION": 1, "I-QUESTION": 2}
+    encoder.add_special_ids = add_special_ids
+    encoder.infer_mode = infer_mode
+    encoder.ocr_engine = None
+    encoder.use_textline_bbox_info = use_textline_bbox_info
+    encoder.order_method = None
+    return encoder
+
+
+@pytest.mark.parametrize("use_textline_bbox_info", [True, False])
+@pytest.mark.parametrize("add_special_ids", [False, True])
+@pytest.mark.parametrize("infer_mode", [True, False])
+def test_batch_encode_matches_per_line_encode(
+    use_textline_bbox_info, add_special_ids, infer_mode
+):
+    encoder = build_encoder(use_textline_bbox_info, add_special_ids, infer_mode)
+    image = np.zeros((300, 500, 3), dtype=np.uint8)
+    if infer_mode:
+        ocr_result = [
+            {"transcription": text, "points": points} for text, points in LINES
+        ]
+        data = {"image": image, "ocr_result": ocr_result}
+    else:
+        label = [
+            {"transcription": text, "points": points, "label": "question", "id": i}
+            for i, (text, points) in enumerate(LINES)
+        ]
+        data = {"image": image, "label": json.dumps(label)}
+
+    expected = reference_encode(encoder, {"image": image})
+    data = encoder(data)
+    assert encoder.tokenizer.batch_calls == 1
+    assert data["input_ids"] == expected[0]
+    np.testing.assert_array_equal(data["bbox"], expected[1])
+    assert data["segment_offset_id"] == expected[2]
+    if not use_textline_bbox_info:
+        assert len(data["bbox"]) == len(data["input_ids"])
+
+
+def test_split_bbox():
+    encoder = build_encoder(False, False, True)
+    text = " ab 12345"
+    offset_mapping = [(1, 3), (4, 4), (4, 7), (7, 9)]
+    bboxes = encoder.split_bbox([0, 0, 90, 10], text, offset_mapping)
+    # the "▁" token without characters goes with the next word
+    assert bboxes == [[0, 0, 20, 10], [30, 0, 80, 10], [30, 0, 80, 10], [30, 0, 80, 10]]
+    assert encoder.split_bbox([0, 0, 90, 10], "   ", []) == []
+
+
+REAL_LINES = LINES + [
+    ("发票号码 12345678", [[10, 230], [300, 230], [300, 255], [10, 255]]),
+    ("Name: Zoë O'Neil, 42 years", [[10, 260], [400, 260], [400, 290], [10, 290]]),
+]
+CLASS_PATH = os.path.join(
+    current_dir, "..", "ppocr", "utils", "dict", "kie_dict", "xfund_class_list.txt"
+)
+
+
+@pytest.mark.parametrize("use_textline_bbox_info", [True, False])
+@pytest.mark.parametrize("add_special_ids", [False, True])
+def test_batch_encode_of_layoutxlm_tokenizer(use_textline_bbox_info, add_special_ids):
+    pytest.importorskip("paddlenlp")
+    try:
+        encoder = VQATokenLabelEncode(
+            CLASS_PATH,
+            add_special_ids=add_special_ids,
+            algorithm="LayoutXLM",
+            use_textline_bbox_info=use_textline_bbox_info,
+            infer_mode=True,
+        )
+    except (OSError, RuntimeError) as ex:
+        pytest.skip("the LayoutXLM tokenizer could not be loaded: {}".format(ex))
+    image = np.zeros((300, 500, 3), dtype=np.uint8)
+    ocr_result = [
+        {"transcription": text, "points": points} for text, points in REAL_LINES
+    ]
+
+    expected = reference_encode(encoder, {"image": image}, REAL_LINES)
+    data = encoder({"image": image, "ocr_result": ocr_result})
+    assert data["input_ids"] == expected[0]
+    np.testing.assert_array_equal(data["bbox"], expected[1])
+    assert data["segment_offset_id"] == expected[2]
@@ -21,7 +21,6 @@ sys.path.insert(0, os.path.abspath(os.path.join(__dir__, "../..")))
 os.environ["FLAGS_allocator_strategy"] = "auto_growth"
 
 import cv2
-import copy
 import numpy as np
 import math
 import time
@@ -51,6 +50,7 @@ class TextClassifier(object):
         self.cls_image_shape = [int(v) for v in args.cls_image_shape.split(",")]
         self.cls_batch_num = args.cls_batch_num
         self.cls_thresh = args.cls_thresh
+        self.cls_sample_num = getattr(args, "cls_sample_num", 0)
         postprocess_params = {
             "name": "ClsPostProcess",
             "label_list": args.label_list,
@@ -86,34 +86,64 @@ class TextClassifier(object):
         padding_im[:, :, 0:resized_w] = resized_image
         return padding_im
 
-    def __call__(self, img_list):
-        img_list = copy.deepcopy(img_list)
+    def __call__(self, img_list, sample=False):
+        """
+        Classify the orientation of text crops and turn the upside down ones.
+
+        args:
+            img_list(list): the crops, the list itself is not changed
+            sample(bool): whether the crops are the text lines of one page,
+                whose orientation is shared. With cls_sample_num set, a
+                sample of the crops spread over the list is classified first,
+                and when they all agree with a score above cls_thresh, the
+                other crops take their label without being classified.
+        return:
+            the crops turned, [label, score] of every crop and the elapse
+        """
+        img_list = list(img_list)
         img_num = len(img_list)
+        cls_res = [["", 0.0]] * img_num
+        if sample and 0 < self.cls_sample_num < img_num:
+            sample_indices = np.linspace(0, img_num - 1, self.cls_sample_num)
+            sample_indices = np.unique(np.round(sample_indices).astype(int))
+            elapse = self._classify(img_list, sample_indices, cls_res)
+            labels = set(cls_res[i][0] for i in sample_indices)
+            min_score = min(cls_res[i][1] for i in sample_indices)
+            rest_indices = np.setdiff1d(np.arange(img_num), sample_indices)
+            if len(labels) == 1 and min_score > self.cls_thresh:
+                label = labels.pop()
+                for i in rest_indices:
+                    cls_res[i] = [label, min_score]
+                    if "180" in label:
+                        img_list[i] = cv2.rotate(img_list[i], 1)
+            else:
+                elapse += self._classify(img_list, rest_indices, cls_res)
+            return img_list, cls_res, elapse
+        elapse = self._classify(img_list, np.arange(img_num), cls_res)
+        return img_list, cls_res, elapse
+
+    def _classify(self, img_list, img_indices, cls_res):
+        """Classify the crops img_indices of img_list, set their cls_res and
+        turn the upside down ones in place, return the elapse."""
         # Calculate the aspect ratio of all text bars
         width_list = []
-        for img in img_list:
-            width_list.append(img.shape[1] / float(img.shape[0]))
+        for i in img_indices:
+            width_list.append(img_list[i].shape[1] / float(img_list[i].shape[0]))
         # Sorting can speed up the cls process
-        indices = np.argsort(np.array(width_list))
+        indices = np.asarray(img_indices)[np.argsort(np.array(width_list))]
+        img_num = len(indices)
 
-        cls_res = [["", 0.0]] * img_num
         batch_num = self.cls_batch_num
         elapse = 0
         for beg_img_no in range(0, img_num, batch_num):
             end_img_no = min(img_num, beg_img_no + batch_num)
             norm_img_batch = []
-            max_wh_ratio = 0
             starttime = time.time()
-            for ino in range(beg_img_no, end_img_no):
-                h, w = img_list[indices[ino]].shape[0:2]
-                wh_ratio = w * 1.0 / h
-                max_wh_ratio = max(max_wh_ratio, wh_ratio)
             for ino in range(beg_img_no, end_img_no):
                 norm_img = self.resize_norm_img(img_list[indices[ino]])
                 norm_img = norm_img[np.newaxis, :]
                 norm_img_batch.append(norm_img)
             norm_img_batch = np.concatenate(norm_img_batch)
-            norm_img_batch = norm_img_batch.copy()
 
             if self.use_onnx:
                 input_dict = {}
@@ -134,7 +164,7 @@ class TextClassifier(object):
                     img_list[indices[beg_img_no + rno]] = cv2.rotate(
                         img_list[indices[beg_img_no + rno]], 1
                     )
-        return img_list, cls_res, elapse
+        return elapse
 
 
 def main(args):
@@ -27,7 +27,11 @@ import sys
 
 import tools.infer.utility as utility
 from ppocr.utils.logging import get_logger
-from ppocr.utils.utility import get_image_file_list, check_and_read
+from ppocr.utils.utility import (
+    get_image_file_list,
+    check_and_read,
+    PdfPageSource,
+)
 from ppocr.data import create_operators, transform
 from ppocr.postprocess import build_post_process
 import json
@@ -433,20 +437,21 @@ if __name__ == "__main__":
 
     save_results = []
     for idx, image_file in enumerate(image_file_list):
-        img, flag_gif, flag_pdf = check_and_read(image_file)
-        if not flag_gif and not flag_pdf:
-            img = cv2.imread(image_file)
-        if not flag_pdf:
+        if os.path.basename(image_file)[-3:].lower() == "pdf":
+            # the pages are rendered on demand
+            imgs = PdfPageSource(image_file, args.page_num, args.page_range)
+            flag_gif, flag_pdf = False, True
+            page_ids = imgs.pages
+        else:
+            img, flag_gif, flag_pdf = check_and_read(image_file)
+            if not flag_gif:
+                img = cv2.imread(image_file)
             if img is None:
                 logger.debug("error in loading image:{}".format(image_file))
                 continue
             imgs = [img]
-        else:
-            page_num = args.page_num
-            if page_num > len(img) or page_num == 0:
-                page_num = len(img)
-            imgs = img[:page_num]
-        for index, img in enumerate(imgs):
+            page_ids = [0]
+        for index, img in zip(page_ids, imgs):
             st = time.time()
             dt_boxes, _ = text_detector(img)
             elapse = time.time() - st
@@ -577,6 +577,29 @@ class TextRecognizer(object):
         img = img.astype("float32")
         return img
 
+    def batch_by_shape(self, norm_img_list):
+        """Split normalized images into batches of a single shape.
+
+        Returns:
+            indices (ndarray): Image order, images of one shape are adjacent.
+            batch_ranges (list): [begin, end) of every batch in indices.
+        """
+        if len(norm_img_list) == 0:
+            return np.zeros((0,), dtype=np.int64), []
+        shapes = np.array([img.shape for img in norm_img_list])
+        indices = np.lexsort(shapes.T[::-1])
+        batch_ranges = []
+        beg_img_no = 0
+        for end_img_no in range(1, len(indices) + 1):
+            if (
+                end_img_no == len(indices)
+                or end_img_no - beg_img_no == self.rec_batch_num
+                or np.any(shapes[indices[end_img_no]] != shapes[indices[beg_img_no]])
+            ):
+                batch_ranges.append((beg_img_no, end_img_no))
+                beg_img_no = end_img_no
+        return indices, batch_ranges
+
     def __call__(self, img_list):
         img_num = len(img_list)
         # Calculate the aspect ratio of all text bars
@@ -590,8 +613,16 @@ class TextRecognizer(object):
         st = time.time()
         if self.benchmark:
             self.autolog.times.start()
-        for beg_img_no in range(0, img_num, batch_num):
-            end_img_no = min(img_num, beg_img_no + batch_num)
+        batch_ranges = [
+            (beg_img_no, min(img_num, beg_img_no + batch_num))
+            for beg_img_no in range(0, img_num, batch_num)
+        ]
+        if self.rec_algorithm == "LaTeXOCR":
+            # formulas are only padded to a multiple of 16, so a batch can
+            # only hold images normalized to the same shape
+            latexocr_norm_imgs = [self.norm_img_latexocr(img) for img in img_list]
+            indices, batch_ranges = self.batch_by_shape(latexocr_norm_imgs)
+        for beg_img_no, end_img_no in batch_ranges:
             norm_img_batch = []
             if self.rec_algorithm == "SRN":
                 encoder_word_pos_list = []
@@ -680,7 +711,7 @@ class TextRecognizer(object):
                     norm_img_mask_batch.append(norm_image_mask)
                     word_label_list.append(word_label)
                 elif self.rec_algorithm == "LaTeXOCR":
-                    norm_img = self.norm_img_latexocr(img_list[indices[ino]])
+                    norm_img = latexocr_norm_imgs[indices[ino]]
                     norm_img = norm_img[np.newaxis, :]
                     norm_img_batch.append(norm_img)
                 else:
@@ -847,7 +878,8 @@ class TextRecognizer(object):
                     max_wh_ratio=max_wh_ratio,
                 )
             elif self.postprocess_params["name"] == "LaTeXOCRDecode":
-                preds = [p.reshape([-1]) for p in preds]
+                # one row of token ids per image of the batch
+                preds = np.array(preds[0]).reshape([end_img_no - beg_img_no, -1])
                 rec_result = self.postprocess_op(preds)
             else:
                 rec_result = self.postprocess_op(preds)
@@ -32,8 +32,13 @@ import tools.infer.utility as utility
 import tools.infer.predict_rec as predict_rec
 import tools.infer.predict_det as predict_det
 import tools.infer.predict_cls as predict_cls
-from ppocr.utils.utility import get_image_file_list, check_and_read
+from ppocr.utils.utility import (
+    get_image_file_list,
+    check_and_read,
+    PdfPageSource,
+)
 from ppocr.utils.logging import get_logger
+from ppocr.utils.orientation import is_upright_box, is_upright_page
 from tools.infer.utility import (
     draw_ocr_box_txt,
     get_rotate_crop_image,
@@ -56,6 +61,7 @@ class TextSystem(object):
         self.drop_score = args.drop_score
         if self.use_angle_cls:
             self.text_classifier = predict_cls.TextClassifier(args)
+        self.orientation_gate = getattr(args, "use_orientation_gate", False)
 
         self.args = args
         self.crop_image_res_index = 0
@@ -73,8 +79,25 @@ class TextSystem(object):
             logger.debug(f"{bno}, {rec_res[bno]}")
         self.crop_image_res_index += bbox_num
 
-    def __call__(self, img, cls=True, slice={}):
-        time_dict = {"det": 0, "rec": 0, "cls": 0, "all": 0}
+    def __call__(self, img, cls=True, slice={}, upright=None, skip_regions=None):
+        """
+        args:
+            upright: whether img is known to be upright, checked with
+                is_upright_page when None. With the orientation gate on, the
+                horizontal boxes of an upright image skip the classifier.
+            skip_regions: regions [x1, y1, x2, y2] whose text is not used,
+                the boxes detected mostly inside them are dropped before the
+                recognition, counted in time_dict["rec_skip"]
+        """
+        time_dict = {
+            "det": 0,
+            "rec": 0,
+            "cls": 0,
+            "cls_num": 0,
+            "cls_skip": 0,
+            "rec_skip": 0,
+            "all": 0,
+        }
 
         if img is None:
             logger.debug("no valid image provided")
@@ -122,6 +145,10 @@ class TextSystem(object):
         img_crop_list = []
 
         dt_boxes = sorted_boxes(dt_boxes)
+        if skip_regions:
+            in_regions = boxes_in_regions(dt_boxes, skip_regions)
+            time_dict["rec_skip"] = int(in_regions.sum())
+            dt_boxes = [box for box, skip in zip(dt_boxes, in_regions) if not skip]
 
         for bno in range(len(dt_boxes)):
             tmp_box = copy.deepcopy(dt_boxes[bno])
@@ -131,10 +158,29 @@ class TextSystem(object):
                 img_crop = get_minarea_rect_crop(ori_im, tmp_box)
             img_crop_list.append(img_crop)
         if self.use_angle_cls and cls:
-            img_crop_list, angle_list, elapse = self.text_classifier(img_crop_list)
+            tic = time.time()
+            cls_indices = list(range(len(img_crop_list)))
+            if self.orientation_gate:
+                if upright is None:
+                    upright = is_upright_page(ori_im)
+                if upright:
+                    cls_indices = [
+                        i for i, box in enumerate(dt_boxes) if not is_upright_box(box)
+                    ]
+            if len(cls_indices) > 0:
+                cls_crop_list, angle_list, _ = self.text_classifier(
+                    [img_crop_list[i] for i in cls_indices], sample=True
+                )
+                for i, img_crop in zip(cls_indices, cls_crop_list):
+                    img_crop_list[i] = img_crop
+            elapse = time.time() - tic
             time_dict["cls"] = elapse
+            time_dict["cls_num"] = len(cls_indices)
+            time_dict["cls_skip"] = len(img_crop_list) - len(cls_indices)
             logger.debug(
-                "cls num  : {}, elapsed : {}".format(len(img_crop_list), elapse)
+                "cls num  : {}, skipped : {}, elapsed : {}".format(
+                    time_dict["cls_num"], time_dict["cls_skip"], elapse
+                )
             )
         if len(img_crop_list) > 1000:
             logger.debug(
@@ -182,6 +228,77 @@ def sorted_boxes(dt_boxes):
     return _boxes
 
 
+def boxes_in_regions(dt_boxes, regions, min_overlap=0.8):
+    """
+    Whether text boxes lie mostly inside regions
+    args:
+        dt_boxes(list): text boxes, arrays of points
+        regions(list): regions [x1, y1, x2, y2]
+        min_overlap(float): the fraction of the area of the bounding
+            rectangle of a box that has to be inside one of the regions
+    return:
+        a bool array, True for the boxes inside a region
+    """
+    if len(dt_boxes) == 0 or len(regions) == 0:
+        return np.zeros(len(dt_boxes), dtype=bool)
+    # boxes of any number of points, e.g. with det_box_type poly
+    lo = np.array([np.min(box, axis=0) for box in dt_boxes], dtype=np.float32)
+    hi = np.array([np.max(box, axis=0) for box in dt_boxes], dtype=np.float32)
+    regions = np.asarray(regions, dtype=np.float32)
+    inter_lo = np.maximum(lo[:, None], regions[None, :, :2])
+    inter_hi = np.minimum(hi[:, None], regions[None, :, 2:])
+    inter = np.prod(np.clip(inter_hi - inter_lo, 0, None), axis=2).max(axis=1)
+    area = np.prod(hi - lo, axis=1)
+    return inter >= min_overlap * np.maximum(area, 1e-6)
+
+
+def ocr_with_text_layer(text_sys, img, text_layer, cls=True, skip_regions=None):
+    """
+    OCR of a pdf page with a text layer, see pdf_page_text_layer: the lines
+    of the layer are taken as they are and only the images of the page, whose
+    text is not in the layer, go through the text system. The boxes detected
+    in the images that are mostly inside a line of the layer are dropped, so
+    that text drawn over an image is not read twice.
+    """
+    dt_boxes, rec_res, image_boxes = text_layer
+    dt_boxes, rec_res = list(dt_boxes), list(rec_res)
+    time_dict = {
+        "det": 0,
+        "rec": 0,
+        "cls": 0,
+        "cls_num": 0,
+        "cls_skip": 0,
+        "rec_skip": 0,
+        "all": 0,
+    }
+    page_skip_regions = list(skip_regions or [])
+    page_skip_regions += [
+        [box[:, 0].min(), box[:, 1].min(), box[:, 0].max(), box[:, 1].max()]
+        for box in dt_boxes
+    ]
+    h, w = img.shape[:2]
+    for x1, y1, x2, y2 in image_boxes:
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, w), min(y2, h)
+        if x2 <= x1 or y2 <= y1:
+            continue
+        image_skip_regions = [
+            [rx1 - x1, ry1 - y1, rx2 - x1, ry2 - y1]
+            for rx1, ry1, rx2, ry2 in page_skip_regions
+        ]
+        image_dt_boxes, image_rec_res, image_time_dict = text_sys(
+            img[y1:y2, x1:x2], cls, skip_regions=image_skip_regions
+        )
+        for key in time_dict:
+            time_dict[key] += image_time_dict.get(key, 0)
+        if image_dt_boxes is None:
+            continue
+        for box, res in zip(image_dt_boxes, image_rec_res):
+            dt_boxes.append(np.array(box, dtype=np.float32) + [x1, y1])
+            rec_res.append(res)
+    return dt_boxes, rec_res, time_dict
+
+
 def main(args):
     image_file_list = get_image_file_list(args.image_dir)
     image_file_list = image_file_list[args.process_id :: args.total_process_num]
@@ -205,28 +322,42 @@ def main(args):
             res = text_sys(img)
 
     total_time = 0
+    cls_num, cls_skip = 0, 0
     cpu_mem, gpu_mem, gpu_util = 0, 0, 0
     _st = time.time()
     count = 0
     for idx, image_file in enumerate(image_file_list):
-        img, flag_gif, flag_pdf = check_and_read(image_file)
-        if not flag_gif and not flag_pdf:
-            img = cv2.imread(image_file)
-        if not flag_pdf:
+        if os.path.basename(image_file)[-3:].lower() == "pdf":
+            # the pages are rendered on demand
+            imgs = PdfPageSource(
+                image_file,
+                args.page_num,
+                args.page_range,
+                text_layer=args.use_pdf_text_layer,
+            )
+            flag_gif, flag_pdf = False, True
+            pages = imgs.iter_pages()
+        else:
+            img, flag_gif, flag_pdf = check_and_read(image_file)
+            if not flag_gif:
+                img = cv2.imread(image_file)
             if img is None:
                 logger.debug("error in loading image:{}".format(image_file))
                 continue
             imgs = [img]
-        else:
-            page_num = args.page_num
-            if page_num > len(img) or page_num == 0:
-                page_num = len(img)
-            imgs = img[:page_num]
-        for index, img in enumerate(imgs):
+            pages = [(0, img, None)]
+        for index, img, text_layer in pages:
             starttime = time.time()
-            dt_boxes, rec_res, time_dict = text_sys(img)
+            if text_layer is not None:
+                dt_boxes, rec_res, time_dict = ocr_with_text_layer(
+                    text_sys, img, text_layer
+                )
+            else:
+                dt_boxes, rec_res, time_dict = text_sys(img)
             elapse = time.time() - starttime
             total_time += elapse
+            cls_num += time_dict["cls_num"]
+            cls_skip += time_dict["cls_skip"]
             if len(imgs) > 1:
                 logger.debug(
                     str(idx)
@@ -297,6 +428,12 @@ def main(args):
                 )
 
     logger.info("The predict total time is {}".format(time.time() - _st))
+    if cls_num + cls_skip > 0:
+        logger.info(
+            "The cls skipped {} of {} text boxes ({:.1%})".format(
+                cls_skip, cls_num + cls_skip, cls_skip / (cls_num + cls_skip)
+            )
+        )
     if args.benchmark:
         text_sys.text_detector.autolog.report()
         text_sys.text_recognizer.autolog.report()
@@ -58,6 +58,19 @@ def init_args():
     # params for text detector
     parser.add_argument("--image_dir", type=str)
     parser.add_argument("--page_num", type=int, default=0)
+    parser.add_argument(
+        "--page_range",
+        type=str,
+        default=None,
+        help='The pages of the pdfs to predict, like "1-3,7", numbered from 1.',
+    )
+    parser.add_argument(
+        "--use_pdf_text_layer",
+        type=str2bool,
+        default=False,
+        help="Take the text of born-digital pdf pages from their text layer, "
+        "only scanned pages and the images of a page go through the ocr.",
+    )
     parser.add_argument("--det_algorithm", type=str, default="DB")
     parser.add_argument("--det_model_dir", type=str)
     parser.add_argument("--det_limit_side_len", type=float, default=960)
@@ -128,6 +141,20 @@ def init_args():
     parser.add_argument("--label_list", type=list, default=["0", "180"])
     parser.add_argument("--cls_batch_num", type=int, default=6)
     parser.add_argument("--cls_thresh", type=float, default=0.9)
+    parser.add_argument(
+        "--cls_sample_num",
+        type=int,
+        default=0,
+        help="Classify this many of the text boxes of a page first and only "
+        "classify the others when they disagree, 0 to classify all boxes.",
+    )
+    parser.add_argument(
+        "--use_orientation_gate",
+        type=str2bool,
+        default=True,
+        help="Skip the orientation classifiers on the pages and text boxes that "
+        "cheap checks find upright.",
+    )
 
     parser.add_argument("--enable_mkldnn", type=str2bool, default=None)
     parser.add_argument("--cpu_threads", type=int, default=10)